@@ -3,7 +3,19 @@ Django Admin configuration for Analytics app.
 """
 
 from django.contrib import admin
-from .models import PageView, CarView, Inquiry, Sale
+from .models import (
+    PageView,
+    CarView,
+    Inquiry,
+    Sale,
+    DailyPageStats,
+    DailyCarViewStats,
+    DailySalesStats,
+    RollupState,
+    DailyPageVisitors,
+    DailyCarVisitors,
+)
+from .hll import HyperLogLog
 
 
 @admin.register(PageView)
@@ -114,3 +126,85 @@ class SaleAdmin(admin.ModelAdmin):
             return f"{margin:.2f}%"
         return "N/A"
     profit_margin_display.short_description = 'Profit Margin'
+
+
+
+@admin.register(DailyPageStats)
+class DailyPageStatsAdmin(admin.ModelAdmin):
+    """Admin configuration for DailyPageStats model (read-only rollup)"""
+    list_display = ['date', 'page_url', 'views']
+    list_filter = ['date']
+    search_fields = ['page_url']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        """Rollups are maintained by the rollup_analytics command"""
+        return False
+
+
+@admin.register(DailyCarViewStats)
+class DailyCarViewStatsAdmin(admin.ModelAdmin):
+    """Admin configuration for DailyCarViewStats model (read-only rollup)"""
+    list_display = ['date', 'car', 'views']
+    list_filter = ['date']
+    search_fields = ['car__make', 'car__model']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        """Rollups are maintained by the rollup_analytics command"""
+        return False
+
+
+@admin.register(DailySalesStats)
+class DailySalesStatsAdmin(admin.ModelAdmin):
+    """Admin configuration for DailySalesStats model (read-only rollup)"""
+    list_display = ['date', 'category', 'sales', 'revenue']
+    list_filter = ['date', 'category']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        """Rollups are maintained by the rollup_analytics command"""
+        return False
+
+
+@admin.register(RollupState)
+class RollupStateAdmin(admin.ModelAdmin):
+    """Admin configuration for RollupState model"""
+    list_display = ['name', 'rolled_up_through', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(DailyPageVisitors)
+class DailyPageVisitorsAdmin(admin.ModelAdmin):
+    """Admin configuration for DailyPageVisitors model (read-only sketch)"""
+    list_display = ['date', 'page_url', 'estimated_visitors']
+    list_filter = ['date']
+    search_fields = ['page_url']
+    date_hierarchy = 'date'
+    exclude = ['sketch']
+
+    def has_add_permission(self, request):
+        """Sketches are maintained by event ingestion"""
+        return False
+
+    def estimated_visitors(self, obj):
+        return HyperLogLog.from_bytes(obj.sketch).count()
+    estimated_visitors.short_description = 'Visitors (approx.)'
+
+
+@admin.register(DailyCarVisitors)
+class DailyCarVisitorsAdmin(admin.ModelAdmin):
+    """Admin configuration for DailyCarVisitors model (read-only sketch)"""
+    list_display = ['date', 'car', 'estimated_visitors']
+    list_filter = ['date']
+    search_fields = ['car__make', 'car__model']
+    date_hierarchy = 'date'
+    exclude = ['sketch']
+
+    def has_add_permission(self, request):
+        """Sketches are maintained by event ingestion"""
+        return False
+
+    def estimated_visitors(self, obj):
+        return HyperLogLog.from_bytes(obj.sketch).count()
+    estimated_visitors.short_description = 'Visitors (approx.)'
@@ -0,0 +1,95 @@
+"""
+Batched ingestion of page-view and car-view events.
+
+The frontend queues events and sends them in batches with
+navigator.sendBeacon (see frontend/lib/analytics.ts). A batch looks like:
+
+    {
+        "session_id": "optional client session id",
+        "events": [
+            {"type": "page_view", "url": "/cars"},
+            {"type": "car_view", "car_id": "<uuid>"}
+        ]
+    }
+
+Validation is cheap and per event: malformed events are dropped and counted,
+they never fail the whole batch. Page views are written with one bulk_create
+per batch; car views go through the car view buffer, which already batches
+the CarView rows and views_count updates. Both also feed the unique-visitor
+sketches through in-memory buffers (see visitors.py), so a batch does not
+lock any sketch row.
+"""
+
+import uuid
+
+from .models import PageView
+from .view_buffer import car_view_buffer
+from .visitors import page_visitor_buffer, visitor_id
+
+PAGE_VIEW = 'page_view'
+CAR_VIEW = 'car_view'
+
+MAX_URL_LENGTH = PageView._meta.get_field('page_url').max_length
+MAX_USER_AGENT_LENGTH = PageView._meta.get_field('user_agent').max_length
+MAX_SESSION_ID_LENGTH = PageView._meta.get_field('session_id').max_length
+
+
+def _clean_url(value):
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if not value or len(value) > MAX_URL_LENGTH:
+        return None
+    return value
+
+
+def _clean_car_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def ingest_events(events, visitor_ip, user_agent='', session_id=''):
+    """
+    Validate and store a batch of events.
+    Returns {'accepted': n, 'rejected': n}.
+    """
+    user_agent = (user_agent or '')[:MAX_USER_AGENT_LENGTH]
+    session_id = session_id if isinstance(session_id, str) else ''
+    session_id = session_id[:MAX_SESSION_ID_LENGTH]
+
+    page_views, car_ids, rejected = [], [], 0
+    for event in events:
+        if not isinstance(event, dict):
+            rejected += 1
+            continue
+        if event.get('type') == PAGE_VIEW:
+            url = _clean_url(event.get('url'))
+            if url is None:
+                rejected += 1
+                continue
+            page_views.append(PageView(
+                page_url=url,
+                visitor_ip=visitor_ip,
+                user_agent=user_agent,
+                session_id=session_id,
+            ))
+        elif event.get('type') == CAR_VIEW:
+            car_id = _clean_car_id(event.get('car_id'))
+            if car_id is None:
+                rejected += 1
+                continue
+            car_ids.append(car_id)
+        else:
+            rejected += 1
+
+    if page_views:
+        PageView.objects.bulk_create(page_views)
+        visitor = visitor_id(visitor_ip, session_id)
+        page_visitor_buffer.record((view.page_url, visitor) for view in page_views)
+    # Views of unknown cars are dropped when the buffer flushes
+    for car_id in car_ids:
+        car_view_buffer.record(car_id, visitor_ip=visitor_ip, session_id=session_id)
+
+    return {'accepted': len(page_views) + len(car_ids), 'rejected': rejected}
@@ -0,0 +1,87 @@
+"""
+HyperLogLog sketches for approximate unique-visitor counts.
+
+A sketch keeps 2 ** PRECISION one-byte registers. Adding a visitor id hashes
+it and raises one register; the estimate is derived from all registers.
+Sketches for different days merge by taking the register-wise maximum, so
+unique visitors over any date range are counted without double-counting a
+visitor seen on several days.
+
+With PRECISION = 11 (2048 registers) the standard error is
+1.04 / sqrt(2048), about 2.3%: roughly 95% of estimates fall within ±4.6%
+of the true count. Below about 5000 visitors linear counting is used instead,
+which is exact or nearly so for a few hundred visitors.
+
+Registers are stored zlib-compressed, so a day with few visitors takes tens
+of bytes instead of 2 KB.
+"""
+
+import hashlib
+import math
+import zlib
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+_HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def _hash(value):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HyperLogLog:
+    """A mutable HyperLogLog sketch."""
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers else bytearray(REGISTERS)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        return cls(zlib.decompress(bytes(data)))
+
+    def to_bytes(self):
+        return zlib.compress(bytes(self.registers))
+
+    def add(self, value):
+        hashed = _hash(value)
+        index = hashed >> (_HASH_BITS - PRECISION)
+        remaining = hashed & ((1 << (_HASH_BITS - PRECISION)) - 1)
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = (_HASH_BITS - PRECISION) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one (union of visitors)."""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added."""
+        zeros = self.registers.count(0)
+        if zeros == REGISTERS:
+            return 0
+        estimate = _ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * REGISTERS and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return int(round(estimate))
+
+
+def merged(sketches):
+    """Union of serialized sketches, as a HyperLogLog."""
+    result = HyperLogLog()
+    for data in sketches:
+        result.merge(HyperLogLog.from_bytes(data))
+    return result
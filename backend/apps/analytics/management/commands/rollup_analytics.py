@@ -0,0 +1,51 @@
+"""
+Management command to maintain the daily analytics rollups.
+
+Run it once a day (e.g. from cron shortly after midnight):
+
+    python manage.py rollup_analytics
+
+Use --rebuild to recompute every rollup from the raw tables, e.g. after
+changing a car's category or bulk-loading historic data. Page and car view
+rollups for days whose raw rows were dropped by the retention policy
+(see apps/analytics/partitions.py) are kept.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.analytics.models import DailyPageStats, DailyCarViewStats, DailySalesStats, RollupState
+from apps.analytics.rollups import ROLLUP_NAME, advance_rollups, get_raw_views_start
+
+
+class Command(BaseCommand):
+    help = 'Roll up raw page views, car views and sales into daily stats tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Discard existing rollups and recompute them from raw data',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            raw_views_start = get_raw_views_start()
+            with transaction.atomic():
+                page_stats = DailyPageStats.objects.all()
+                car_stats = DailyCarViewStats.objects.all()
+                if raw_views_start is not None:
+                    page_stats = page_stats.filter(date__gte=raw_views_start)
+                    car_stats = car_stats.filter(date__gte=raw_views_start)
+                page_stats.delete()
+                car_stats.delete()
+                DailySalesStats.objects.all().delete()
+                RollupState.objects.filter(name=ROLLUP_NAME).delete()
+
+        processed = advance_rollups()
+        if processed is None:
+            self.stdout.write('Rollups are already up to date.')
+            return
+
+        start, end = processed
+        self.stdout.write(self.style.SUCCESS(f'Rolled up analytics from {start} through {end}.'))
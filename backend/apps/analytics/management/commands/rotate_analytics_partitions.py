@@ -0,0 +1,63 @@
+"""
+Management command to rotate the PageView/CarView monthly partitions.
+
+Run it daily (e.g. from cron after rollup_analytics):
+
+    python manage.py rotate_analytics_partitions
+
+It creates partitions ANALYTICS_PARTITION_PREMAKE_MONTHS ahead and drops
+partitions older than ANALYTICS_RETENTION_MONTHS that the daily rollups
+already cover. Without PostgreSQL partitioning only the retention policy
+applies, as batched DELETEs.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming analytics partitions and drop ones past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            help='Override ANALYTICS_RETENTION_MONTHS (0 keeps everything)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be dropped or deleted without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if partitions.is_supported():
+            for model in partitions.partitioned_models():
+                table = model._meta.db_table
+                if not partitions.is_partitioned(table):
+                    self.stdout.write(self.style.WARNING(f'{table} is not partitioned; run migrations first.'))
+                    continue
+                if dry_run:
+                    continue
+                for name in partitions.ensure_partitions(table):
+                    self.stdout.write(f'Created partition {name}')
+        else:
+            self.stdout.write('Partitioning requires PostgreSQL; only applying the retention policy.')
+
+        result = partitions.apply_retention(options['retention_months'], dry_run=dry_run)
+        if not result:
+            self.stdout.write('Nothing to drop (retention disabled or rollups not run yet).')
+            return
+
+        verb = 'Would drop' if dry_run else 'Dropped'
+        for table, removed in result.items():
+            if isinstance(removed, list):
+                for name in removed:
+                    self.stdout.write(f'{verb} partition {name}')
+            else:
+                verb_rows = 'Would delete' if dry_run else 'Deleted'
+                self.stdout.write(f'{verb_rows} {removed} rows from {table}')
+        self.stdout.write(self.style.SUCCESS('Analytics partitions are up to date.'))
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('cars', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPageStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('page_url', models.CharField(max_length=500)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Page Stats',
+                'verbose_name_plural': 'Daily Page Stats',
+                'ordering': ['-date', '-views'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sales', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Stats',
+                'verbose_name_plural': 'Daily Sales Stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('rolled_up_through', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rollup State',
+                'verbose_name_plural': 'Rollup States',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCarViewStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_view_stats', to='cars.car')),
+            ],
+            options={
+                'verbose_name': 'Daily Car View Stats',
+                'verbose_name_plural': 'Daily Car View Stats',
+                'ordering': ['-date', '-views'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailypagestats',
+            constraint=models.UniqueConstraint(fields=('date', 'page_url'), name='unique_daily_page_stats'),
+        ),
+        migrations.AddField(
+            model_name='dailysalesstats',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales_stats', to='cars.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycarviewstats',
+            constraint=models.UniqueConstraint(fields=('date', 'car'), name='unique_daily_car_view_stats'),
+        ),
+        migrations.AddIndex(
+            model_name='dailysalesstats',
+            index=models.Index(fields=['date', 'category'], name='analytics_d_date_1133cc_idx'),
+        ),
+    ]
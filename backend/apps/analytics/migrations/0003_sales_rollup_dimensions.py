@@ -0,0 +1,67 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def rebuild_sales_rollups(apps, schema_editor):
+    """
+    Existing sales rollups lack the new dimensions. Rebuild them from the raw
+    Sale rows for every day up to the rollup watermark, in place, so the
+    RollupState rows (the watermark and the retention mark) are kept and
+    `rollup_analytics` carries on from where it was instead of re-rolling
+    all history. Same grouping as rollups.rollup_sales_days.
+    """
+    DailySalesStats = apps.get_model('analytics', 'DailySalesStats')
+    RollupState = apps.get_model('analytics', 'RollupState')
+    Sale = apps.get_model('analytics', 'Sale')
+
+    DailySalesStats.objects.all().delete()
+    state = RollupState.objects.filter(name='daily').first()
+    if state is None:
+        return
+    rows = (
+        Sale.objects.filter(sale_date__lte=state.rolled_up_through)
+        .values('sale_date', 'car__category', 'car__brand', 'car__fuel_type', 'car__year')
+        .annotate(sales=Count('id'), revenue=Sum('sale_price'))
+    )
+    DailySalesStats.objects.bulk_create([
+        DailySalesStats(
+            date=row['sale_date'],
+            category_id=row['car__category'],
+            brand_id=row['car__brand'],
+            fuel_type=row['car__fuel_type'],
+            year=row['car__year'],
+            sales=row['sales'],
+            revenue=row['revenue'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_daily_rollups'),
+        ('cars', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailysalesstats',
+            name='brand',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales_stats', to='cars.brand'),
+        ),
+        migrations.AddField(
+            model_name='dailysalesstats',
+            name='fuel_type',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='dailysalesstats',
+            name='year',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(rebuild_sales_rollups, migrations.RunPython.noop),
+    ]
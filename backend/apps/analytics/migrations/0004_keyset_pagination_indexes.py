@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_sales_rollup_dimensions'),
+        ('cars', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(fields=['created_at', 'id'], name='analytics_i_created_3b9b56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sale_date', 'id'], name='analytics_s_sale_da_09341e_idx'),
+        ),
+    ]
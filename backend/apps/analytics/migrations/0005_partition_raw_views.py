@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# PostgreSQL-only: convert the raw page/car view tables into tables
+# partitioned by month on timestamp (see apps/analytics/partitions.py).
+# Fails on PostgreSQL older than partitions.MIN_POSTGRES_VERSION.
+# Other databases keep plain tables.
+PARTITIONED_TABLES = ['analytics_pageview', 'analytics_carview']
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.analytics.partitions import partition_table
+
+    for table in PARTITIONED_TABLES:
+        partition_table(table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        # Partitioned tables work the same for Django, so reversing is a no-op
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
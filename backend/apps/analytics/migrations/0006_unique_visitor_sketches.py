@@ -0,0 +1,51 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_partition_raw_views'),
+        ('cars', '0003_car_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPageVisitors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('page_url', models.CharField(blank=True, max_length=500)),
+                ('sketch', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Daily Page Visitors',
+                'verbose_name_plural': 'Daily Page Visitors',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCarVisitors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sketch', models.BinaryField()),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_visitors', to='cars.car')),
+            ],
+            options={
+                'verbose_name': 'Daily Car Visitors',
+                'verbose_name_plural': 'Daily Car Visitors',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailypagevisitors',
+            constraint=models.UniqueConstraint(fields=('date', 'page_url'), name='unique_daily_page_visitors'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycarvisitors',
+            constraint=models.UniqueConstraint(fields=('date', 'car'), name='unique_daily_car_visitors'),
+        ),
+    ]
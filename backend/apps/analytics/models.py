@@ -6,11 +6,16 @@ This file defines:
 - CarView: Track individual car detail page views
 - Inquiry: Customer inquiries about cars
 - Sale: Record of sold cars
+- DailyPageStats, DailyCarViewStats, DailySalesStats: Pre-aggregated daily rollups
+- RollupState: How far the daily rollups have been computed
+- DailyPageVisitors, DailyCarVisitors: Unique-visitor sketches per day
 """
 
 from django.db import models
+from django.db.models import Count, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Cast, NullIf
 from django.core.validators import MinValueValidator
-from apps.cars.models import Car
+from apps.cars.models import Car, Category, Brand
 
 
 class PageView(models.Model):
@@ -138,6 +143,7 @@ class Inquiry(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['created_at', 'id']),  # Keyset pagination
         ]
 
     def __str__(self):
@@ -145,6 +151,70 @@ class Inquiry(models.Model):
         return f"Inquiry from {self.name}{car_info}"
 
 
+MONEY = models.DecimalField(max_digits=14, decimal_places=2)
+
+
+def percent_of(value, total):
+    """value * 100 / total in SQL, as a float (null when total is 0)."""
+    return ExpressionWrapper(
+        Cast(value, models.FloatField()) * Value(100) / NullIf(total, Value(0)),
+        output_field=models.FloatField()
+    )
+
+
+class SaleQuerySet(models.QuerySet):
+    """
+    QuerySet for sales with profitability annotations computed in SQL.
+    """
+
+    def with_profit(self):
+        """
+        Annotate each sale with:
+        - list_price: the car's list price
+        - maintenance_cost: the car's total reconditioning cost
+        - gross_margin: sale price minus list price
+        - net_margin: gross margin minus maintenance cost
+        - gross_margin_pct / net_margin_pct: margins as a percentage of the
+          list price (null when the list price is 0)
+        """
+        return self.annotate(
+            list_price=F('car__price'),
+            maintenance_cost=F('car__maintenance_cost_total'),
+            gross_margin=ExpressionWrapper(F('sale_price') - F('car__price'), output_field=MONEY),
+            net_margin=ExpressionWrapper(
+                F('sale_price') - F('car__price') - F('car__maintenance_cost_total'),
+                output_field=MONEY
+            ),
+            gross_margin_pct=percent_of(F('gross_margin'), F('car__price')),
+            net_margin_pct=percent_of(F('net_margin'), F('car__price')),
+        )
+
+    def profit_summary(self, *fields):
+        """
+        Revenue, cost and margin totals computed by the database: one row per
+        group of `fields` (a values() queryset) when given, otherwise a single
+        aggregate dict. Margin percentages are taken over the summed list prices.
+        """
+        gross_margin = Sum(F('sale_price') - F('car__price'), output_field=MONEY)
+        net_margin = Sum(
+            F('sale_price') - F('car__price') - F('car__maintenance_cost_total'),
+            output_field=MONEY
+        )
+        totals = {
+            'sales': Count('id'),
+            'revenue': Sum('sale_price'),
+            'list_value': Sum('car__price'),
+            'maintenance_cost': Sum('car__maintenance_cost_total'),
+            'gross_margin': gross_margin,
+            'net_margin': net_margin,
+            'gross_margin_pct': percent_of(gross_margin, Sum('car__price')),
+            'net_margin_pct': percent_of(net_margin, Sum('car__price')),
+        }
+        if not fields:
+            return self.aggregate(**totals)
+        return self.values(*fields).annotate(**totals).order_by(*fields)
+
+
 class Sale(models.Model):
     """
     Record of car sales for tracking and analytics.
@@ -184,12 +254,15 @@ class Sale(models.Model):
     # Timestamp
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = SaleQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Sale'
         verbose_name_plural = 'Sales'
         ordering = ['-sale_date']
         indexes = [
             models.Index(fields=['-sale_date']),
+            models.Index(fields=['sale_date', 'id']),  # Keyset pagination
         ]
 
     def __str__(self):
@@ -200,7 +273,160 @@ class Sale(models.Model):
         """
         Calculate profit margin if car's original price is available.
         Returns percentage difference between sale price and list price.
+        Uses the value computed by SaleQuerySet.with_profit() when present.
         """
+        if hasattr(self, 'gross_margin_pct'):
+            return self.gross_margin_pct
         if self.car and self.car.price:
             return ((self.sale_price - self.car.price) / self.car.price) * 100
         return None
+
+
+# ============= DAILY ROLLUPS =============
+
+class DailyPageStats(models.Model):
+    """
+    Page views per URL per day, rolled up from PageView.
+    """
+    date = models.DateField()
+    page_url = models.CharField(max_length=500)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Daily Page Stats'
+        verbose_name_plural = 'Daily Page Stats'
+        ordering = ['-date', '-views']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'page_url'], name='unique_daily_page_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.page_url} on {self.date}: {self.views} views"
+
+
+class DailyCarViewStats(models.Model):
+    """
+    Car detail views per car per day, rolled up from CarView.
+    """
+    date = models.DateField()
+    car = models.ForeignKey(
+        Car,
+        on_delete=models.CASCADE,
+        related_name='daily_view_stats'
+    )
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Daily Car View Stats'
+        verbose_name_plural = 'Daily Car View Stats'
+        ordering = ['-date', '-views']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'car'], name='unique_daily_car_view_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.car} on {self.date}: {self.views} views"
+
+
+class DailySalesStats(models.Model):
+    """
+    Sales count and revenue per day, broken down by the sold car's
+    category, brand, fuel type and year. Rolled up from Sale.
+    A null category/brand holds sales of uncategorized/unbranded cars.
+    """
+    date = models.DateField()
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_sales_stats'
+    )
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_sales_stats'
+    )
+    fuel_type = models.CharField(max_length=20, blank=True)
+    year = models.IntegerField(null=True, blank=True)
+    sales = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Daily Sales Stats'
+        verbose_name_plural = 'Daily Sales Stats'
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'category']),
+        ]
+
+    def __str__(self):
+        return f"Sales on {self.date}: {self.sales} ({self.revenue})"
+
+
+class RollupState(models.Model):
+    """
+    Tracks the last complete day included in the daily rollups.
+    Analytics queries read rollups up to this day and raw rows after it.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    rolled_up_through = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Rollup State'
+        verbose_name_plural = 'Rollup States'
+
+    def __str__(self):
+        return f"{self.name} rolled up through {self.rolled_up_through}"
+
+
+# ============= UNIQUE VISITOR SKETCHES =============
+
+class DailyPageVisitors(models.Model):
+    """
+    HyperLogLog sketch of the visitors of a page on a day (see hll.py).
+    The row with an empty page_url covers every page (site-wide visitors).
+    """
+    SITE_WIDE = ''
+
+    date = models.DateField()
+    page_url = models.CharField(max_length=500, blank=True)
+    sketch = models.BinaryField()
+
+    class Meta:
+        verbose_name = 'Daily Page Visitors'
+        verbose_name_plural = 'Daily Page Visitors'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'page_url'], name='unique_daily_page_visitors'),
+        ]
+
+    def __str__(self):
+        return f"Visitors of {self.page_url or 'all pages'} on {self.date}"
+
+
+class DailyCarVisitors(models.Model):
+    """
+    HyperLogLog sketch of the visitors of a car detail page on a day.
+    """
+    date = models.DateField()
+    car = models.ForeignKey(
+        Car,
+        on_delete=models.CASCADE,
+        related_name='daily_visitors'
+    )
+    sketch = models.BinaryField()
+
+    class Meta:
+        verbose_name = 'Daily Car Visitors'
+        verbose_name_plural = 'Daily Car Visitors'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'car'], name='unique_daily_car_visitors'),
+        ]
+
+    def __str__(self):
+        return f"Visitors of {self.car} on {self.date}"
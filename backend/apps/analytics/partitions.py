@@ -0,0 +1,349 @@
+"""
+Monthly partitioning and retention for the raw PageView and CarView tables.
+
+On PostgreSQL both tables are range-partitioned on `timestamp`, one partition
+per calendar month (e.g. analytics_pageview_p2026_10) plus a default
+partition that catches rows outside every monthly range, so inserts never
+fail when the rotation command has not run. Queries bounded by timestamp
+(views_this_week, the raw-row tail of the rollup helpers) are pruned by the
+planner to the matching partitions.
+
+The `rotate_analytics_partitions` command creates upcoming partitions
+(ANALYTICS_PARTITION_PREMAKE_MONTHS ahead) and enforces the retention policy
+(ANALYTICS_RETENTION_MONTHS) by dropping whole monthly partitions instead of
+deleting rows. A partition is only dropped once the daily rollups cover it,
+so the dashboard totals are unaffected.
+
+Partitioning needs PostgreSQL MIN_POSTGRES_VERSION (11) or later, for
+default partitions and primary and foreign keys on partitioned tables; the
+migration fails with a clear error on older servers. The id column keeps
+its values through a plain sequence rather than an identity column, which
+partitioned tables only support from PostgreSQL 17.
+
+Other databases (SQLite in local development) have no partitioning: the
+retention policy falls back to batched DELETEs, each batch in its own
+transaction so a large backlog never holds one long transaction.
+"""
+
+import re
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import NotSupportedError, connection, transaction
+from django.utils import timezone
+
+from .rollups import RETENTION_NAME, get_cutoff, start_of_day
+
+PARTITION_KEY = 'timestamp'
+DELETE_BATCH_SIZE = 5000
+MIN_POSTGRES_VERSION = 110000  # as in connection.pg_version
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def is_supported():
+    return connection.vendor == 'postgresql' and connection.pg_version >= MIN_POSTGRES_VERSION
+
+
+def check_supported():
+    """Raise NotSupportedError unless the database can partition the tables."""
+    if connection.vendor != 'postgresql':
+        raise NotSupportedError('Analytics partitioning requires PostgreSQL.')
+    if connection.pg_version < MIN_POSTGRES_VERSION:
+        raise NotSupportedError(
+            f'Analytics partitioning requires PostgreSQL {MIN_POSTGRES_VERSION // 10000} or later '
+            f'(this server is version {connection.pg_version // 10000}).'
+        )
+
+
+def partitioned_models():
+    from .models import PageView, CarView
+    return [PageView, CarView]
+
+
+def retention_months():
+    return getattr(settings, 'ANALYTICS_RETENTION_MONTHS', 0)
+
+
+def premake_months():
+    return getattr(settings, 'ANALYTICS_PARTITION_PREMAKE_MONTHS', 3)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def _fetch(sql, params=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params or [])
+        return cursor.fetchall()
+
+
+def _execute(sql, params=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params or [])
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+# ============= INSPECTION =============
+
+def is_partitioned(table):
+    return bool(_fetch(
+        """
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        """,
+        [table],
+    ))
+
+
+def monthly_partitions(table):
+    """{first day of month: partition table name} for a partitioned table."""
+    rows = _fetch(
+        """
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+        """,
+        [table],
+    )
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+# ============= CREATING PARTITIONS =============
+
+def create_partition(table, month):
+    """
+    Create the partition for `month` (a date in that month) if missing.
+    Rows for that month already sitting in the default partition are moved
+    into the new partition. Returns the partition name, or None if it existed.
+    """
+    month = month_start(month)
+    name = partition_name(table, month)
+    if month in monthly_partitions(table):
+        return None
+
+    lower = start_of_day(month)
+    upper = start_of_day(month + relativedelta(months=1))
+    default = default_partition_name(table)
+    key = _quote(PARTITION_KEY)
+
+    with transaction.atomic():
+        # Attaching scans the default partition for rows in the new range,
+        # so move them first
+        _execute(f'CREATE TABLE {_quote(name)} (LIKE {_quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        _execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {_quote(default)} WHERE {key} >= %s AND {key} < %s RETURNING *
+            )
+            INSERT INTO {_quote(name)} SELECT * FROM moved
+            """,
+            [lower, upper],
+        )
+        _execute(
+            f'ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(name)} FOR VALUES FROM (%s) TO (%s)',
+            [lower, upper],
+        )
+    return name
+
+
+def ensure_partitions(table, through=None):
+    """
+    Create monthly partitions from the current month through `through`
+    (default: ANALYTICS_PARTITION_PREMAKE_MONTHS ahead). Returns created names.
+    """
+    current = month_start(timezone.localdate())
+    if through is None:
+        through = current + relativedelta(months=premake_months())
+    created = []
+    month = current
+    while month <= through:
+        name = create_partition(table, month)
+        if name:
+            created.append(name)
+        month += relativedelta(months=1)
+    return created
+
+
+def partition_table(table):
+    """
+    Convert an existing plain table into a partitioned one, keeping its rows,
+    indexes, foreign keys and id sequence. Used by the analytics migration.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes (id, timestamp); ids stay unique through the sequence.
+    """
+    check_supported()
+    if is_partitioned(table):
+        return
+    old = f'{table}_unpartitioned'
+    key = _quote(PARTITION_KEY)
+    sequence = f'{table}_id_seq'
+
+    _execute(f'ALTER TABLE {_quote(table)} RENAME TO {_quote(old)}')
+    # Identity columns can't be copied to a partitioned table before
+    # PostgreSQL 17, so ids come from a plain sequence instead. Drop the old
+    # identity (or serial) sequence to free its name.
+    old_sequence = _fetch("SELECT pg_get_serial_sequence(%s, 'id')", [old])[0][0]
+    _execute(f'ALTER TABLE {_quote(old)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    _execute(f'ALTER TABLE {_quote(old)} ALTER COLUMN id DROP DEFAULT')
+    if old_sequence:
+        _execute(f'DROP SEQUENCE IF EXISTS {old_sequence}')
+
+    index_defs = _fetch(
+        """
+        SELECT i.indexname, i.indexdef FROM pg_indexes i
+        WHERE i.tablename = %s AND i.schemaname = current_schema()
+        AND i.indexname NOT IN (
+            SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+        )
+        """,
+        [old, old],
+    )
+    foreign_keys = _fetch(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [old],
+    )
+    primary_key = _fetch(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [old],
+    )
+
+    # Free the names so the new table can reuse them
+    for name, _ in index_defs:
+        _execute(f'DROP INDEX {_quote(name)}')
+    for name, _ in foreign_keys:
+        _execute(f'ALTER TABLE {_quote(old)} DROP CONSTRAINT {_quote(name)}')
+    for (name,) in primary_key:
+        _execute(f'ALTER TABLE {_quote(old)} DROP CONSTRAINT {_quote(name)}')
+
+    _execute(
+        f'CREATE TABLE {_quote(table)} '
+        f'(LIKE {_quote(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ({key})'
+    )
+    _execute(f'CREATE SEQUENCE {_quote(sequence)} OWNED BY {_quote(table)}.id')
+    _execute(f'ALTER TABLE {_quote(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)', [sequence])
+    pk_name = primary_key[0][0] if primary_key else f'{table}_pkey'
+    _execute(f'ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(pk_name)} PRIMARY KEY (id, {key})')
+    for name, definition in index_defs:
+        definition = re.sub(r' ON (\S+\.)?"?%s"? ' % re.escape(old), f' ON {_quote(table)} ', definition)
+        _execute(definition)
+    for name, definition in foreign_keys:
+        _execute(f'ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}')
+
+    _execute(f'CREATE TABLE {_quote(default_partition_name(table))} PARTITION OF {_quote(table)} DEFAULT')
+
+    first = _fetch(f'SELECT min({key}) FROM {_quote(old)}')[0][0]
+    start = month_start(timezone.localdate(first)) if first else month_start(timezone.localdate())
+    month = start
+    current = month_start(timezone.localdate())
+    while month <= current + relativedelta(months=premake_months()):
+        _execute(
+            f'CREATE TABLE {_quote(partition_name(table, month))} PARTITION OF {_quote(table)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [start_of_day(month), start_of_day(month + relativedelta(months=1))],
+        )
+        month += relativedelta(months=1)
+
+    _execute(f'INSERT INTO {_quote(table)} SELECT * FROM {_quote(old)}')
+    _execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {_quote(table)}",
+        [table],
+    )
+    _execute(f'DROP TABLE {_quote(old)}')
+
+
+# ============= RETENTION =============
+
+def retention_cutoff(months=None):
+    """
+    First day of the oldest month to keep, or None if nothing may be dropped.
+    Never later than the rollup watermark, so data that has not been rolled
+    up yet is always kept.
+    """
+    months = retention_months() if months is None else months
+    if not months:
+        return None
+    rolled_up = get_cutoff()
+    if rolled_up is None:
+        return None
+    cutoff = month_start(timezone.localdate()) - relativedelta(months=months)
+    return min(cutoff, month_start(rolled_up))
+
+
+def drop_old_partitions(table, cutoff, dry_run=False):
+    """Drop monthly partitions that end on or before `cutoff`. Returns names."""
+    dropped = []
+    for month, name in sorted(monthly_partitions(table).items()):
+        if month + relativedelta(months=1) <= cutoff:
+            if not dry_run:
+                _execute(f'DROP TABLE {_quote(name)}')
+            dropped.append(name)
+    return dropped
+
+
+def delete_old_rows(model, cutoff, dry_run=False):
+    """
+    Fallback without partitions: delete rows before `cutoff` in batches,
+    committing each batch.
+    """
+    queryset = model.objects.filter(**{f'{PARTITION_KEY}__lt': start_of_day(cutoff)})
+    if dry_run:
+        return queryset.count()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by().values_list('pk', flat=True)[:DELETE_BATCH_SIZE])
+            if not ids:
+                return deleted
+            deleted += model.objects.filter(pk__in=ids).delete()[0]
+
+
+def apply_retention(months=None, dry_run=False):
+    """
+    Enforce the retention policy on every partitioned model.
+    Returns {table: dropped partition names (PostgreSQL) or deleted row count}.
+    """
+    from .models import RollupState
+
+    cutoff = retention_cutoff(months)
+    if cutoff is None:
+        return {}
+    if not dry_run:
+        # Tell rollup rebuilds not to recompute days that have no raw rows
+        # left. Set first, so an interrupted run never leaves rollups to be
+        # rebuilt from half-deleted days.
+        RollupState.objects.update_or_create(
+            name=RETENTION_NAME,
+            defaults={'rolled_up_through': cutoff - timedelta(days=1)}
+        )
+    result = {}
+    for model in partitioned_models():
+        table = model._meta.db_table
+        if is_supported() and is_partitioned(table):
+            with transaction.atomic():
+                result[table] = drop_old_partitions(table, cutoff, dry_run=dry_run)
+        else:
+            result[table] = delete_old_rows(model, cutoff, dry_run=dry_run)
+    return result
@@ -0,0 +1,301 @@
+"""
+Daily rollups for the analytics dashboard.
+
+Raw PageView, CarView and Sale rows are aggregated per day into
+DailyPageStats, DailyCarViewStats and DailySalesStats by the
+`rollup_analytics` management command. RollupState records the last day
+that has been rolled up (the watermark).
+
+The query helpers below answer dashboard questions by reading rollups for
+days up to the watermark and raw rows only for the days after it, so their
+cost does not grow with the amount of retained raw history.
+
+Sales can be entered with a past sale_date, so signal handlers re-roll the
+affected days when a Sale is saved or deleted (see signals.py).
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    PageView,
+    CarView,
+    Sale,
+    DailyPageStats,
+    DailyCarViewStats,
+    DailySalesStats,
+    RollupState,
+)
+
+ROLLUP_NAME = 'daily'
+# Last day whose raw page/car views were dropped by the retention policy
+RETENTION_NAME = 'raw_views_dropped'
+
+
+def start_of_day(day):
+    """Aware datetime for midnight at the start of `day`."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_cutoff():
+    """
+    First day NOT covered by the rollups, or None if nothing is rolled up yet.
+    Everything on or after this day must be read from raw rows.
+    """
+    state = RollupState.objects.filter(name=ROLLUP_NAME).first()
+    if state is None:
+        return None
+    return state.rolled_up_through + timedelta(days=1)
+
+
+def get_raw_views_start():
+    """
+    First day that still has raw PageView/CarView rows after retention,
+    or None if nothing has been dropped.
+    """
+    state = RollupState.objects.filter(name=RETENTION_NAME).first()
+    if state is None:
+        return None
+    return state.rolled_up_through + timedelta(days=1)
+
+
+# ============= BUILDING ROLLUPS =============
+
+def earliest_raw_date():
+    """Earliest day that has any raw analytics data, or None."""
+    candidates = [
+        PageView.objects.aggregate(first=Min('timestamp'))['first'],
+        CarView.objects.aggregate(first=Min('timestamp'))['first'],
+    ]
+    days = [timezone.localdate(value) for value in candidates if value]
+    first_sale = Sale.objects.aggregate(first=Min('sale_date'))['first']
+    if first_sale:
+        days.append(first_sale)
+    return min(days) if days else None
+
+
+def rollup_sales_days(days):
+    """Recompute DailySalesStats for the given days from raw Sale rows."""
+    days = list(days)
+    if not days:
+        return
+    with transaction.atomic():
+        DailySalesStats.objects.filter(date__in=days).delete()
+        rows = (
+            Sale.objects.filter(sale_date__in=days)
+            .values('sale_date', 'car__category', 'car__brand', 'car__fuel_type', 'car__year')
+            .annotate(sales=Count('id'), revenue=Sum('sale_price'))
+        )
+        DailySalesStats.objects.bulk_create([
+            DailySalesStats(
+                date=row['sale_date'],
+                category_id=row['car__category'],
+                brand_id=row['car__brand'],
+                fuel_type=row['car__fuel_type'],
+                year=row['car__year'],
+                sales=row['sales'],
+                revenue=row['revenue'] or 0,
+            )
+            for row in rows
+        ])
+
+
+def rollup_range(start, end):
+    """
+    Recompute all daily rollups for days start..end (inclusive).
+    Safe to re-run: existing rollup rows in the range are replaced.
+    Page and car view rollups for days whose raw rows were dropped by the
+    retention policy are kept as they are.
+    """
+    views_start = max(start, get_raw_views_start() or start)
+    lower, upper = start_of_day(views_start), start_of_day(end + timedelta(days=1))
+
+    with transaction.atomic():
+        if views_start <= end:
+            DailyPageStats.objects.filter(date__range=(views_start, end)).delete()
+            page_rows = (
+                PageView.objects.filter(timestamp__gte=lower, timestamp__lt=upper)
+                .annotate(day=TruncDate('timestamp'))
+                .values('day', 'page_url')
+                .annotate(views=Count('id'))
+            )
+            DailyPageStats.objects.bulk_create([
+                DailyPageStats(date=row['day'], page_url=row['page_url'], views=row['views'])
+                for row in page_rows
+            ], batch_size=1000)
+
+            DailyCarViewStats.objects.filter(date__range=(views_start, end)).delete()
+            car_rows = (
+                CarView.objects.filter(timestamp__gte=lower, timestamp__lt=upper)
+                .annotate(day=TruncDate('timestamp'))
+                .values('day', 'car')
+                .annotate(views=Count('id'))
+            )
+            DailyCarViewStats.objects.bulk_create([
+                DailyCarViewStats(date=row['day'], car_id=row['car'], views=row['views'])
+                for row in car_rows
+            ], batch_size=1000)
+
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        rollup_sales_days(days)
+
+
+def advance_rollups(through=None, chunk_days=31):
+    """
+    Roll up every complete day after the watermark through `through`
+    (default: yesterday) and move the watermark forward.
+    Returns the (start, end) range processed, or None if already current.
+    """
+    through = through or timezone.localdate() - timedelta(days=1)
+    start = get_cutoff() or earliest_raw_date()
+    if start is None or start > through:
+        return None
+
+    chunk_start = start
+    while chunk_start <= through:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), through)
+        with transaction.atomic():
+            rollup_range(chunk_start, chunk_end)
+            RollupState.objects.update_or_create(
+                name=ROLLUP_NAME,
+                defaults={'rolled_up_through': chunk_end}
+            )
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return start, through
+
+
+# ============= READING ROLLUPS =============
+
+def _raw_since(since, cutoff):
+    """Start day for the raw part of a query, or None to read all raw rows."""
+    if cutoff is None:
+        return since
+    if since is None:
+        return cutoff
+    return max(since, cutoff)
+
+
+def _rolled(queryset, since, cutoff):
+    """Restrict a rollup queryset to since <= date < cutoff."""
+    if cutoff is None:
+        return queryset.none()
+    queryset = queryset.filter(date__lt=cutoff)
+    if since is not None:
+        queryset = queryset.filter(date__gte=since)
+    return queryset
+
+
+def page_view_total(since=None, cutoff=None):
+    """Number of page views on or after `since` (all time if None)."""
+    rolled = _rolled(DailyPageStats.objects, since, cutoff).aggregate(
+        total=Sum('views')
+    )['total'] or 0
+    raw = PageView.objects.all()
+    raw_since = _raw_since(since, cutoff)
+    if raw_since is not None:
+        raw = raw.filter(timestamp__gte=start_of_day(raw_since))
+    return rolled + raw.count()
+
+
+def popular_pages(limit=10, since=None, cutoff=None):
+    """Most viewed page URLs as [{'page_url', 'view_count'}]."""
+    counts = Counter()
+    rolled = _rolled(DailyPageStats.objects, since, cutoff).values('page_url').annotate(
+        total=Sum('views')
+    )
+    for row in rolled:
+        counts[row['page_url']] += row['total']
+
+    raw = PageView.objects.all()
+    raw_since = _raw_since(since, cutoff)
+    if raw_since is not None:
+        raw = raw.filter(timestamp__gte=start_of_day(raw_since))
+    for row in raw.values('page_url').annotate(total=Count('id')):
+        counts[row['page_url']] += row['total']
+
+    return [
+        {'page_url': page_url, 'view_count': views}
+        for page_url, views in counts.most_common(limit)
+    ]
+
+
+def car_view_counts(since=None, cutoff=None):
+    """Car views on or after `since` as a Counter of car_id -> views."""
+    counts = Counter()
+    rolled = _rolled(DailyCarViewStats.objects, since, cutoff).values('car').annotate(
+        total=Sum('views')
+    )
+    for row in rolled:
+        counts[row['car']] += row['total']
+
+    raw = CarView.objects.all()
+    raw_since = _raw_since(since, cutoff)
+    if raw_since is not None:
+        raw = raw.filter(timestamp__gte=start_of_day(raw_since))
+    for row in raw.values('car').annotate(total=Count('id')):
+        counts[row['car']] += row['total']
+    return counts
+
+
+def sales_summary(since=None, cutoff=None):
+    """Sales count and revenue on or after `since` as {'sales', 'revenue'}."""
+    rolled = _rolled(DailySalesStats.objects, since, cutoff).aggregate(
+        sales=Sum('sales'), revenue=Sum('revenue')
+    )
+    raw = Sale.objects.all()
+    raw_since = _raw_since(since, cutoff)
+    if raw_since is not None:
+        raw = raw.filter(sale_date__gte=raw_since)
+    raw = raw.aggregate(sales=Count('id'), revenue=Sum('sale_price'))
+    return {
+        'sales': (rolled['sales'] or 0) + raw['sales'],
+        'revenue': (rolled['revenue'] or Decimal('0')) + (raw['revenue'] or Decimal('0')),
+    }
+
+
+# Sales breakdown dimensions: rollup field -> raw Sale field
+SALES_DIMENSIONS = {
+    'category': ('category__name', 'car__category__name'),
+    'brand': ('brand__name', 'car__brand__name'),
+    'fuel_type': ('fuel_type', 'car__fuel_type'),
+    'year': ('year', 'car__year'),
+}
+
+
+def sales_breakdown(dimension, since=None, cutoff=None):
+    """
+    Sales count and revenue grouped by one of SALES_DIMENSIONS, as
+    {value: {'sales', 'revenue'}}. Cars without a category/brand are keyed by None.
+    One grouped query on the rollups plus one on the raw tail.
+    """
+    rolled_field, raw_field = SALES_DIMENSIONS[dimension]
+    totals = {}
+
+    def add(value, sales, revenue):
+        entry = totals.setdefault(value, {'sales': 0, 'revenue': Decimal('0')})
+        entry['sales'] += sales
+        entry['revenue'] += revenue or Decimal('0')
+
+    rolled = _rolled(DailySalesStats.objects, since, cutoff).values(rolled_field).annotate(
+        total_sales=Sum('sales'), total_revenue=Sum('revenue')
+    )
+    for row in rolled:
+        add(row[rolled_field], row['total_sales'], row['total_revenue'])
+
+    raw = Sale.objects.all()
+    raw_since = _raw_since(since, cutoff)
+    if raw_since is not None:
+        raw = raw.filter(sale_date__gte=raw_since)
+    for row in raw.values(raw_field).annotate(
+        total_sales=Count('id'), total_revenue=Sum('sale_price')
+    ):
+        add(row[raw_field], row['total_sales'], row['total_revenue'])
+
+    return totals
@@ -70,13 +70,19 @@ class SaleSerializer(serializers.ModelSerializer):
         decimal_places=2,
         read_only=True
     )
+    # Computed in SQL by Sale.objects.with_profit()
+    maintenance_cost = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    gross_margin = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    net_margin = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    net_margin_pct = serializers.DecimalField(max_digits=9, decimal_places=2, read_only=True)
 
     class Meta:
         model = Sale
         fields = [
             'id', 'car', 'car_details', 'sale_price', 'sale_date',
             'customer_name', 'customer_email', 'customer_phone',
-            'notes', 'profit_margin', 'created_at'
+            'notes', 'profit_margin', 'maintenance_cost', 'gross_margin',
+            'net_margin', 'net_margin_pct', 'created_at'
         ]
         read_only_fields = ['id', 'profit_margin', 'created_at']
 
@@ -0,0 +1,41 @@
+"""
+Signal handlers for the Analytics app.
+
+Keeps the daily sales rollups correct when a Sale is created, edited or
+deleted for a day that has already been rolled up.
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Sale
+from .rollups import get_cutoff, rollup_sales_days
+
+
+@receiver(pre_save, sender=Sale)
+def remember_previous_sale_date(sender, instance, **kwargs):
+    """Store the sale date before an edit so the old day can be re-rolled."""
+    instance._previous_sale_date = None
+    if instance.pk:
+        instance._previous_sale_date = (
+            Sale.objects.filter(pk=instance.pk).values_list('sale_date', flat=True).first()
+        )
+
+
+def _reroll_sale_days(*days):
+    cutoff = get_cutoff()
+    if cutoff is None:
+        return
+    rollup_sales_days({day for day in days if day and day < cutoff})
+
+
+@receiver(post_save, sender=Sale)
+def update_sales_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _reroll_sale_days(instance.sale_date, getattr(instance, '_previous_sale_date', None))
+
+
+@receiver(post_delete, sender=Sale)
+def update_sales_rollup_on_delete(sender, instance, **kwargs):
+    _reroll_sale_days(instance.sale_date)
@@ -0,0 +1,91 @@
+"""
+Tests for batched event ingestion.
+"""
+
+import json
+
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.analytics.models import DailyPageVisitors, PageView
+from apps.analytics.views import record_events
+from apps.analytics.visitors import page_visitor_buffer, unique_page_visitors
+
+
+class PageVisitorBufferingTests(TestCase):
+    """Event batches don't touch the visitor sketches until the buffer flushes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        page_visitor_buffer.flush()
+
+    def post_events(self, session_id, urls):
+        response = self.client.post(
+            '/api/analytics/events/',
+            {'session_id': session_id, 'events': [{'type': 'page_view', 'url': url} for url in urls]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 202)
+
+    def test_sketches_are_written_on_flush(self):
+        self.post_events('a', ['/cars', '/about'])
+        self.post_events('b', ['/cars'])
+
+        self.assertEqual(PageView.objects.count(), 3)
+        self.assertFalse(DailyPageVisitors.objects.exists())
+
+        self.assertEqual(page_visitor_buffer.flush(), 3)
+        self.assertEqual(unique_page_visitors(), 2)
+        self.assertEqual(unique_page_visitors(page_url='/cars'), 2)
+        self.assertEqual(unique_page_visitors(page_url='/about'), 1)
+
+
+@override_settings(ANALYTICS_EVENTS_MAX_BYTES=1000, ANALYTICS_EVENTS_MAX_BATCH=50)
+class EventLimitTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        page_visitor_buffer.flush()
+        # Write what the requests buffered while this test's transaction is open
+        self.addCleanup(page_visitor_buffer.flush)
+        # Forget earlier tests' requests counted by the throttle
+        caches['default'].clear()
+
+    def body(self, count, url='/cars'):
+        return json.dumps({'events': [{'type': 'page_view', 'url': url}] * count})
+
+    def post(self, body, **extra):
+        return self.client.generic('POST', '/api/analytics/events/', body, content_type='application/json', **extra)
+
+    def test_rejects_large_body(self):
+        self.assertEqual(self.post(self.body(40)).status_code, 413)
+        self.assertFalse(PageView.objects.exists())
+
+    def test_rejects_large_body_without_content_length(self):
+        # Under ASGI a chunked body is read in full with no Content-Length
+        request = RequestFactory().post('/api/analytics/events/', self.body(40), content_type='application/json')
+        del request.META['CONTENT_LENGTH']
+
+        response = record_events(request)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(PageView.objects.exists())
+
+    @override_settings(ANALYTICS_EVENTS_MAX_BYTES=65536)
+    def test_rejects_too_many_events(self):
+        self.assertEqual(self.post(self.body(51)).status_code, 413)
+        self.assertEqual(self.post(self.body(50)).status_code, 202)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+        },
+        ANALYTICS_EVENTS_THROTTLE_CACHE='throttle',
+    )
+    def test_throttle_uses_the_configured_cache(self):
+        self.assertEqual(self.post(self.body(1)).status_code, 202)
+
+        self.assertEqual(len(caches['throttle'].get('throttle_analytics_events_127.0.0.1')), 1)
+        self.assertIsNone(caches['default'].get('throttle_analytics_events_127.0.0.1'))
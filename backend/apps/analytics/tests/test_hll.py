@@ -0,0 +1,48 @@
+"""
+Tests for the HyperLogLog unique-visitor sketches.
+"""
+
+from django.test import SimpleTestCase
+
+from apps.analytics.hll import REGISTERS, STANDARD_ERROR, HyperLogLog, merged
+
+
+def sketch(visitors):
+    return HyperLogLog().update(f'visitor-{n}' for n in visitors)
+
+
+class HyperLogLogTests(SimpleTestCase):
+
+    def test_estimate_is_within_the_documented_error(self):
+        # About 95% of estimates fall within two standard errors; the hash is
+        # deterministic, so these cardinalities always give the same estimate
+        for count in (100, 1000, 10000, 50000):
+            with self.subTest(count=count):
+                estimate = sketch(range(count)).count()
+                self.assertLessEqual(abs(estimate - count), 2 * STANDARD_ERROR * count)
+
+    def test_small_counts_are_nearly_exact(self):
+        self.assertEqual(HyperLogLog().count(), 0)
+        self.assertEqual(sketch(range(10)).count(), 10)
+        self.assertEqual(sketch([1, 1, 2, 2, 2]).count(), 2)
+
+    def test_merge_is_the_union(self):
+        first, second = sketch(range(0, 3000)), sketch(range(2000, 5000))
+
+        union = first.merge(second)
+
+        self.assertEqual(union.registers, sketch(range(5000)).registers)
+        self.assertEqual(
+            merged([sketch(range(0, 3000)).to_bytes(), sketch(range(2000, 5000)).to_bytes()]).registers,
+            union.registers,
+        )
+
+    def test_serialization_round_trips(self):
+        for original in (HyperLogLog(), sketch(range(50)), sketch(range(20000))):
+            with self.subTest(count=original.count()):
+                data = original.to_bytes()
+                restored = HyperLogLog.from_bytes(data)
+                self.assertEqual(restored.registers, original.registers)
+                self.assertEqual(restored.count(), original.count())
+        self.assertEqual(HyperLogLog.from_bytes(b'').registers, bytearray(REGISTERS))
+        self.assertLess(len(sketch(range(50)).to_bytes()), REGISTERS // 4)
@@ -0,0 +1,55 @@
+"""
+Tests for the analytics data migrations.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from apps.cars.tests.factories import create_car
+
+
+class SalesRollupDimensionsMigrationTests(TransactionTestCase):
+    """0003 rebuilds the sales rollups with the new dimensions and keeps the watermarks."""
+
+    before = [('analytics', '0002_daily_rollups')]
+    after = [('analytics', '0003_sales_rollup_dimensions')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_rebuilds_sales_rollups_up_to_the_watermark(self):
+        apps = self.migrate(self.before)
+        Sale = apps.get_model('analytics', 'Sale')
+        RollupState = apps.get_model('analytics', 'RollupState')
+        DailySalesStats = apps.get_model('analytics', 'DailySalesStats')
+
+        # Only the analytics app is migrated back; cars keeps its current schema
+        car = create_car(year=2019, fuel_type='hybrid')
+        for day in (date(2026, 1, 1), date(2026, 1, 1), date(2026, 1, 3)):
+            Sale.objects.create(car_id=car.pk, sale_price=Decimal('14000'), sale_date=day, customer_name='Customer')
+        DailySalesStats.objects.create(date=date(2026, 1, 1), sales=2, revenue=Decimal('28000'))
+        RollupState.objects.create(name='daily', rolled_up_through=date(2026, 1, 2))
+        RollupState.objects.create(name='raw_views_dropped', rolled_up_through=date(2025, 6, 30))
+
+        apps = self.migrate(self.after)
+        RollupState = apps.get_model('analytics', 'RollupState')
+        DailySalesStats = apps.get_model('analytics', 'DailySalesStats')
+
+        self.assertEqual(
+            dict(RollupState.objects.values_list('name', 'rolled_up_through')),
+            {'daily': date(2026, 1, 2), 'raw_views_dropped': date(2025, 6, 30)},
+        )
+        self.assertEqual(
+            list(DailySalesStats.objects.values('date', 'fuel_type', 'year', 'sales', 'revenue')),
+            [{'date': date(2026, 1, 1), 'fuel_type': 'hybrid', 'year': 2019, 'sales': 2, 'revenue': Decimal('28000')}],
+        )
@@ -0,0 +1,116 @@
+"""
+Tests for raw analytics partitioning and retention.
+
+The partitioning tests need PostgreSQL (TEST_DB_ENGINE=postgresql pytest)
+and are skipped on SQLite.
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from dateutil.relativedelta import relativedelta
+from django.db import DatabaseError, connection
+from django.db.models.query import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics import partitions
+from apps.analytics.models import CarView, PageView, RollupState
+from apps.analytics.rollups import RETENTION_NAME, ROLLUP_NAME, start_of_day
+
+original_delete = QuerySet.delete
+
+
+def old_page_views(count, day):
+    views = PageView.objects.bulk_create([
+        PageView(page_url='/cars', visitor_ip='10.0.0.1') for _ in range(count)
+    ])
+    PageView.objects.filter(pk__in=[view.pk for view in views]).update(timestamp=start_of_day(day))
+    return views
+
+
+class DeleteOldRowsTests(TestCase):
+    """Without partitions, retention deletes in batches, committing each one."""
+
+    def test_deletes_only_rows_before_the_cutoff(self):
+        cutoff = date(2025, 1, 1)
+        old_page_views(5, cutoff - timedelta(days=1))
+        kept = old_page_views(2, cutoff)
+
+        with mock.patch.object(partitions, 'DELETE_BATCH_SIZE', 2):
+            deleted = partitions.delete_old_rows(PageView, cutoff)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(
+            set(PageView.objects.values_list('pk', flat=True)),
+            {view.pk for view in kept},
+        )
+
+    def test_a_failed_batch_keeps_the_batches_before_it(self):
+        RollupState.objects.create(name=ROLLUP_NAME, rolled_up_through=timezone.localdate())
+        old_page_views(6, timezone.localdate() - relativedelta(years=2))
+        batches = []
+
+        def delete(queryset):
+            batches.append(queryset)
+            if len(batches) == 2:
+                raise DatabaseError('lost connection')
+            return original_delete(queryset)
+
+        with mock.patch.object(partitions, 'DELETE_BATCH_SIZE', 2), \
+                mock.patch.object(QuerySet, 'delete', delete), \
+                self.assertRaises(DatabaseError):
+            partitions.apply_retention(months=1)
+
+        self.assertEqual(PageView.objects.count(), 4)
+        self.assertTrue(RollupState.objects.filter(name=RETENTION_NAME).exists())
+
+
+class PostgresPartitionTests(TestCase):
+
+    def setUp(self):
+        if not partitions.is_supported():
+            self.skipTest('Partitioning requires PostgreSQL')
+
+    def test_tables_are_partitioned_with_a_working_id_sequence(self):
+        for model in (PageView, CarView):
+            table = model._meta.db_table
+            with self.subTest(table):
+                self.assertTrue(partitions.is_partitioned(table))
+                self.assertIn(partitions.month_start(timezone.localdate()), partitions.monthly_partitions(table))
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+                    self.assertIsNotNone(cursor.fetchone()[0])
+
+        first = PageView.objects.create(page_url='/a', visitor_ip='10.0.0.1')
+        second = PageView.objects.create(page_url='/b', visitor_ip='10.0.0.1')
+        self.assertGreater(second.pk, first.pk)
+
+    def test_new_partition_takes_rows_from_the_default_partition(self):
+        table = PageView._meta.db_table
+        month = partitions.month_start(timezone.localdate()) + relativedelta(years=5)
+        views = old_page_views(3, month)
+
+        name = partitions.create_partition(table, month)
+
+        self.assertEqual(name, partitions.partition_name(table, month))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {connection.ops.quote_name(name)}')
+            self.assertEqual(cursor.fetchone()[0], len(views))
+        self.assertEqual(PageView.objects.filter(timestamp__gte=start_of_day(month)).count(), 3)
+
+    def test_old_partitions_are_dropped(self):
+        table = PageView._meta.db_table
+        month = partitions.month_start(timezone.localdate()) - relativedelta(years=5)
+        partitions.create_partition(table, month)
+        old_page_views(2, month)
+
+        dropped = partitions.drop_old_partitions(table, month + relativedelta(months=1))
+
+        self.assertIn(partitions.partition_name(table, month), dropped)
+        self.assertFalse(PageView.objects.filter(timestamp__lt=start_of_day(month + relativedelta(months=1))).exists())
+
+    def test_older_servers_are_rejected(self):
+        with mock.patch.object(partitions, 'MIN_POSTGRES_VERSION', connection.pg_version + 10000), \
+                self.assertRaisesMessage(Exception, 'requires PostgreSQL'):
+            partitions.partition_table(PageView._meta.db_table)
@@ -0,0 +1,31 @@
+"""
+Sale lists must not run queries per sale (see apps/core/pytest_plugin.py).
+Data fixtures are listed before query_check so their setup is not captured.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from apps.analytics.models import Sale
+from apps.cars.tests.factories import create_cars
+
+
+@pytest.fixture
+def sales(db):
+    return [
+        Sale.objects.create(
+            car=car, sale_price=Decimal('22000.00'), sale_date=date(2026, 3, 1), customer_name='Customer'
+        )
+        for car in create_cars(10, price=Decimal('20000.00'))
+    ]
+
+
+def test_sale_list_profit_margin(sales, admin_api_client, query_check):
+    response = admin_api_client.get('/api/analytics/admin/sales/')
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == 10
+    assert [sale['profit_margin'] for sale in results] == ['10.00'] * 10
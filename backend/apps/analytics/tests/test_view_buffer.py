@@ -0,0 +1,134 @@
+"""
+Tests for the car view write-behind buffer.
+"""
+
+import time
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+from apps.analytics.models import CarView
+from apps.analytics.view_buffer import CarViewBuffer, WriteBehindBuffer
+from apps.cars.tests.factories import create_car
+
+
+class ListBuffer(WriteBehindBuffer):
+    """Buffer that "writes" to a list, so the flush thread needs no database."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.written = []
+
+    def _empty(self):
+        return []
+
+    def record(self, item):
+        with self._lock:
+            self._pending.append(item)
+            should_flush = self._added(1)
+        self._after_record(should_flush)
+
+    def _merge(self, pending, drained):
+        pending[:0] = drained
+
+    def _write(self, pending):
+        self.written.extend(pending)
+
+
+class CarViewBufferTests(TestCase):
+
+    def setUp(self):
+        self.car = create_car(views_count=0)
+
+    def test_flushes_when_full(self):
+        buffer = CarViewBuffer(flush_size=3, flush_interval=3600)
+        for _ in range(3):
+            buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+
+        self.assertEqual(len(buffer), 0)
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.views_count, 3)
+        self.assertEqual(CarView.objects.filter(car=self.car).count(), 3)
+
+    def test_failed_flush_does_not_fail_the_request(self):
+        buffer = CarViewBuffer(flush_size=2, flush_interval=3600)
+        with mock.patch.object(CarViewBuffer, '_write', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.analytics.view_buffer', 'ERROR'):
+            buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+            buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+
+        # Kept for the next flush
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(buffer.flush(), 2)
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.views_count, 2)
+
+    def test_explicit_flush_raises(self):
+        buffer = CarViewBuffer(flush_size=100, flush_interval=3600)
+        buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+        with mock.patch.object(CarViewBuffer, '_write', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.analytics.view_buffer', 'ERROR'), \
+                self.assertRaises(DatabaseError):
+            buffer.flush()
+        self.assertEqual(len(buffer), 1)
+
+
+class FailingDatabaseTests(TestCase):
+    """While flushes fail, requests don't retry them and the buffer stays bounded."""
+
+    def setUp(self):
+        self.car = create_car(views_count=0)
+
+    def test_requests_stop_flushing_and_overflow_is_dropped(self):
+        buffer = CarViewBuffer(flush_size=2, flush_interval=3600, max_buffered=5)
+        with mock.patch.object(CarViewBuffer, '_write', side_effect=DatabaseError('down')) as write, \
+                self.assertLogs('apps.analytics.view_buffer', 'ERROR') as logs:
+            for _ in range(8):
+                buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+
+        # One failed flush, then no more from the request path
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(buffer.dropped, 3)
+        self.assertTrue(any('dropping new ones' in line for line in logs.output))
+
+        with self.assertLogs('apps.analytics.view_buffer', 'WARNING') as logs:
+            self.assertEqual(buffer.flush(), 5)
+        self.assertIn('Dropped 3 car views', logs.output[0])
+        self.assertEqual(buffer.dropped, 0)
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.views_count, 5)
+
+        # Requests flush again once the database is back
+        buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+        buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+        self.assertEqual(len(buffer), 0)
+
+    def test_retries_back_off(self):
+        buffer = CarViewBuffer(flush_size=100, flush_interval=10)
+        buffer.record(self.car.pk, visitor_ip='10.0.0.1')
+        delays = []
+        with mock.patch.object(CarViewBuffer, '_write', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.analytics.view_buffer', 'ERROR'):
+            for _ in range(8):
+                now = time.monotonic()
+                buffer.flush_quietly()
+                delays.append(round(buffer._retry_at - now))
+
+        self.assertEqual(delays, [10, 20, 40, 80, 160, 300, 300, 300])
+
+
+class FlushThreadTests(TestCase):
+
+    def test_idle_buffer_is_flushed_by_the_thread(self):
+        buffer = ListBuffer(flush_size=100, flush_interval=1)
+        buffer.record('a')
+        buffer.record('b')
+
+        deadline = time.monotonic() + 5
+        while not buffer.written and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        self.assertEqual(buffer.written, ['a', 'b'])
+        self.assertEqual(len(buffer), 0)
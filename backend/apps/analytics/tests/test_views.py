@@ -0,0 +1,108 @@
+"""
+Tests for the Analytics API views.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.analytics.models import Inquiry, PageView, Sale
+from apps.analytics.views import monthly_sales_trend
+from apps.analytics.visitors import record_page_visitors, visitor_id
+from apps.cars.tests.factories import create_cars
+
+
+def create_sale(car, sale_date, price='20000.00'):
+    return Sale.objects.create(car=car, sale_price=Decimal(price), sale_date=sale_date, customer_name='Customer')
+
+
+class AnalyticsOverviewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_data(self, count):
+        today = timezone.now().date()
+        for car in create_cars(count):
+            create_sale(car, today)
+            Inquiry.objects.create(car=car, name='Visitor', email='visitor@example.com', message='Is it available?')
+
+    def get_overview(self):
+        response = self.client.get('/api/analytics/admin/overview/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_is_bounded(self):
+        # The count does not grow with the number of cars, sales or inquiries
+        for count in (2, 15):
+            self.add_data(count)
+            with self.subTest(count=count), self.assertNumQueries(8):
+                data = self.get_overview()
+            self.assertEqual(len(data['recent_inquiries']), 5 if count > 2 else 2)
+        self.assertEqual(data['cars_sold_this_month'], 17)
+        self.assertEqual(data['total_inquiries'], 17)
+
+
+class MonthlySalesTrendTests(TestCase):
+
+    def test_groups_sales_by_calendar_month_across_year_boundary(self):
+        car = create_cars(1)[0]
+        create_sale(car, date(2025, 10, 31), '1.00')   # before the window
+        create_sale(car, date(2025, 11, 1), '10.00')
+        create_sale(car, date(2025, 11, 30), '20.00')
+        create_sale(car, date(2025, 12, 31), '30.00')
+        create_sale(car, date(2026, 1, 1), '40.00')
+        create_sale(car, date(2026, 2, 28), '50.00')
+        create_sale(car, date(2026, 3, 1), '1.00')     # after the window
+
+        trend = monthly_sales_trend(date(2026, 2, 1), months=4)
+
+        self.assertEqual(trend, [
+            {'month': 'Nov 2025', 'sales': 2, 'revenue': 30.0},
+            {'month': 'Dec 2025', 'sales': 1, 'revenue': 30.0},
+            {'month': 'Jan 2026', 'sales': 1, 'revenue': 40.0},
+            {'month': 'Feb 2026', 'sales': 1, 'revenue': 50.0},
+        ])
+
+    def test_months_without_sales_are_zero(self):
+        trend = monthly_sales_trend(date(2026, 1, 1), months=2)
+
+        self.assertEqual(trend, [
+            {'month': 'Dec 2025', 'sales': 0, 'revenue': 0.0},
+            {'month': 'Jan 2026', 'sales': 0, 'revenue': 0.0},
+        ])
+
+
+class PageViewStatsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def visit(self, page_url, visitor_ip, times=1):
+        for _ in range(times):
+            PageView.objects.create(page_url=page_url, visitor_ip=visitor_ip)
+        record_page_visitors([(page_url, visitor_id(visitor_ip))] * times)
+
+    def test_popular_pages_include_unique_visitors(self):
+        self.visit('/cars', '10.0.0.1', times=3)
+        self.visit('/cars', '10.0.0.2', times=2)
+        self.visit('/about', '10.0.0.1')
+
+        response = self.client.get('/api/analytics/admin/page-views/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['popular_pages'], [
+            {'page_url': '/cars', 'view_count': 5, 'unique_visitors': 2},
+            {'page_url': '/about', 'view_count': 1, 'unique_visitors': 1},
+        ])
+        self.assertEqual(response.json()['unique_visitors']['today'], 2)
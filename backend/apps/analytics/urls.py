@@ -8,6 +8,7 @@ from . import views
 urlpatterns = [
     # Public endpoints
     path('inquiries/', views.InquiryCreateView.as_view(), name='inquiry-create'),
+    path('events/', views.record_events, name='analytics-events'),
 
     # Admin endpoints
     path('admin/inquiries/', views.AdminInquiryListView.as_view(), name='admin-inquiry-list'),
@@ -21,4 +22,5 @@ urlpatterns = [
     path('admin/car-views/', views.car_views_stats, name='analytics-car-views'),
     path('admin/inquiries-stats/', views.inquiries_stats, name='analytics-inquiries-stats'),
     path('admin/sales-stats/', views.sales_stats, name='analytics-sales-stats'),
+    path('admin/profitability/', views.profitability, name='analytics-profitability'),
 ]
@@ -0,0 +1,292 @@
+"""
+Write-behind buffer for car view counting.
+
+Recording a car view used to read the Car row, rewrite views_count and insert
+a CarView row on every hit. Instead, views are collected in memory and flushed
+in batches:
+- one UPDATE ... SET views_count = views_count + n per distinct increment
+- one bulk_create of CarView rows
+- one merge of the visitors into the day's unique-visitor sketches
+
+A flush happens when the buffer holds CAR_VIEW_FLUSH_SIZE views, every
+CAR_VIEW_FLUSH_INTERVAL seconds from a daemon thread (so a worker that stops
+getting traffic still writes what it holds), and on process exit. Buffers are
+per process; the thread is started by the first view recorded in a process,
+so forked workers each get their own.
+
+A failed flush is logged and its views are put back for the next attempt; it
+never fails the request that triggered it. While the database is failing,
+requests stop triggering flushes: only the flush thread retries, with
+exponential backoff (up to MAX_RETRY_DELAY seconds). The buffer holds at most
+CAR_VIEW_MAX_BUFFERED views; views recorded beyond that are dropped, counted
+and logged, so an outage cannot exhaust the worker's memory.
+
+Note: CarView.timestamp is auto_now_add, so buffered rows are stamped with the
+flush time, which is at most CAR_VIEW_FLUSH_INTERVAL seconds late.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 300  # seconds
+
+
+class WriteBehindBuffer:
+    """
+    Thread-safe, in-process buffer flushed by size, by age and on a timer.
+
+    Subclasses hold their pending data in `self._pending` (built by `_empty()`),
+    add to it under `self._lock` when `self._has_room(n)`, followed by
+    `self._added(n)`, and implement `_merge()` and `_write()`.
+    """
+    description = 'items'
+    size_setting = None
+    interval_setting = None
+    max_setting = None
+    default_size = 100
+    default_interval = 10
+    default_max = 10000
+
+    def __init__(self, flush_size=None, flush_interval=None, max_buffered=None):
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        self._count = 0
+        self._oldest = None
+        self._timer_pid = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._dropped = 0
+
+    @property
+    def flush_size(self):
+        if self._flush_size is not None:
+            return self._flush_size
+        return getattr(settings, self.size_setting, self.default_size)
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return getattr(settings, self.interval_setting, self.default_interval)
+
+    @property
+    def max_buffered(self):
+        if self._max_buffered is not None:
+            return self._max_buffered
+        return getattr(settings, self.max_setting, self.default_max)
+
+    @property
+    def dropped(self):
+        """Items dropped because the buffer was full, since the last successful flush."""
+        return self._dropped
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    # ============= SUBCLASS HOOKS =============
+
+    def _empty(self):
+        raise NotImplementedError
+
+    def _merge(self, pending, drained):
+        """Put `drained` back into `pending` after a failed flush."""
+        raise NotImplementedError
+
+    def _write(self, pending):
+        raise NotImplementedError
+
+    # ============= RECORDING =============
+
+    def _has_room(self, count):
+        """
+        Whether `count` more items fit; if not they are counted as dropped.
+        Call with the lock held.
+        """
+        if self._count + count <= self.max_buffered:
+            return True
+        if not self._dropped:
+            logger.error(
+                '%s full (%d buffered %s); dropping new ones until a flush succeeds',
+                type(self).__name__, self._count, self.description,
+            )
+        self._dropped += count
+        return False
+
+    def _added(self, count):
+        """
+        Account for `count` new items and tell whether the caller should
+        flush. Never while flushes are failing: the flush thread retries then.
+        Call with the lock held.
+        """
+        self._count += count
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        return not self._failures and (
+            self._count >= self.flush_size
+            or time.monotonic() - self._oldest >= self.flush_interval
+        )
+
+    def _after_record(self, should_flush):
+        self._start_timer()
+        if should_flush:
+            self.flush_quietly()
+
+    def _start_timer(self):
+        """Start the flush thread in this process if it isn't running yet."""
+        pid = os.getpid()
+        if self._timer_pid == pid:
+            return
+        with self._lock:
+            if self._timer_pid == pid:
+                return
+            self._timer_pid = pid
+        threading.Thread(
+            target=self._run_timer,
+            name=f'{type(self).__name__}-flush',
+            daemon=True,
+        ).start()
+
+    def _run_timer(self):
+        while True:
+            time.sleep(max(1, self.flush_interval))
+            if len(self) and time.monotonic() >= self._retry_at:
+                self.flush_quietly()
+                # This thread's connections would otherwise stay open forever
+                connections.close_all()
+
+    # ============= FLUSHING =============
+
+    def _drain(self):
+        """Take everything pending and reset the buffer."""
+        with self._lock:
+            pending, count = self._pending, self._count
+            self._pending, self._count, self._oldest = self._empty(), 0, None
+        return pending, count
+
+    def _requeue(self, pending, count):
+        """Put drained items back after a failed flush."""
+        with self._lock:
+            self._merge(self._pending, pending)
+            self._count += count
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def flush(self):
+        """
+        Write everything pending to the database.
+        Returns the number of items written; raises if the write failed.
+        """
+        pending, count = self._drain()
+        if not count:
+            return 0
+        try:
+            self._write(pending)
+        except Exception:
+            logger.exception('Failed to flush %d buffered %s', count, self.description)
+            self._requeue(pending, count)
+            with self._lock:
+                self._failures += 1
+                delay = self.flush_interval * 2 ** (self._failures - 1)
+                self._retry_at = time.monotonic() + min(delay, MAX_RETRY_DELAY)
+            raise
+
+        with self._lock:
+            self._failures, self._retry_at = 0, 0.0
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            logger.warning('Dropped %d %s while the buffer was full', dropped, self.description)
+        return count
+
+    def flush_quietly(self):
+        """Flush, logging (not raising) errors. Returns the number written."""
+        try:
+            return self.flush()
+        except Exception:
+            return 0
+
+
+class CarViewBuffer(WriteBehindBuffer):
+    """
+    Pending car views: a Counter of views per car plus the CarView rows.
+    """
+    description = 'car views'
+    size_setting = 'CAR_VIEW_FLUSH_SIZE'
+    interval_setting = 'CAR_VIEW_FLUSH_INTERVAL'
+    max_setting = 'CAR_VIEW_MAX_BUFFERED'
+
+    def _empty(self):
+        return {'counts': Counter(), 'views': []}
+
+    def record(self, car_id, visitor_ip='', session_id=''):
+        """
+        Queue a view of a car. Flushes if the size or age limit is reached.
+        """
+        with self._lock:
+            if not self._has_room(1):
+                return
+            self._pending['counts'][car_id] += 1
+            self._pending['views'].append({
+                'car_id': car_id,
+                'visitor_ip': visitor_ip,
+                'session_id': session_id,
+            })
+            should_flush = self._added(1)
+        self._after_record(should_flush)
+
+    def _merge(self, pending, drained):
+        pending['counts'].update(drained['counts'])
+        pending['views'][:0] = drained['views']
+
+    def _write(self, pending):
+        from apps.cars import inventory
+        from apps.cars.models import Car
+        from .models import CarView
+        from .visitors import record_car_visitors, visitor_id
+
+        counts, views = pending['counts'], pending['views']
+        with transaction.atomic():
+            # Cars deleted since the view was recorded are dropped
+            existing = set(
+                Car.objects.filter(pk__in=list(counts)).values_list('pk', flat=True)
+            )
+
+            # Group cars by increment so equal increments share one UPDATE
+            by_increment = defaultdict(list)
+            for car_id, count in counts.items():
+                if car_id in existing:
+                    by_increment[count].append(car_id)
+            for count, car_ids in by_increment.items():
+                Car.objects.filter(pk__in=car_ids).update(
+                    views_count=F('views_count') + count
+                )
+                inventory.add_views(car_ids, count)
+
+            CarView.objects.bulk_create([
+                CarView(**view) for view in views if view['car_id'] in existing
+            ])
+            record_car_visitors(
+                (view['car_id'], visitor_id(view['visitor_ip'], view['session_id']))
+                for view in views if view['car_id'] in existing
+            )
+
+
+car_view_buffer = CarViewBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    car_view_buffer.flush_quietly()
@@ -3,18 +3,31 @@ API Views for the Analytics app.
 """
 
 from rest_framework import generics, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, throttle_classes
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.db.models import Count, Sum
+from rest_framework.throttling import SimpleRateThrottle
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
-from datetime import timedelta
-from .models import PageView, CarView, Inquiry, Sale
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from .models import CarView, Inquiry, Sale
 from .serializers import (
     InquirySerializer,
     InquiryCreateSerializer,
     SaleSerializer
 )
 from apps.cars.models import Car
+from . import rollups, visitors
+from .hll import STANDARD_ERROR
+from .events import ingest_events
+from apps.core.routers import read_replica
+
+UNCATEGORIZED = 'Uncategorized'
+UNBRANDED = 'Unbranded'
 
 
 # ============= PUBLIC VIEWS =============
@@ -28,6 +41,73 @@ class InquiryCreateView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
 
+class BeaconJSONParser(JSONParser):
+    """
+    JSON sent as text/plain. navigator.sendBeacon can only send CORS-safelisted
+    content types without a preflight request.
+    """
+    media_type = 'text/plain'
+
+
+class EventsRateThrottle(SimpleRateThrottle):
+    """
+    Per-IP rate limit for event batches, for anonymous and logged-in users alike.
+    Counts are kept in the ANALYTICS_EVENTS_THROTTLE_CACHE cache; with a
+    per-process cache (locmem) each worker enforces the rate on its own.
+    """
+    scope = 'analytics_events'
+
+    @property
+    def cache(self):
+        return caches[settings.ANALYTICS_EVENTS_THROTTLE_CACHE]
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+@parser_classes([JSONParser, BeaconJSONParser])
+@throttle_classes([EventsRateThrottle])
+def record_events(request):
+    """
+    Record a batch of page-view and car-view events (see apps.analytics.events).
+    POST /api/analytics/events/
+
+    Rate limited per IP by the 'analytics_events' throttle scope. Bodies over
+    ANALYTICS_EVENTS_MAX_BYTES or with more than ANALYTICS_EVENTS_MAX_BATCH
+    events are rejected without being stored.
+    """
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    # The header check rejects large bodies without reading them; chunked
+    # bodies carry no Content-Length, so the body itself is measured too
+    if (
+        content_length > settings.ANALYTICS_EVENTS_MAX_BYTES
+        or len(request.body) > settings.ANALYTICS_EVENTS_MAX_BYTES
+    ):
+        return Response({'error': 'Payload too large'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    events = request.data.get('events') if isinstance(request.data, dict) else None
+    if not isinstance(events, list):
+        return Response({'error': 'Expected an "events" list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(events) > settings.ANALYTICS_EVENTS_MAX_BATCH:
+        return Response(
+            {'error': f'At most {settings.ANALYTICS_EVENTS_MAX_BATCH} events per request'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    result = ingest_events(
+        events,
+        visitor_ip=request.META.get('REMOTE_ADDR', ''),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        session_id=request.data.get('session_id') or request.session.session_key or '',
+    )
+    return Response(result, status=status.HTTP_202_ACCEPTED)
+
+
 # ============= ADMIN VIEWS =============
 
 class AdminInquiryListView(generics.ListAPIView):
@@ -52,29 +132,53 @@ class AdminInquiryDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAdminUser]
 
 
-class AdminSaleListCreateView(generics.ListCreateAPIView):
+class ProfitAnnotatedSaleMixin:
+    """
+    Sales annotated with margins (Sale.objects.with_profit()). Saved sales
+    are re-read with the annotations so responses include the margins.
+    """
+    queryset = Sale.objects.with_profit().select_related('car')
+
+    def perform_create(self, serializer):
+        serializer.save()
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+
+class AdminSaleListCreateView(ProfitAnnotatedSaleMixin, generics.ListCreateAPIView):
     """
     Admin endpoint to list or create sales.
     GET /api/admin/sales/
     POST /api/admin/sales/
+
+    Query parameters:
+    - ordering: sale_date, sale_price, created_at, gross_margin,
+      gross_margin_pct, net_margin or net_margin_pct (prefix - to reverse).
+      Margin orderings use page numbers; ?cursor= needs a model field.
     """
-    queryset = Sale.objects.all().select_related('car')
     serializer_class = SaleSerializer
     permission_classes = [permissions.IsAdminUser]
+    ordering_fields = [
+        'sale_date', 'sale_price', 'created_at',
+        'gross_margin', 'gross_margin_pct', 'net_margin', 'net_margin_pct'
+    ]
 
 
-class AdminSaleDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminSaleDetailView(ProfitAnnotatedSaleMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Admin endpoint to get, update, or delete a sale.
     GET /api/admin/sales/{id}/
     PUT /api/admin/sales/{id}/
     DELETE /api/admin/sales/{id}/
     """
-    queryset = Sale.objects.all()
     serializer_class = SaleSerializer
     permission_classes = [permissions.IsAdminUser]
 
 
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def analytics_overview(request):
@@ -85,27 +189,25 @@ def analytics_overview(request):
     # Calculate date ranges
     today = timezone.now().date()
     first_day_of_month = today.replace(day=1)
-    last_month = (first_day_of_month - timedelta(days=1)).replace(day=1)
-
-    # Total cars
-    total_cars = Car.objects.count()
-    available_cars = Car.objects.filter(status='available').count()
-    sold_cars = Car.objects.filter(status='sold').count()
-
-    # Sales this month
-    sales_this_month = Sale.objects.filter(
-        sale_date__gte=first_day_of_month
-    ).count()
-
-    # Revenue this month
-    revenue_this_month = Sale.objects.filter(
-        sale_date__gte=first_day_of_month
-    ).aggregate(
-        total=Sum('sale_price')
-    )['total'] or 0
-
-    # Pending inquiries
-    pending_inquiries = Inquiry.objects.filter(status='new').count()
+    cutoff = rollups.get_cutoff()
+
+    # Car counts (one query)
+    car_counts = Car.objects.aggregate(
+        total=Count('id'),
+        available=Count('id', filter=Q(status=Car.STATUS_AVAILABLE)),
+        sold=Count('id', filter=Q(status=Car.STATUS_SOLD))
+    )
+
+    # Inquiry counts (one query)
+    inquiry_counts = Inquiry.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status=Inquiry.STATUS_NEW))
+    )
+
+    # Sales trend (last 6 calendar months); the last bucket is this month
+    sales_trend = monthly_sales_trend(first_day_of_month, months=6)
+    sales_this_month = sales_trend[-1]['sales']
+    revenue_this_month = sales_trend[-1]['revenue']
 
     # Most viewed cars (top 10)
     popular_cars = Car.objects.order_by('-views_count')[:10]
@@ -124,42 +226,54 @@ def analytics_overview(request):
 
     # Recent inquiries (last 5)
     recent_inquiries = Inquiry.objects.select_related('car').order_by('-created_at')[:5]
-    from .serializers import InquirySerializer
     recent_inquiries_data = InquirySerializer(recent_inquiries, many=True).data
 
-    # Sales trend (last 6 months)
-    sales_trend = []
-    for i in range(5, -1, -1):
-        month_date = first_day_of_month - timedelta(days=30 * i)
-        next_month = (month_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-
-        sales = Sale.objects.filter(
-            sale_date__gte=month_date,
-            sale_date__lt=next_month
-        )
-
-        sales_trend.append({
-            'month': month_date.strftime('%b %Y'),
-            'sales': sales.count(),
-            'revenue': float(sales.aggregate(total=Sum('sale_price'))['total'] or 0)
-        })
-
     return Response({
-        'total_cars': total_cars,
-        'total_views': PageView.objects.count(),
-        'total_inquiries': Inquiry.objects.count(),
-        'total_sales': Sale.objects.count(),
-        'available_cars': available_cars,
-        'sold_cars': sold_cars,
+        'total_cars': car_counts['total'],
+        'total_views': rollups.page_view_total(cutoff=cutoff),
+        'total_inquiries': inquiry_counts['total'],
+        'total_sales': rollups.sales_summary(cutoff=cutoff)['sales'],
+        'available_cars': car_counts['available'],
+        'sold_cars': car_counts['sold'],
         'cars_sold_this_month': sales_this_month,
-        'total_revenue_this_month': float(revenue_this_month),
-        'pending_inquiries': pending_inquiries,
+        'total_revenue_this_month': revenue_this_month,
+        'pending_inquiries': inquiry_counts['pending'],
         'popular_cars': popular_cars_data,
         'recent_inquiries': recent_inquiries_data,
         'sales_trend': sales_trend
     })
 
 
+def monthly_sales_trend(last_month_start, months=6):
+    """
+    Sales count and revenue per calendar month for the `months` months
+    ending with the month starting at `last_month_start`.
+    Computed with a single grouped query; months without sales are zero-filled.
+    """
+    window_start = last_month_start - relativedelta(months=months - 1)
+    window_end = last_month_start + relativedelta(months=1)
+
+    rows = (
+        Sale.objects.filter(sale_date__gte=window_start, sale_date__lt=window_end)
+        .annotate(month=TruncMonth('sale_date'))
+        .values('month')
+        .annotate(sales=Count('id'), revenue=Sum('sale_price'))
+    )
+    by_month = {row['month']: row for row in rows}
+
+    trend = []
+    for i in range(months):
+        month_date = window_start + relativedelta(months=i)
+        row = by_month.get(month_date, {})
+        trend.append({
+            'month': month_date.strftime('%b %Y'),
+            'sales': row.get('sales', 0),
+            'revenue': float(row.get('revenue') or 0)
+        })
+    return trend
+
+
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def page_views_stats(request):
@@ -167,33 +281,38 @@ def page_views_stats(request):
     Admin endpoint to get page view statistics.
     GET /api/admin/analytics/page-views/
     """
-    total_views = PageView.objects.count()
     today = timezone.now().date()
-    views_today = PageView.objects.filter(
-        timestamp__date=today
-    ).count()
-    views_this_week = PageView.objects.filter(
-        timestamp__gte=today - timedelta(days=7)
-    ).count()
-    views_this_month = PageView.objects.filter(
-        timestamp__month=today.month,
-        timestamp__year=today.year
-    ).count()
-
-    # Most visited pages
-    popular_pages = PageView.objects.values('page_url').annotate(
-        view_count=Count('id')
-    ).order_by('-view_count')[:10]
+    cutoff = rollups.get_cutoff()
+    total_views = rollups.page_view_total(cutoff=cutoff)
+    views_today = rollups.page_view_total(since=today, cutoff=cutoff)
+    views_this_week = rollups.page_view_total(since=today - timedelta(days=7), cutoff=cutoff)
+    views_this_month = rollups.page_view_total(since=today.replace(day=1), cutoff=cutoff)
+
+    # Most visited pages, with their approximate unique visitors
+    popular_pages = rollups.popular_pages(limit=10, cutoff=cutoff)
+    page_visitors = visitors.unique_visitors_by_page(page['page_url'] for page in popular_pages)
+    for page in popular_pages:
+        page['unique_visitors'] = page_visitors[page['page_url']]
+
+    # Approximate unique visitors (HyperLogLog, see apps.analytics.hll)
+    unique_visitors = {
+        'today': visitors.unique_page_visitors(since=today),
+        'this_week': visitors.unique_page_visitors(since=today - timedelta(days=7)),
+        'this_month': visitors.unique_page_visitors(since=today.replace(day=1)),
+        'relative_error': STANDARD_ERROR,
+    }
 
     return Response({
         'total_views': total_views,
         'views_today': views_today,
         'views_this_week': views_this_week,
         'views_this_month': views_this_month,
-        'popular_pages': list(popular_pages)
+        'unique_visitors': unique_visitors,
+        'popular_pages': popular_pages
     })
 
 
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def car_views_stats(request):
@@ -213,24 +332,58 @@ def car_views_stats(request):
         'views': car.views_count
     } for car in most_viewed]
 
-    # Views by category
-    from apps.cars.models import Category
-    views_by_category = []
-    for category in Category.objects.all():
-        total_views = Car.objects.filter(category=category).aggregate(
-            total=Sum('views_count')
-        )['total'] or 0
-        views_by_category.append({
-            'category': category.name,
-            'views': total_views
-        })
+    # Views by category, brand, fuel type and year (one grouped query each)
+    views_by_category = inventory_breakdown('category__name', 'category', UNCATEGORIZED)
+    views_by_brand = inventory_breakdown('brand__name', 'brand', UNBRANDED)
+    views_by_fuel_type = inventory_breakdown('fuel_type', 'fuel_type')
+    views_by_year = inventory_breakdown('year', 'year')
+
+    # Trending cars (most views in the last 7 days)
+    today = timezone.now().date()
+    week_counts = rollups.car_view_counts(since=today - timedelta(days=7), cutoff=rollups.get_cutoff())
+    top_week = week_counts.most_common(10)
+    trending_cars = Car.objects.in_bulk([car_id for car_id, _ in top_week])
+    week_visitors = visitors.unique_car_visitors(trending_cars, since=today - timedelta(days=7))
+    trending_data = [{
+        'car': {
+            'id': str(trending_cars[car_id].id),
+            'make': trending_cars[car_id].make,
+            'model': trending_cars[car_id].model,
+            'year': trending_cars[car_id].year
+        },
+        'views': views,
+        'unique_visitors': week_visitors[car_id]
+    } for car_id, views in top_week if car_id in trending_cars]
 
     return Response({
         'most_viewed_cars': most_viewed_data,
-        'views_by_category': views_by_category
+        'views_by_category': views_by_category,
+        'views_by_brand': views_by_brand,
+        'views_by_fuel_type': views_by_fuel_type,
+        'views_by_year': views_by_year,
+        'trending_cars': trending_data,
+        # Relative standard error of the approximate unique_visitors counts
+        'unique_visitors_error': STANDARD_ERROR
     })
 
 
+def inventory_breakdown(field, label, empty_label=None):
+    """
+    Car count and total views grouped by a Car field, in a single query.
+    Cars with no value for the field are reported under `empty_label`.
+    """
+    rows = Car.objects.values(field).annotate(
+        cars=Count('id'),
+        views=Sum('views_count')
+    ).order_by(F(field).asc(nulls_last=True))
+    return [{
+        label: row[field] if row[field] is not None else empty_label,
+        'cars': row['cars'],
+        'views': row['views'] or 0
+    } for row in rows]
+
+
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def inquiries_stats(request):
@@ -256,6 +409,7 @@ def inquiries_stats(request):
     })
 
 
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def sales_stats(request):
@@ -263,35 +417,107 @@ def sales_stats(request):
     Admin endpoint to get sales statistics.
     GET /api/admin/analytics/sales/
     """
-    total_sales = Sale.objects.count()
-    total_revenue = Sale.objects.aggregate(
-        total=Sum('sale_price')
-    )['total'] or 0
+    cutoff = rollups.get_cutoff()
+    totals = rollups.sales_summary(cutoff=cutoff)
+    total_sales = totals['sales']
+    total_revenue = totals['revenue']
 
     # Average sale price
-    from django.db.models import Avg
-    avg_price = Sale.objects.aggregate(
-        avg=Avg('sale_price')
-    )['avg'] or 0
-
-    # Sales by category
-    from apps.cars.models import Category
-    sales_by_category = []
-    for category in Category.objects.all():
-        category_sales = Sale.objects.filter(car__category=category).aggregate(
-            count=Count('id'),
-            revenue=Sum('sale_price')
-        )
-        if category_sales['count']:
-            sales_by_category.append({
-                'category': category.name,
-                'sales': category_sales['count'],
-                'revenue': float(category_sales['revenue'] or 0)
-            })
+    avg_price = total_revenue / total_sales if total_sales else 0
+
+    # Sales by category, brand, fuel type and year
+    sales_by_category = sales_breakdown_data('category', cutoff, UNCATEGORIZED)
+    sales_by_brand = sales_breakdown_data('brand', cutoff, UNBRANDED)
+    sales_by_fuel_type = sales_breakdown_data('fuel_type', cutoff)
+    sales_by_year = sales_breakdown_data('year', cutoff)
 
     return Response({
         'total_sales': total_sales,
         'total_revenue': float(total_revenue),
         'average_sale_price': float(avg_price),
-        'sales_by_category': sales_by_category
+        'sales_by_category': sales_by_category,
+        'sales_by_brand': sales_by_brand,
+        'sales_by_fuel_type': sales_by_fuel_type,
+        'sales_by_year': sales_by_year
+    })
+
+
+def sales_breakdown_data(dimension, cutoff, empty_label=None):
+    """
+    Sales count and revenue per value of `dimension`, sorted by value.
+    Sales of cars with no value are reported under `empty_label`.
+    """
+    breakdown = rollups.sales_breakdown(dimension, cutoff=cutoff)
+    known = sorted(value for value in breakdown if value is not None)
+    values = known + ([None] if None in breakdown else [])
+    return [{
+        dimension: value if value is not None else empty_label,
+        'sales': breakdown[value]['sales'],
+        'revenue': float(breakdown[value]['revenue'])
+    } for value in values if breakdown[value]['sales']]
+
+
+# Profitability grouping: ?group_by value -> (Sale field, response key, label for empty values)
+PROFIT_GROUPS = {
+    'brand': ('car__brand__name', 'brand', UNBRANDED),
+    'category': ('car__category__name', 'category', UNCATEGORIZED),
+    'month': ('month', 'month', None),
+}
+
+
+def profit_row(row):
+    """Convert a profit summary row for the JSON response."""
+    data = {'sales': row['sales']}
+    for name in ('revenue', 'list_value', 'maintenance_cost', 'gross_margin', 'net_margin'):
+        data[name] = float(row[name] or 0)
+    for name in ('gross_margin_pct', 'net_margin_pct'):
+        data[name] = round(row[name], 2) if row[name] is not None else None
+    return data
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def profitability(request):
+    """
+    Admin endpoint to get gross and net margins grouped by brand, category or month.
+    GET /api/admin/analytics/profitability/
+
+    Query parameters:
+    - group_by: brand (default), category or month
+    - since, until: optional sale_date bounds (YYYY-MM-DD, inclusive)
+
+    Gross margin is sale price minus list price; net margin also subtracts
+    the car's maintenance costs. Everything is aggregated in the database.
+    """
+    group_by = request.query_params.get('group_by', 'brand')
+    if group_by not in PROFIT_GROUPS:
+        return Response(
+            {'error': f'group_by must be one of: {", ".join(PROFIT_GROUPS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    sales = Sale.objects.all()
+    for param, lookup in (('since', 'sale_date__gte'), ('until', 'sale_date__lte')):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                day = date.fromisoformat(value)
+            except ValueError:
+                return Response({'error': f'Invalid {param} date'}, status=status.HTTP_400_BAD_REQUEST)
+            sales = sales.filter(**{lookup: day})
+
+    field, key, empty_label = PROFIT_GROUPS[group_by]
+    grouped = sales.annotate(month=TruncMonth('sale_date')) if group_by == 'month' else sales
+    groups = []
+    for row in grouped.profit_summary(field):
+        value = row[field]
+        if group_by == 'month':
+            value = value.strftime('%Y-%m')
+        groups.append({key: value if value is not None else empty_label, **profit_row(row)})
+
+    return Response({
+        'group_by': group_by,
+        'totals': profit_row(sales.profit_summary()),
+        'groups': groups
     })
@@ -0,0 +1,157 @@
+"""
+Unique-visitor counting with per-day HyperLogLog sketches.
+
+Every ingested page view and car view adds its visitor (session id, or IP
+address without one) to the day's sketch for that page or car, plus the
+site-wide page sketch. Counts for a date range merge the daily sketches, so
+no COUNT(DISTINCT ...) over the raw tables is needed and counts survive the
+raw-data retention policy. Estimates carry hll.STANDARD_ERROR relative error.
+
+Page visitors from ingested events go through `page_visitor_buffer` rather
+than straight to the database: every event batch would otherwise lock the
+day's site-wide row, serializing all ingestion on it. The buffer merges
+visitors in memory and writes each process's share once per
+PAGE_VISITOR_FLUSH_INTERVAL seconds (see view_buffer.py). Car visitors are
+already written in batches by the car view buffer.
+"""
+
+import atexit
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .hll import HyperLogLog, merged
+from .models import DailyPageVisitors, DailyCarVisitors
+from .view_buffer import WriteBehindBuffer
+
+
+def visitor_id(visitor_ip, session_id=''):
+    """Identity used for unique counting: the session if known, else the IP."""
+    return f's:{session_id}' if session_id else f'ip:{visitor_ip}'
+
+
+def _add_visitors(model, key_field, visitors_by_key, day):
+    """
+    Add visitors to the day's sketches, one row per key.
+    Rows are locked while merging so concurrent batches don't lose updates.
+    """
+    if not visitors_by_key:
+        return
+    keys = list(visitors_by_key)
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [model(date=day, sketch=HyperLogLog().to_bytes(), **{key_field: key}) for key in keys],
+            ignore_conflicts=True,
+        )
+        rows = list(
+            model.objects.select_for_update()
+            .filter(date=day, **{f'{key_field}__in': keys})
+        )
+        for row in rows:
+            sketch = HyperLogLog.from_bytes(row.sketch)
+            sketch.update(visitors_by_key[getattr(row, key_field)])
+            row.sketch = sketch.to_bytes()
+        model.objects.bulk_update(rows, ['sketch'])
+
+
+def _group_page_visitors(visits, by_page):
+    for page_url, visitor in visits:
+        by_page[page_url].add(visitor)
+        by_page[DailyPageVisitors.SITE_WIDE].add(visitor)
+
+
+def record_page_visitors(visits, day=None):
+    """Add (page_url, visitor_id) pairs to today's page and site-wide sketches."""
+    by_page = defaultdict(set)
+    _group_page_visitors(visits, by_page)
+    _add_visitors(DailyPageVisitors, 'page_url', by_page, day or timezone.localdate())
+
+
+class PageVisitorBuffer(WriteBehindBuffer):
+    """
+    Pending page visitors as {day: {page_url: set of visitor ids}}.
+    """
+    description = 'page visits'
+    size_setting = 'PAGE_VISITOR_FLUSH_SIZE'
+    interval_setting = 'PAGE_VISITOR_FLUSH_INTERVAL'
+    max_setting = 'PAGE_VISITOR_MAX_BUFFERED'
+    default_size = 1000
+    default_max = 100000
+
+    def _empty(self):
+        return defaultdict(lambda: defaultdict(set))
+
+    def record(self, visits):
+        """Queue (page_url, visitor_id) pairs seen today."""
+        visits = list(visits)
+        if not visits:
+            return
+        day = timezone.localdate()
+        with self._lock:
+            if not self._has_room(len(visits)):
+                return
+            _group_page_visitors(visits, self._pending[day])
+            should_flush = self._added(len(visits))
+        self._after_record(should_flush)
+
+    def _merge(self, pending, drained):
+        for day, by_page in drained.items():
+            for page_url, visitors in by_page.items():
+                pending[day][page_url] |= visitors
+
+    def _write(self, pending):
+        with transaction.atomic():
+            for day, by_page in pending.items():
+                _add_visitors(DailyPageVisitors, 'page_url', by_page, day)
+
+
+page_visitor_buffer = PageVisitorBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    page_visitor_buffer.flush_quietly()
+
+
+def record_car_visitors(visits, day=None):
+    """Add (car_id, visitor_id) pairs to today's car sketches. Cars must exist."""
+    by_car = defaultdict(set)
+    for car_id, visitor in visits:
+        by_car[car_id].add(visitor)
+    _add_visitors(DailyCarVisitors, 'car_id', by_car, day or timezone.localdate())
+
+
+def _in_range(queryset, since, until):
+    if since is not None:
+        queryset = queryset.filter(date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(date__lte=until)
+    return queryset
+
+
+def unique_page_visitors(since=None, until=None, page_url=DailyPageVisitors.SITE_WIDE):
+    """Estimated unique visitors of a page (default: the whole site) in a date range."""
+    sketches = _in_range(DailyPageVisitors.objects.filter(page_url=page_url), since, until)
+    return merged(sketches.values_list('sketch', flat=True).iterator()).count()
+
+
+def _unique_visitors_by(model, key_field, keys, since, until):
+    """Merge each key's sketches in a date range in one query; {key: count}."""
+    keys = list(keys)
+    sketches = defaultdict(HyperLogLog)
+    rows = _in_range(model.objects.filter(**{f'{key_field}__in': keys}), since, until)
+    for key, data in rows.values_list(key_field, 'sketch').iterator():
+        sketches[key].merge(HyperLogLog.from_bytes(data))
+    return {key: sketches[key].count() for key in keys}
+
+
+def unique_visitors_by_page(page_urls, since=None, until=None):
+    """Estimated unique visitors per page in a date range, as {page_url: count}."""
+    return _unique_visitors_by(DailyPageVisitors, 'page_url', page_urls, since, until)
+
+
+def unique_car_visitors(car_ids, since=None, until=None):
+    """Estimated unique visitors per car in a date range, as {car_id: count}."""
+    return _unique_visitors_by(DailyCarVisitors, 'car_id', car_ids, since, until)
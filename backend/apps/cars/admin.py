@@ -10,6 +10,7 @@ This configures the Django admin interface for managing:
 
 from django.contrib import admin
 from .models import Category, Brand, Car, CarImage
+from . import cache, inventory
 
 
 @admin.register(Category)
@@ -103,17 +104,26 @@ class CarAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark selected cars as Available')
     def mark_as_available(self, request, queryset):
+        car_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(status=Car.STATUS_AVAILABLE)
+        inventory.refresh_cars(car_ids)
+        cache.bump_version('car')
         self.message_user(request, f'{updated} cars marked as Available.')
 
     @admin.action(description='Mark selected cars as Sold')
     def mark_as_sold(self, request, queryset):
+        car_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(status=Car.STATUS_SOLD)
+        inventory.refresh_cars(car_ids)
+        cache.bump_version('car')
         self.message_user(request, f'{updated} cars marked as Sold.')
 
     @admin.action(description='Mark selected cars as Featured')
     def mark_as_featured(self, request, queryset):
+        car_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_featured=True)
+        inventory.refresh_cars(car_ids)
+        cache.bump_version('car')
         self.message_user(request, f'{updated} cars marked as Featured.')
 
 
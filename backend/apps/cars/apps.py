@@ -5,3 +5,6 @@ class CarsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.cars'
     verbose_name = 'Cars Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,171 @@
+"""
+Bulk create and update for cars (admin bulk API).
+
+Each item is validated with CarBulkItemSerializer, which performs no queries
+of its own. Cross-row checks run once for the whole batch:
+- one query for VINs that already belong to other cars (plus duplicates
+  within the batch)
+- one query each for the referenced categories and brands
+- for updates, one query to load the cars being updated
+
+If any item is invalid nothing is written and the errors are returned in
+request order (an empty dict for valid items). Otherwise all rows are
+written with bulk_create/bulk_update in a single transaction.
+
+bulk_create/bulk_update don't send post_save, so the search vectors and
+catalog cache version are refreshed here.
+"""
+
+import uuid
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, inventory
+from .models import Category, Brand, Car
+from .search import SEARCH_WEIGHTS, update_search_vectors
+from .serializers import CarBulkItemSerializer
+
+FOREIGN_KEYS = {'category': Category, 'brand': Brand}
+
+
+class BulkValidationError(Exception):
+    """Raised with per-item errors when a bulk request has invalid items."""
+
+    def __init__(self, errors):
+        super().__init__('Invalid items')
+        self.errors = errors
+
+
+def _validate_items(items, instances=None):
+    """
+    Run the per-item serializer. Returns (validated_data list, errors list).
+    `instances` maps each item's position to the car being updated (partial).
+    """
+    validated, errors = [], []
+    for index, item in enumerate(items):
+        instance = instances.get(index) if instances is not None else None
+        serializer = CarBulkItemSerializer(instance, data=item, partial=instance is not None)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+            errors.append({})
+        else:
+            validated.append(None)
+            errors.append(dict(serializer.errors))
+    return validated, errors
+
+
+def _check_batch(validated, errors, own_ids=None):
+    """Check VIN uniqueness and foreign keys for all valid items at once."""
+    own_ids = own_ids or [None] * len(validated)
+    vins = [data['vin'] for data in validated if data and 'vin' in data]
+
+    duplicates = {vin for vin, count in Counter(vins).items() if count > 1}
+    taken = dict(Car.objects.filter(vin__in=vins).values_list('vin', 'id')) if vins else {}
+
+    for field, model in FOREIGN_KEYS.items():
+        ids = {data[field] for data in validated if data and data.get(field) is not None}
+        existing = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+        for data, item_errors in zip(validated, errors):
+            if data and data.get(field) is not None and data[field] not in existing:
+                item_errors[field] = [f'Invalid pk "{data[field]}" - object does not exist.']
+
+    for data, item_errors, own_id in zip(validated, errors, own_ids):
+        if not data or 'vin' not in data:
+            continue
+        if data['vin'] in duplicates:
+            item_errors['vin'] = ['This VIN appears more than once in the request.']
+        elif data['vin'] in taken and taken[data['vin']] != own_id:
+            item_errors['vin'] = ['A car with this VIN already exists.']
+
+
+def _apply(car, data):
+    for field, value in data.items():
+        if field == 'id':
+            continue
+        if field in FOREIGN_KEYS:
+            setattr(car, f'{field}_id', value)
+        else:
+            setattr(car, field, value)
+
+
+def _after_write(cars, fields):
+    if set(fields) & set(SEARCH_WEIGHTS):
+        update_search_vectors(Car.objects.filter(pk__in=[car.pk for car in cars]))
+    inventory.refresh_cars([car.pk for car in cars])
+    cache.bump_version('car')
+
+
+def bulk_create_cars(items):
+    """Create cars from a list of dicts. Returns the created cars."""
+    validated, errors = _validate_items(items)
+    _check_batch(validated, errors)
+    if any(errors):
+        raise BulkValidationError(errors)
+
+    cars = []
+    for data in validated:
+        car = Car()
+        _apply(car, data)
+        cars.append(car)
+
+    with transaction.atomic():
+        Car.objects.bulk_create(cars)
+        _after_write(cars, SEARCH_WEIGHTS)
+    return cars
+
+
+def _parse_id(item):
+    try:
+        return uuid.UUID(str(item['id']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def bulk_update_cars(items):
+    """
+    Partially update cars from a list of dicts that each carry an `id`.
+    Only fields present in at least one item are written. Returns the cars.
+    """
+    ids = [_parse_id(item) for item in items]
+    existing = Car.objects.in_bulk([pk for pk in ids if pk]) if any(ids) else {}
+
+    instances, id_errors, seen = {}, {}, set()
+    for index, pk in enumerate(ids):
+        if pk is None:
+            id_errors[index] = {'id': ['A valid car id is required.']}
+        elif pk not in existing:
+            id_errors[index] = {'id': [f'Car "{pk}" not found.']}
+        elif pk in seen:
+            id_errors[index] = {'id': ['This car appears more than once in the request.']}
+        else:
+            instances[index] = existing[pk]
+        seen.add(pk)
+
+    validated, errors = _validate_items(items, instances)
+    for index, item_errors in id_errors.items():
+        validated[index] = None
+        errors[index] = item_errors
+
+    _check_batch(validated, errors, own_ids=ids)
+    if any(errors):
+        raise BulkValidationError(errors)
+
+    cars, fields = [], set()
+    now = timezone.now()
+    for index, data in enumerate(validated):
+        car = instances[index]
+        _apply(car, data)
+        car.updated_at = now
+        cars.append(car)
+        fields.update(field for field in data if field != 'id')
+
+    if not fields:
+        return cars
+
+    columns = sorted(f'{field}_id' if field in FOREIGN_KEYS else field for field in fields)
+    with transaction.atomic():
+        Car.objects.bulk_update(cars, columns + ['updated_at'])
+        _after_write(cars, fields)
+    return cars
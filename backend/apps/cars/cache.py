@@ -0,0 +1,187 @@
+"""
+Versioned response cache for the public catalog endpoints.
+
+Rendered responses are stored in the 'catalog' cache (see CACHES in
+settings) under a key built from:
+- the view name and request path
+- the normalized query string and negotiated media type
+- the current "catalog version" of every model the view depends on
+
+Versions are bumped by signal handlers whenever a Car, CarImage, Category or
+Brand is saved or deleted (see signals.py), so stale entries are never read
+again and simply expire. Responses carry an ETag and honour If-None-Match.
+
+Use a shared backend (file-based or Redis) in production so that a version
+bump in one worker invalidates the cache for all of them.
+
+With read replicas, a response read from a replica within
+REPLICA_PIN_SECONDS of a bump is not stored (see apps/core/routers.py), so
+the new version is not filled from a replica that has not caught up with the
+write yet.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.response import Response
+
+from apps.core.routers import reading_from_replicas
+
+CACHE_ALIAS = 'catalog'
+VERSION_KEY = 'catalog:version:{model}'
+BUMPED_AT_KEY = 'catalog:bumped_at'
+HITS_KEY = 'catalog:stats:hits'
+MISSES_KEY = 'catalog:stats:misses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def is_enabled():
+    return getattr(settings, 'CATALOG_CACHE_ENABLED', True)
+
+
+def _incr(key, delta=1):
+    cache = get_cache()
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Missing key: start from a value that cannot collide with versions
+        # used before an eviction.
+        initial = int(time.time() * 1000) if key.startswith('catalog:version:') else delta
+        cache.add(key, initial, timeout=None)
+        return initial
+
+
+def get_versions(models):
+    """Current version number of each model name, as a dict."""
+    cache = get_cache()
+    keys = {model: VERSION_KEY.format(model=model) for model in models}
+    found = cache.get_many(list(keys.values()))
+    versions = {}
+    for model, key in keys.items():
+        versions[model] = found.get(key) or _incr(key, 0)
+    return versions
+
+
+def bump_version(model):
+    """Invalidate every cached response that depends on `model`."""
+    _incr(VERSION_KEY.format(model=model))
+    get_cache().set(BUMPED_AT_KEY, time.time(), timeout=None)
+
+
+def replica_may_lag():
+    """Whether a read from a replica may predate the last version bump."""
+    if not reading_from_replicas():
+        return False
+    bumped_at = get_cache().get(BUMPED_AT_KEY) or 0
+    return time.time() - bumped_at < settings.REPLICA_PIN_SECONDS
+
+
+def record_hit():
+    _incr(HITS_KEY)
+
+
+def record_miss():
+    _incr(MISSES_KEY)
+
+
+def stats():
+    """Hit/miss counters for the catalog cache."""
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = values.get(HITS_KEY, 0), values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def normalize_query(query_params):
+    """Query string with keys and values sorted, so equivalent URLs share a key."""
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        for value in values
+    )
+    return urlencode(items)
+
+
+def make_etag(content):
+    return '"%s"' % hashlib.md5(content).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = {value.strip() for value in header.split(',')}
+    return etag in candidates or '*' in candidates
+
+
+class CatalogCacheMixin:
+    """
+    Caches GET responses of a public catalog view.
+    Set `cache_models` to the model names whose changes invalidate the view.
+    """
+    cache_models = ()
+
+    def get_catalog_cache_key(self, request):
+        versions = get_versions(self.cache_models)
+        parts = [
+            self.__class__.__name__,
+            request.path,
+            normalize_query(request.query_params),
+            request.accepted_media_type or '',
+            ','.join(f'{model}={versions[model]}' for model in self.cache_models),
+        ]
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'catalog:response:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        self._catalog_cache_key = None
+        if not is_enabled():
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_catalog_cache_key(request)
+        entry = get_cache().get(key)
+        if entry is None:
+            record_miss()
+            self._catalog_cache_key = key
+            return super().get(request, *args, **kwargs)
+
+        record_hit()
+        if etag_matches(request, entry['etag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_catalog_cache_key', None)
+        if key is None or not isinstance(response, Response) or response.status_code != 200:
+            return response
+
+        response.render()
+        etag = make_etag(response.content)
+        if not replica_may_lag():
+            get_cache().set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': etag,
+            })
+        response['ETag'] = etag
+        response['X-Cache'] = 'MISS'
+        if etag_matches(request, etag):
+            not_modified = HttpResponseNotModified()
+            not_modified['ETag'] = etag
+            not_modified['X-Cache'] = 'MISS'
+            return not_modified
+        return response
@@ -0,0 +1,114 @@
+"""
+Facet counts for the inventory filter panel.
+
+For each facet (make, fuel type, transmission, category, brand, year bucket,
+price bucket) the available cars are filtered with every CarFilter parameter
+EXCEPT the facet's own, then counted in a single grouped query. That way the
+panel shows how many cars each option would return if selected.
+
+Counts read the AvailableCar projection (see inventory.py), which carries
+the category and brand names, so no query joins another table.
+"""
+
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django_filters.utils import translate_validation
+
+from .filters import AvailableCarFilter
+from .models import AvailableCar
+from .search import CarSearchFilter
+
+YEAR_BUCKET_SIZE = 5
+PRICE_BUCKETS = [0, 10000, 20000, 30000, 50000, 75000, 100000]
+
+# facet name -> CarFilter parameters that belong to it
+FACET_PARAMS = {
+    'make': ['make'],
+    'fuel_type': ['fuel_type'],
+    'transmission': ['transmission'],
+    'category': ['category'],
+    'brand': ['brand'],
+    'year': ['year_min', 'year_max'],
+    'price': ['price_min', 'price_max'],
+}
+
+
+def _price_bucket_expression():
+    whens = [
+        When(price__gte=lower, price__lt=upper, then=Value(index))
+        for index, (lower, upper) in enumerate(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]))
+    ]
+    return Case(*whens, default=Value(len(PRICE_BUCKETS) - 1), output_field=IntegerField())
+
+
+def _price_bucket(index):
+    lower = PRICE_BUCKETS[index]
+    upper = PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None
+    label = f'{lower}-{upper}' if upper is not None else f'{lower}+'
+    return {'value': label, 'min': lower, 'max': upper}
+
+
+def _grouped_counts(queryset, facet):
+    """Counts per value of one facet, as a list of dicts."""
+    if facet == 'category':
+        rows = queryset.values('category', 'category_name').annotate(count=Count('id'))
+        return [
+            {'value': row['category'], 'label': row['category_name'], 'count': row['count']}
+            for row in rows.order_by('-count', 'category_name')
+        ]
+    if facet == 'brand':
+        rows = queryset.values('brand', 'brand_name').annotate(count=Count('id'))
+        return [
+            {'value': row['brand'], 'label': row['brand_name'], 'count': row['count']}
+            for row in rows.order_by('-count', 'brand_name')
+        ]
+    if facet == 'year':
+        bucket = Cast(F('year') / YEAR_BUCKET_SIZE, IntegerField()) * YEAR_BUCKET_SIZE
+        rows = queryset.annotate(bucket=bucket).values('bucket').annotate(count=Count('id'))
+        return [
+            {
+                'value': f"{row['bucket']}-{row['bucket'] + YEAR_BUCKET_SIZE - 1}",
+                'min': row['bucket'],
+                'max': row['bucket'] + YEAR_BUCKET_SIZE - 1,
+                'count': row['count'],
+            }
+            for row in rows.order_by('-bucket')
+        ]
+    if facet == 'price':
+        rows = queryset.annotate(bucket=_price_bucket_expression()).values('bucket').annotate(
+            count=Count('id')
+        )
+        return [
+            {**_price_bucket(row['bucket']), 'count': row['count']}
+            for row in rows.order_by('bucket')
+        ]
+
+    rows = queryset.values(facet).annotate(count=Count('id'))
+    return [
+        {'value': row[facet], 'count': row['count']}
+        for row in rows.order_by('-count', facet)
+    ]
+
+
+def facet_counts(request, queryset=None):
+    """
+    Total and per-facet counts for the CarFilter/search parameters in `request`.
+    Runs one COUNT plus one grouped query per facet.
+    """
+    if queryset is None:
+        queryset = AvailableCar.objects.all()
+    queryset = CarSearchFilter().filter_queryset(request, queryset, None)
+
+    def filtered(params):
+        filterset = AvailableCarFilter(params, queryset=queryset, request=request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.qs
+
+    result = {'count': filtered(request.query_params).count(), 'facets': {}}
+    for facet, own_params in FACET_PARAMS.items():
+        params = request.query_params.copy()
+        for param in own_params:
+            params.pop(param, None)
+        result['facets'][facet] = _grouped_counts(filtered(params), facet)
+    return result
@@ -3,7 +3,7 @@ Filters for the Cars app.
 """
 
 import django_filters
-from .models import Car
+from .models import Car, AvailableCar
 
 
 class CarFilter(django_filters.FilterSet):
@@ -31,3 +31,24 @@ class CarFilter(django_filters.FilterSet):
             'price_min', 'price_max', 'mileage_max',
             'transmission', 'fuel_type', 'category', 'brand', 'status'
         ]
+
+
+class AvailableCarFilter(CarFilter):
+    """
+    CarFilter for the AvailableCar projection (public list and facets).
+    """
+
+    class Meta(CarFilter.Meta):
+        model = AvailableCar
+
+
+class AdminCarFilter(CarFilter):
+    """
+    Filter class for the admin car list.
+    Adds filtering by reconditioning (maintenance) cost.
+    """
+    maintenance_cost_min = django_filters.NumberFilter(field_name='maintenance_cost_total', lookup_expr='gte')
+    maintenance_cost_max = django_filters.NumberFilter(field_name='maintenance_cost_total', lookup_expr='lte')
+
+    class Meta(CarFilter.Meta):
+        fields = CarFilter.Meta.fields + ['maintenance_cost_min', 'maintenance_cost_max']
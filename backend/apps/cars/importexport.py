@@ -0,0 +1,267 @@
+"""
+Bulk import/export of car inventory.
+
+Used by the `import_cars` and `export_cars` management commands. Rows are
+streamed in chunks so memory stays flat for large feeds:
+- import upserts each chunk on `vin` with one bulk_create(update_conflicts=True)
+  inside its own transaction, resolving category/brand names through an
+  in-memory map
+- export streams rows with iterator(chunk_size=...)
+
+Supported formats are CSV and JSON Lines. In CSV, `features` is either a
+JSON array or a "|"-separated list.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import cache, inventory
+from .models import Car, Category, Brand
+from .search import update_search_vectors
+
+FIELDS = [
+    'vin', 'make', 'model', 'year', 'price', 'mileage', 'color',
+    'transmission', 'fuel_type', 'status', 'is_featured',
+    'category', 'brand', 'description', 'features',
+]
+REQUIRED_FIELDS = ['vin', 'make', 'model', 'year', 'price', 'mileage']
+
+# Checked against the model field validators (max_length, max_digits, ...)
+# so a bad value fails its row, not the whole batch's INSERT
+VALIDATED_FIELDS = ['vin', 'make', 'model', 'year', 'price', 'mileage', 'color']
+
+# Fields overwritten when a VIN already exists
+UPDATE_FIELDS = [
+    'make', 'model', 'year', 'price', 'mileage', 'color', 'transmission',
+    'fuel_type', 'status', 'is_featured', 'category', 'brand',
+    'description', 'features', 'updated_at',
+]
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+
+class RowError(ValueError):
+    """A row that cannot be imported."""
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, dict) for each row in the input stream."""
+    if fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, RowError(f'Invalid JSON: {e}')
+                    continue
+                if not isinstance(row, dict):
+                    row = RowError('Row must be a JSON object')
+                yield line_number, row
+    else:
+        reader = csv.DictReader(stream)
+        for line_number, row in enumerate(reader, start=2):
+            yield line_number, row
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class NameMap:
+    """
+    Case-insensitive name -> id map for Category or Brand, loaded once.
+    Unknown names are created on first use when `create_missing` is set.
+    """
+
+    def __init__(self, model, create_missing=True):
+        self.model = model
+        self.create_missing = create_missing
+        self.created = 0
+        self.ids = {
+            name.lower(): pk for pk, name in model.objects.values_list('pk', 'name')
+        }
+
+    def resolve(self, name):
+        name = (name or '').strip()
+        if not name:
+            return None
+        key = name.lower()
+        if key not in self.ids:
+            label = self.model._meta.verbose_name.lower()
+            if not self.create_missing:
+                raise RowError(f'Unknown {label}: {name}')
+            max_length = self.model._meta.get_field('name').max_length
+            if len(name) > max_length:
+                raise RowError(f'{label.capitalize()} name longer than {max_length} characters')
+            # save() picks a slug no other row uses
+            self.ids[key] = self.model.objects.create(name=name).pk
+            self.created += 1
+        return self.ids[key]
+
+
+def _parse_features(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return value
+    value = str(value).strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def build_car(row, categories, brands):
+    """Validate one input row and return an unsaved Car."""
+    if isinstance(row, Exception):
+        raise row
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, '')]
+    if missing:
+        raise RowError(f"Missing {', '.join(missing)}")
+
+    try:
+        car = Car(
+            vin=str(row['vin']).strip().upper(),
+            make=str(row['make']).strip(),
+            model=str(row['model']).strip(),
+            year=int(row['year']),
+            price=Decimal(str(row['price'])),
+            mileage=int(row['mileage']),
+            color=str(row.get('color') or '').strip(),
+            transmission=row.get('transmission') or Car.TRANSMISSION_AUTOMATIC,
+            fuel_type=row.get('fuel_type') or Car.FUEL_PETROL,
+            status=row.get('status') or Car.STATUS_AVAILABLE,
+            is_featured=str(row.get('is_featured', '')).strip().lower() in TRUE_VALUES,
+            description=row.get('description') or '',
+            features=_parse_features(row.get('features')),
+            category_id=categories.resolve(row.get('category')),
+            brand_id=brands.resolve(row.get('brand')),
+        )
+    except (ValueError, TypeError, InvalidOperation) as e:
+        raise RowError(str(e))
+
+    if len(car.vin) > 17:
+        raise RowError('VIN longer than 17 characters')
+    if not 1900 <= car.year <= 2100:
+        raise RowError('Year must be between 1900 and 2100')
+    if car.price < 0 or car.mileage < 0:
+        raise RowError('Price and mileage must be positive')
+    if car.transmission not in dict(Car.TRANSMISSION_CHOICES):
+        raise RowError(f'Invalid transmission: {car.transmission}')
+    if car.fuel_type not in dict(Car.FUEL_CHOICES):
+        raise RowError(f'Invalid fuel type: {car.fuel_type}')
+    if car.status not in dict(Car.STATUS_CHOICES):
+        raise RowError(f'Invalid status: {car.status}')
+    for name in VALIDATED_FIELDS:
+        try:
+            Car._meta.get_field(name).run_validators(getattr(car, name))
+        except ValidationError as e:
+            raise RowError(f"{name}: {' '.join(e.messages)}")
+    return car
+
+
+def upsert_cars(cars):
+    """
+    Insert or update cars by VIN in one statement.
+    Later rows win when a VIN appears twice in the same batch.
+    """
+    by_vin = {car.vin: car for car in cars}
+    Car.objects.bulk_create(
+        list(by_vin.values()),
+        update_conflicts=True,
+        unique_fields=['vin'],
+        update_fields=UPDATE_FIELDS,
+    )
+    update_search_vectors(Car.objects.filter(vin__in=list(by_vin)))
+    inventory.refresh_cars(Car.objects.filter(vin__in=list(by_vin)).values_list('pk', flat=True))
+    return len(by_vin)
+
+
+def import_rows(rows, batch_size=1000, create_missing=True, on_batch=None):
+    """
+    Import (line_number, row) pairs in batches.
+    Returns {'imported', 'errors': [(line_number, message)], 'categories_created', 'brands_created'}.
+    """
+    categories = NameMap(Category, create_missing)
+    brands = NameMap(Brand, create_missing)
+    imported, errors = 0, []
+
+    for chunk in chunked(rows, batch_size):
+        cars = []
+        for line_number, row in chunk:
+            try:
+                cars.append(build_car(row, categories, brands))
+            except (RowError, ValueError) as e:
+                errors.append((line_number, str(e)))
+        if cars:
+            with transaction.atomic():
+                imported += upsert_cars(cars)
+        if on_batch:
+            on_batch(imported, len(errors))
+
+    if imported:
+        # bulk_create skips post_save, so invalidate cached catalog pages here
+        cache.bump_version('car')
+    if categories.created:
+        cache.bump_version('category')
+    if brands.created:
+        cache.bump_version('brand')
+
+    return {
+        'imported': imported,
+        'errors': errors,
+        'categories_created': categories.created,
+        'brands_created': brands.created,
+    }
+
+
+def export_rows(queryset=None, chunk_size=2000):
+    """Yield cars as dicts of FIELDS, streaming from the database."""
+    if queryset is None:
+        queryset = Car.objects.all()
+    values = queryset.order_by('vin').values(
+        'vin', 'make', 'model', 'year', 'price', 'mileage', 'color',
+        'transmission', 'fuel_type', 'status', 'is_featured',
+        'category__name', 'brand__name', 'description', 'features',
+    )
+    for row in values.iterator(chunk_size=chunk_size):
+        row['category'] = row.pop('category__name') or ''
+        row['brand'] = row.pop('brand__name') or ''
+        row['price'] = str(row['price'])
+        yield row
+
+
+def write_rows(rows, stream, fmt):
+    """Write exported rows to a stream. Returns the number of rows written."""
+    count = 0
+    if fmt == 'jsonl':
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+            count += 1
+        return count
+
+    writer = csv.DictWriter(stream, fieldnames=FIELDS)
+    writer.writeheader()
+    for row in rows:
+        row['features'] = json.dumps(row['features'], ensure_ascii=False)
+        writer.writerow(row)
+        count += 1
+    return count
@@ -0,0 +1,120 @@
+"""
+Materialized "available inventory" projection for the public catalog.
+
+AvailableCar (see models.py) holds one flat row per available car, with the
+category, brand and primary image fields copied in, plus the search fields.
+CarListView and the facet counts read this single table instead of joining
+categories and brands and prefetching images on every request.
+
+Rows are refreshed incrementally:
+- Car and CarImage saves and deletes refresh the affected car (signals.py)
+- Category and Brand saves and deletes rewrite the copied fields of their cars
+- writes that bypass signals (bulk API, CSV import, admin actions, image
+  upload jobs) call `refresh_cars()` themselves, and the car view buffer
+  increments views_count here as well as on Car
+
+`python manage.py rebuild_inventory` rebuilds the whole table, e.g. after
+loaddata or raw SQL writes.
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import AvailableCar, Car
+from .search import update_search_vectors
+
+CAR_FIELDS = [
+    'make', 'model', 'year', 'price', 'mileage', 'vin', 'color',
+    'transmission', 'fuel_type', 'description', 'status', 'is_featured',
+    'views_count', 'created_at', 'category_id', 'brand_id',
+]
+
+# Related model fields copied as `<relation>_<field>`
+RELATED_FIELDS = {
+    'category': ['name', 'slug', 'description', 'created_at'],
+    'brand': ['name', 'slug', 'logo_url', 'created_at'],
+}
+
+UPDATE_FIELDS = CAR_FIELDS + [
+    f'{relation}_{field}' for relation, fields in RELATED_FIELDS.items() for field in fields
+] + ['primary_image_id', 'primary_image_url', 'primary_image_is_primary']
+
+BATCH_SIZE = 1000
+
+
+def _related_values(relation, instance):
+    """Copied fields of a category or brand (all None for None)."""
+    return {
+        f'{relation}_{field}': getattr(instance, field) if instance else None
+        for field in RELATED_FIELDS[relation]
+    }
+
+
+def build_row(car):
+    """AvailableCar for a car with category, brand and images loaded."""
+    row = AvailableCar(id=car.pk, **{field: getattr(car, field) for field in CAR_FIELDS})
+    for relation in RELATED_FIELDS:
+        for name, value in _related_values(relation, getattr(car, relation)).items():
+            setattr(row, name, value)
+    image = car.primary_or_first_image
+    if image:
+        row.primary_image_id = image.id
+        row.primary_image_url = image.image_url
+        row.primary_image_is_primary = image.is_primary
+    return row
+
+
+def refresh_cars(car_ids):
+    """
+    Bring the projection rows of the given cars up to date: upsert available
+    cars, delete the rest. Costs a handful of queries per batch, not per car.
+    """
+    car_ids = list(car_ids)
+    if not car_ids:
+        return 0
+
+    with transaction.atomic():
+        cars = list(
+            Car.objects.filter(pk__in=car_ids, status=Car.STATUS_AVAILABLE)
+            .select_related('category', 'brand')
+            .prefetch_related('images')
+            .defer('search_vector')
+        )
+        available = [car.pk for car in cars]
+        AvailableCar.objects.filter(pk__in=car_ids).exclude(pk__in=available).delete()
+        if cars:
+            AvailableCar.objects.bulk_create(
+                [build_row(car) for car in cars],
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=UPDATE_FIELDS,
+            )
+            update_search_vectors(AvailableCar.objects.filter(pk__in=available))
+    return len(cars)
+
+
+def remove_car(car_id):
+    AvailableCar.objects.filter(pk=car_id).delete()
+
+
+def add_views(car_ids, count):
+    """Mirror a views_count increment on Car (see the car view buffer)."""
+    AvailableCar.objects.filter(pk__in=car_ids).update(views_count=F('views_count') + count)
+
+
+def refresh_related(relation, instance, deleted=False):
+    """Rewrite the copied fields of a saved or deleted category or brand."""
+    rows = AvailableCar.objects.filter(**{f'{relation}_id': instance.pk})
+    if deleted:
+        return rows.update(**{f'{relation}_id': None}, **_related_values(relation, None))
+    return rows.update(**_related_values(relation, instance))
+
+
+def rebuild():
+    """Refresh every available car and drop every stale row. Returns the row count."""
+    car_ids = set(Car.objects.filter(status=Car.STATUS_AVAILABLE).values_list('pk', flat=True))
+    car_ids |= set(AvailableCar.objects.values_list('pk', flat=True))
+    car_ids = list(car_ids)
+    for start in range(0, len(car_ids), BATCH_SIZE):
+        refresh_cars(car_ids[start:start + BATCH_SIZE])
+    return AvailableCar.objects.count()
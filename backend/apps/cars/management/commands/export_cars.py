@@ -0,0 +1,53 @@
+"""
+Management command to export cars to CSV or JSON Lines.
+
+    python manage.py export_cars cars.csv
+    python manage.py export_cars - --format jsonl --status available
+
+The output can be fed back into `import_cars`. Rows are streamed from the
+database in chunks, so memory use does not grow with the inventory size.
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cars.importexport import detect_format, export_rows, write_rows
+from apps.cars.models import Car
+
+
+class Command(BaseCommand):
+    help = 'Export cars to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file, or - for stdout')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Output format (default: from file extension)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per query (default: 2000)')
+        parser.add_argument('--status', choices=[value for value, _ in Car.STATUS_CHOICES], help='Only export cars with this status')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+
+        queryset = Car.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        try:
+            stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        started = time.monotonic()
+        try:
+            count = write_rows(export_rows(queryset, chunk_size=options['chunk_size']), stream, fmt)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        if path != '-':
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'Exported {count} cars to {path} in {elapsed:.1f}s ({count / max(elapsed, 1e-6):.0f} rows/sec).'
+            ))
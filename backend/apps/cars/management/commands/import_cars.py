@@ -0,0 +1,75 @@
+"""
+Management command to bulk import cars from CSV or JSON Lines.
+
+    python manage.py import_cars feed.csv
+    python manage.py import_cars feed.jsonl --batch-size 5000
+    cat feed.csv | python manage.py import_cars - --format csv
+
+Rows are upserted on VIN: existing cars are updated, new ones created.
+Unknown categories and brands are created unless --no-create is given.
+Invalid rows are skipped and reported with their line numbers.
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cars.importexport import detect_format, import_rows, read_rows
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = 'Import cars from a CSV or JSON Lines file, upserting on VIN'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, or - for stdin')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction (default: 1000)')
+        parser.add_argument(
+            '--no-create',
+            action='store_true',
+            help='Reject rows with unknown categories or brands instead of creating them',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        started = time.monotonic()
+
+        def report(imported, errors):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {imported} imported, {errors} skipped ({imported / max(elapsed, 1e-6):.0f} rows/sec)')
+
+        try:
+            result = import_rows(
+                read_rows(stream, fmt),
+                batch_size=options['batch_size'],
+                create_missing=not options['no_create'],
+                on_batch=report,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.monotonic() - started
+        for line_number, message in result['errors'][:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f'Line {line_number}: {message}')
+        if len(result['errors']) > MAX_REPORTED_ERRORS:
+            self.stderr.write(f"... and {len(result['errors']) - MAX_REPORTED_ERRORS} more invalid rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} cars in {elapsed:.1f}s "
+            f"({result['imported'] / max(elapsed, 1e-6):.0f} rows/sec), "
+            f"skipped {len(result['errors'])} invalid rows, "
+            f"created {result['categories_created']} categories and {result['brands_created']} brands."
+        ))
@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the available inventory projection.
+
+The AvailableCar rows are normally kept up to date incrementally; run this
+after writes that bypass it (loaddata, raw SQL, queryset.update() on cars).
+
+    python manage.py rebuild_inventory
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.cars.inventory import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the AvailableCar projection used by the public car list and facets'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the available inventory: {count} cars.'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'price', 'id'], name='cars_car_status_ef7a80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'year', 'id'], name='cars_car_status_391f13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'mileage', 'id'], name='cars_car_status_e10dae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='cars_car_status_a78b67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['created_at', 'id'], name='cars_car_created_97bf88_idx'),
+        ),
+    ]
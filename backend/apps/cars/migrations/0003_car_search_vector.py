@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:16
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# PostgreSQL-only: GIN indexes for full-text and trigram search, plus a
+# backfill of search_vector. Other databases use the fallback in search.py.
+POSTGRES_FORWARD_SQL = [
+    'CREATE INDEX IF NOT EXISTS cars_car_search_vector_gin ON cars_car USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS cars_car_make_trgm ON cars_car USING gin (make gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS cars_car_model_trgm ON cars_car USING gin (model gin_trgm_ops)',
+    """
+    UPDATE cars_car SET search_vector =
+        setweight(to_tsvector('english', coalesce(make, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(model, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(vin, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    """,
+]
+
+POSTGRES_BACKWARD_SQL = [
+    'DROP INDEX IF EXISTS cars_car_search_vector_gin',
+    'DROP INDEX IF EXISTS cars_car_make_trgm',
+    'DROP INDEX IF EXISTS cars_car_model_trgm',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_BACKWARD_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='car',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0003_car_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='maintenance_cost_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Sum of the total cost of all maintenance records', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='maintenance_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of maintenance records'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['maintenance_cost_total', 'id'], name='cars_car_mainten_c8b17a_idx'),
+        ),
+    ]
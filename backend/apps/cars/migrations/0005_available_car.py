@@ -0,0 +1,119 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:45
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL-only: the same search indexes as cars_car (see 0003)
+POSTGRES_FORWARD_SQL = [
+    'CREATE INDEX IF NOT EXISTS cars_availablecar_search_vector_gin ON cars_availablecar USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS cars_availablecar_make_trgm ON cars_availablecar USING gin (make gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS cars_availablecar_model_trgm ON cars_availablecar USING gin (model gin_trgm_ops)',
+]
+
+POSTGRES_SEARCH_VECTOR_SQL = """
+    UPDATE cars_availablecar SET search_vector =
+        setweight(to_tsvector('english', coalesce(make, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(model, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(vin, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+"""
+
+CAR_FIELDS = [
+    'make', 'model', 'year', 'price', 'mileage', 'vin', 'color',
+    'transmission', 'fuel_type', 'description', 'status', 'is_featured',
+    'views_count', 'created_at', 'category_id', 'brand_id',
+]
+
+
+def backfill_available_cars(apps, schema_editor):
+    """Copy the available cars in (apps/cars/inventory.py keeps them in sync afterwards)."""
+    Car = apps.get_model('cars', 'Car')
+    AvailableCar = apps.get_model('cars', 'AvailableCar')
+
+    cars = (
+        Car.objects.filter(status='available')
+        .select_related('category', 'brand')
+        .prefetch_related('images')
+        .order_by('pk')
+    )
+    rows = []
+    for car in cars.iterator(chunk_size=1000):
+        row = AvailableCar(id=car.pk, **{field: getattr(car, field) for field in CAR_FIELDS})
+        if car.category:
+            row.category_name = car.category.name
+            row.category_slug = car.category.slug
+            row.category_description = car.category.description
+            row.category_created_at = car.category.created_at
+        if car.brand:
+            row.brand_name = car.brand.name
+            row.brand_slug = car.brand.slug
+            row.brand_logo_url = car.brand.logo_url
+            row.brand_created_at = car.brand.created_at
+        images = sorted(car.images.all(), key=lambda image: (image.order, image.uploaded_at))
+        image = next((image for image in images if image.is_primary), None) or (images[0] if images else None)
+        if image:
+            row.primary_image_id = image.id
+            row.primary_image_url = image.image_url
+            row.primary_image_is_primary = image.is_primary
+        rows.append(row)
+        if len(rows) >= 1000:
+            AvailableCar.objects.bulk_create(rows)
+            rows = []
+    AvailableCar.objects.bulk_create(rows)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_FORWARD_SQL + [POSTGRES_SEARCH_VECTOR_SQL]:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_car_maintenance_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailableCar',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('make', models.CharField(max_length=100)),
+                ('model', models.CharField(max_length=100)),
+                ('year', models.IntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('mileage', models.IntegerField()),
+                ('vin', models.CharField(max_length=17)),
+                ('color', models.CharField(max_length=50)),
+                ('transmission', models.CharField(choices=[('automatic', 'Automatic'), ('manual', 'Manual')], max_length=20)),
+                ('fuel_type', models.CharField(choices=[('petrol', 'Petrol'), ('diesel', 'Diesel'), ('electric', 'Electric'), ('hybrid', 'Hybrid')], max_length=20)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('available', 'Available'), ('sold', 'Sold'), ('reserved', 'Reserved')], default='available', max_length=20)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('views_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('category_name', models.CharField(max_length=100, null=True)),
+                ('category_slug', models.SlugField(max_length=100, null=True)),
+                ('category_description', models.TextField(null=True)),
+                ('category_created_at', models.DateTimeField(null=True)),
+                ('brand_name', models.CharField(max_length=100, null=True)),
+                ('brand_slug', models.SlugField(max_length=100, null=True)),
+                ('brand_logo_url', models.URLField(null=True)),
+                ('brand_created_at', models.DateTimeField(null=True)),
+                ('primary_image_id', models.IntegerField(null=True)),
+                ('primary_image_url', models.URLField(blank=True)),
+                ('primary_image_is_primary', models.BooleanField(default=False)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('brand', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='cars.brand')),
+                ('category', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='cars.category')),
+            ],
+            options={
+                'verbose_name': 'Available Car',
+                'verbose_name_plural': 'Available Cars',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['price', 'id'], name='cars_availa_price_cb2e8c_idx'), models.Index(fields=['year', 'id'], name='cars_availa_year_c71223_idx'), models.Index(fields=['mileage', 'id'], name='cars_availa_mileage_dba74b_idx'), models.Index(fields=['created_at', 'id'], name='cars_availa_created_8f5a07_idx'), models.Index(fields=['make'], name='cars_availa_make_98d823_idx')],
+            },
+        ),
+        # Dropping the table also drops the PostgreSQL indexes
+        migrations.RunPython(backfill_available_cars, migrations.RunPython.noop),
+    ]
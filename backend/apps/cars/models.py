@@ -6,14 +6,32 @@ This file defines the database structure for:
 - Brands (Toyota, BMW, etc.)
 - Cars (main inventory)
 - Car Images (multiple photos per car)
+- Available Cars (flat read model of the public catalog, see inventory.py)
 """
 
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
 
+def unique_slug(instance, max_length=100):
+    """
+    Slug of `instance.name` that no other row of its model uses:
+    "suv", then "suv-2", "suv-3", ... (names like "SUV" and "S.U.V." collide).
+    """
+    model = type(instance)
+    base = slugify(instance.name)[:max_length] or model._meta.model_name
+    others = model.objects.exclude(pk=instance.pk) if instance.pk else model.objects.all()
+    slug, number = base, 2
+    while others.filter(slug=slug).exists():
+        suffix = f'-{number}'
+        slug = base[:max_length - len(suffix)] + suffix
+        number += 1
+    return slug
+
+
 class Category(models.Model):
     """
     Car categories like SUV, Sedan, Truck, etc.
@@ -33,7 +51,7 @@ class Category(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(self)
         super().save(*args, **kwargs)
 
 
@@ -56,7 +74,7 @@ class Brand(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(self)
         super().save(*args, **kwargs)
 
 
@@ -184,6 +202,23 @@ class Car(models.Model):
         help_text='Number of times this car was viewed'
     )
 
+    # Reconditioning (maintained from maintenance records, see apps/maintenance/totals.py)
+    maintenance_cost_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text='Sum of the total cost of all maintenance records'
+    )
+    maintenance_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of maintenance records'
+    )
+
+    # Search (maintained on PostgreSQL, see search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -197,6 +232,15 @@ class Car(models.Model):
             models.Index(fields=['year']),
             models.Index(fields=['price']),
             models.Index(fields=['status']),
+            # Keyset pagination: (status, sort field, id) for the public list,
+            # (created_at, id) for the admin list
+            models.Index(fields=['status', 'price', 'id']),
+            models.Index(fields=['status', 'year', 'id']),
+            models.Index(fields=['status', 'mileage', 'id']),
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            # Sorting/filtering by reconditioning cost
+            models.Index(fields=['maintenance_cost_total', 'id']),
         ]
 
     def __str__(self):
@@ -210,7 +254,17 @@ class Car(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for this car"""
-        return self.images.filter(is_primary=True).first()
+        return next((image for image in self.images.all() if image.is_primary), None)
+
+    @property
+    def primary_or_first_image(self):
+        """
+        Get the primary image, falling back to the first image by order.
+        Uses images.all() so a prefetch_related('images') is respected.
+        """
+        images = list(self.images.all())
+        primary = next((image for image in images if image.is_primary), None)
+        return primary or (images[0] if images else None)
 
     @property
     def all_images(self):
@@ -260,3 +314,79 @@ class CarImage(models.Model):
         if self.is_primary:
             CarImage.objects.filter(car=self.car, is_primary=True).update(is_primary=False)
         super().save(*args, **kwargs)
+
+
+class AvailableCar(models.Model):
+    """
+    Denormalized copy of an available car for the public catalog: one flat
+    row with the category, brand and primary image fields copied in, so the
+    car list and facets read a single table. Maintained by inventory.py.
+    """
+    # Same primary key as the Car
+    id = models.UUIDField(primary_key=True, editable=False)
+
+    # Copied from Car
+    make = models.CharField(max_length=100)
+    model = models.CharField(max_length=100)
+    year = models.IntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    mileage = models.IntegerField()
+    vin = models.CharField(max_length=17)
+    color = models.CharField(max_length=50)
+    transmission = models.CharField(max_length=20, choices=Car.TRANSMISSION_CHOICES)
+    fuel_type = models.CharField(max_length=20, choices=Car.FUEL_CHOICES)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Car.STATUS_CHOICES, default=Car.STATUS_AVAILABLE)
+    is_featured = models.BooleanField(default=False)
+    views_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField()
+
+    # Copied from Category and Brand (NULL without one, like the join they
+    # replace); no database constraint, rows are rewritten when a category
+    # or brand changes
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    category_name = models.CharField(max_length=100, null=True)
+    category_slug = models.SlugField(max_length=100, null=True)
+    category_description = models.TextField(null=True)
+    category_created_at = models.DateTimeField(null=True)
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    brand_name = models.CharField(max_length=100, null=True)
+    brand_slug = models.SlugField(max_length=100, null=True)
+    brand_logo_url = models.URLField(null=True)
+    brand_created_at = models.DateTimeField(null=True)
+
+    # Primary image (or the first image by order)
+    primary_image_id = models.IntegerField(null=True)
+    primary_image_url = models.URLField(blank=True)
+    primary_image_is_primary = models.BooleanField(default=False)
+
+    # Search (maintained on PostgreSQL, see search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        verbose_name = 'Available Car'
+        verbose_name_plural = 'Available Cars'
+        ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination and sorting of the public list
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['year', 'id']),
+            models.Index(fields=['mileage', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['make']),
+        ]
+
+    def __str__(self):
+        return f"{self.year} {self.make} {self.model}"
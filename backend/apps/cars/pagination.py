@@ -0,0 +1,195 @@
+"""
+Pagination for list endpoints.
+
+By default lists are paginated with page numbers (?page=N), which costs an
+OFFSET plus a COUNT(*) per request. Passing a `cursor` query parameter
+(empty for the first page) switches to keyset pagination instead:
+
+    GET /api/cars/?ordering=-price&cursor=
+    GET /api/cars/?ordering=-price&cursor=<next cursor>
+
+Keyset pagination seeks directly to the rows after the last one seen using
+WHERE (price, id) < (:price, :id), so every page costs the same as the first.
+Any ordering on concrete model fields is supported; the primary key is added
+as a tie-breaker so the order is total.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def use_cursor(self, request):
+        return self.cursor_query_param in request.query_params
+
+    # ============= ORDERING =============
+
+    def get_ordering(self, queryset):
+        """
+        The queryset's ordering as a list of (field_name, descending) pairs,
+        ending with the primary key as a tie-breaker.
+        """
+        model = queryset.model
+        terms = list(queryset.query.order_by) or list(model._meta.ordering)
+        pk_name = model._meta.pk.name
+
+        ordering = []
+        for term in terms:
+            if not isinstance(term, str):
+                raise ValidationError({'ordering': 'Cursor pagination requires ordering by model fields.'})
+            descending = term.startswith('-')
+            name = term.lstrip('-')
+            if name == 'pk':
+                name = pk_name
+            try:
+                model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError({'ordering': 'Cursor pagination requires ordering by model fields.'})
+            ordering.append((name, descending))
+
+        if pk_name not in [name for name, _ in ordering]:
+            descending = ordering[0][1] if ordering else False
+            ordering.append((pk_name, descending))
+        return ordering
+
+    def build_seek_filter(self, ordering, values, reverse=False):
+        """
+        Lexicographic "comes after" filter for a keyset position:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for name, descending in ordering:
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal_so_far & Q(**{f'{name}__{lookup}': values[name]})
+            equal_so_far &= Q(**{name: values[name]})
+        return condition
+
+    # ============= CURSORS =============
+
+    def encode_cursor(self, position, reverse=False):
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, '')
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return payload['p'], bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, model, ordering, position):
+        """
+        Convert a decoded cursor position to field values. A tampered cursor
+        (wrong keys, values the fields can't parse) is a 404, not a 500.
+        """
+        if not isinstance(position, dict) or set(position) != {name for name, _ in ordering}:
+            raise NotFound(self.invalid_cursor_message)
+        values = {}
+        for name, _ in ordering:
+            try:
+                value = model._meta.get_field(name).to_python(position[name])
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            values[name] = value
+        return values
+
+    def position_of(self, obj, ordering):
+        return {
+            name: _encode_value(getattr(obj, obj._meta.get_field(name).attname))
+            for name, _ in ordering
+        }
+
+    # ============= PAGINATION =============
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            self.cursor_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.cursor_mode = True
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        if position is not None:
+            position = self.parse_position(queryset.model, ordering, position)
+            queryset = queryset.filter(self.build_seek_filter(ordering, position, reverse))
+
+        order_by = [
+            f'-{name}' if descending != reverse else name
+            for name, descending in ordering
+        ]
+        rows = list(queryset.order_by(*order_by)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = None
+        self.previous_link = None
+        if rows:
+            # Forward: more rows means a next page, and any cursor means we can
+            # go back. Backward: more rows means a previous page, and we can
+            # always return to where we came from.
+            has_next = has_more if not reverse else True
+            has_previous = position is not None if not reverse else has_more
+            if has_next:
+                self.next_link = self.encode_cursor(self.position_of(rows[-1], ordering))
+            if has_previous:
+                self.previous_link = self.encode_cursor(
+                    self.position_of(rows[0], ordering), reverse=True
+                )
+        return rows
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'cursor_mode', False):
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.next_link,
+            'previous': self.previous_link,
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if getattr(self, 'cursor_mode', False):
+            return self.next_link
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if getattr(self, 'cursor_mode', False):
+            return self.previous_link
+        return super().get_previous_link()
@@ -0,0 +1,120 @@
+"""
+Full-text search for cars.
+
+On PostgreSQL, cars carry a maintained `search_vector` (tsvector) with GIN
+index, weighted so matches in make/model/VIN rank above description matches.
+Trigram similarity on make and model tolerates typos ("toyta" finds Toyota).
+
+Other databases (SQLite in local development) use a simple fallback that
+matches every search word against the same fields and scores matches with
+the same weights, so the API behaves the same apart from typo tolerance.
+
+Results are annotated with `relevance`, which CarListView accepts as an
+ordering option (?search=bmw&ordering=-relevance).
+"""
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_CONFIG = 'english'
+TRIGRAM_THRESHOLD = 0.3
+
+# Field weights: A ranks highest, D lowest
+SEARCH_WEIGHTS = {
+    'make': 'A',
+    'model': 'A',
+    'vin': 'B',
+    'description': 'D',
+}
+FALLBACK_SCORES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+def is_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def search_vector_expression():
+    """Weighted tsvector expression for a car row (PostgreSQL only)."""
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for field, weight in SEARCH_WEIGHTS.items():
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vectors(queryset):
+    """
+    Recompute search_vector for the given cars in one UPDATE.
+    Call after writes that bypass Car.save() (bulk_create, queryset.update).
+    No-op on databases without full-text search.
+    """
+    if not is_postgres():
+        return 0
+    return queryset.update(search_vector=search_vector_expression())
+
+
+class PostgresSearchBackend:
+    """Full-text + trigram search using the maintained search_vector."""
+
+    def search(self, queryset, term):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+        query = SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(
+            Q(search_vector=query)
+            | Q(make__trigram_similar=term)
+            | Q(model__trigram_similar=term)
+        ).annotate(
+            relevance=SearchRank(F('search_vector'), query) + Greatest(
+                TrigramSimilarity('make', term),
+                TrigramSimilarity('model', term),
+            ) * 0.5
+        )
+
+
+class SimpleSearchBackend:
+    """
+    Fallback for databases without full-text search.
+    Every word must match at least one field; relevance sums field weights.
+    """
+
+    def search(self, queryset, term):
+        words = term.split()
+        relevance = Value(0.0, output_field=FloatField())
+        for word in words:
+            matches_any = Q()
+            for field in SEARCH_WEIGHTS:
+                matches_any |= Q(**{f'{field}__icontains': word})
+            queryset = queryset.filter(matches_any)
+            for field, weight in SEARCH_WEIGHTS.items():
+                relevance = relevance + Case(
+                    When(**{f'{field}__icontains': word}, then=Value(FALLBACK_SCORES[weight])),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+        return queryset.annotate(relevance=relevance)
+
+
+def get_search_backend():
+    if is_postgres():
+        return PostgresSearchBackend()
+    return SimpleSearchBackend()
+
+
+class CarSearchFilter(BaseFilterBackend):
+    """
+    Search filter for cars using the database's search backend.
+    Always annotates `relevance` (0 without a search term) so it can be
+    used as an ordering field.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset.annotate(relevance=Value(0.0, output_field=FloatField()))
+        return get_search_backend().search(queryset, term)
@@ -4,7 +4,7 @@ Serializers convert Django models to/from JSON for the REST API.
 """
 
 from rest_framework import serializers
-from .models import Category, Brand, Car, CarImage
+from .models import Category, Brand, Car, CarImage, AvailableCar
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -54,25 +54,70 @@ class CarListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'views_count', 'created_at']
 
     def get_primary_image(self, obj):
-        """Get the primary image URL"""
-        primary = obj.images.filter(is_primary=True).first()
-        if primary:
+        """
+        Get the primary image URL.
+        Resolved from the prefetched images, so list views don't query per row.
+        """
+        image = obj.primary_or_first_image
+        if image:
             return {
-                'id': primary.id,
-                'image_url': primary.image_url,
-                'is_primary': True
-            }
-        # If no primary, get first image
-        first_image = obj.images.first()
-        if first_image:
-            return {
-                'id': first_image.id,
-                'image_url': first_image.image_url,
-                'is_primary': False
+                'id': image.id,
+                'image_url': image.image_url,
+                'is_primary': image.is_primary
             }
         return None
 
 
+class AvailableCarSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the public car list, read from the AvailableCar projection.
+    Produces the same output as CarListSerializer from one flat row.
+    """
+    category = serializers.SerializerMethodField()
+    brand = serializers.SerializerMethodField()
+    primary_image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AvailableCar
+        fields = CarListSerializer.Meta.fields
+        read_only_fields = fields
+
+    def _related(self, obj, relation, fields):
+        if getattr(obj, f'{relation}_id') is None:
+            return None
+        data = {'id': getattr(obj, f'{relation}_id')}
+        for field in fields:
+            data[field] = getattr(obj, f'{relation}_{field}')
+        data['created_at'] = serializers.DateTimeField().to_representation(getattr(obj, f'{relation}_created_at'))
+        return data
+
+    def get_category(self, obj):
+        return self._related(obj, 'category', ['name', 'slug', 'description'])
+
+    def get_brand(self, obj):
+        return self._related(obj, 'brand', ['name', 'slug', 'logo_url'])
+
+    def get_primary_image(self, obj):
+        if obj.primary_image_id is None:
+            return None
+        return {
+            'id': obj.primary_image_id,
+            'image_url': obj.primary_image_url,
+            'is_primary': obj.primary_image_is_primary
+        }
+
+
+class AdminCarListSerializer(CarListSerializer):
+    """
+    Serializer for the admin car list.
+    Adds the denormalized reconditioning totals.
+    """
+
+    class Meta(CarListSerializer.Meta):
+        fields = CarListSerializer.Meta.fields + ['maintenance_cost_total', 'maintenance_count']
+        read_only_fields = CarListSerializer.Meta.read_only_fields + ['maintenance_cost_total', 'maintenance_count']
+
+
 class CarDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for Car model in detail views (full info).
@@ -140,3 +185,21 @@ class CarCreateUpdateSerializer(serializers.ModelSerializer):
         if value < 0:
             raise serializers.ValidationError("Price must be positive.")
         return value
+
+
+class CarBulkItemSerializer(CarCreateUpdateSerializer):
+    """
+    Serializer for one car in a bulk create/update request (admin only).
+    VIN uniqueness and category/brand existence are checked for the whole
+    batch at once in apps/cars/bulk.py instead of one query per car.
+    """
+    id = serializers.UUIDField(required=False)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    brand = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(CarCreateUpdateSerializer.Meta):
+        read_only_fields = []
+        extra_kwargs = {'vin': {'validators': []}}
+
+    def validate_vin(self, value):
+        return value
@@ -0,0 +1,93 @@
+"""
+Signal handlers for the Cars app.
+
+Bump the catalog cache version of a model whenever one of its rows changes,
+so cached public responses that depend on it are no longer served, and keep
+the available inventory projection in sync (see inventory.py).
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache, inventory
+from .models import Category, Brand, Car, CarImage, AvailableCar
+from .search import SEARCH_WEIGHTS, update_search_vectors
+
+CATALOG_MODELS = {
+    Car: 'car',
+    CarImage: 'carimage',
+    Category: 'category',
+    Brand: 'brand',
+}
+
+
+# ============= AVAILABLE INVENTORY =============
+# Connected before bump_catalog_version, so the projection is current by the
+# time a new catalog version can be cached.
+
+@receiver(post_save, sender=Car)
+def refresh_available_car(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields and set(update_fields) == {'views_count'}:
+        AvailableCar.objects.filter(pk=instance.pk).update(views_count=instance.views_count)
+        return
+    inventory.refresh_cars([instance.pk])
+
+
+@receiver(post_delete, sender=Car)
+def remove_available_car(sender, instance, **kwargs):
+    inventory.remove_car(instance.pk)
+
+
+@receiver(post_save, sender=CarImage)
+def refresh_available_car_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    inventory.refresh_cars([instance.car_id])
+
+
+@receiver(post_delete, sender=CarImage)
+def remove_available_car_image(sender, instance, **kwargs):
+    # Only the displayed image matters; this also skips the images of a
+    # car that is being deleted
+    shown = AvailableCar.objects.filter(pk=instance.car_id, primary_image_id=instance.pk)
+    if shown.exists():
+        inventory.refresh_cars([instance.car_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+def refresh_available_car_relation(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    inventory.refresh_related(sender._meta.model_name, instance)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+def clear_available_car_relation(sender, instance, **kwargs):
+    inventory.refresh_related(sender._meta.model_name, instance, deleted=True)
+
+
+# ============= CATALOG CACHE =============
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_catalog_version(sender, update_fields=None, **kwargs):
+    model = CATALOG_MODELS.get(sender)
+    if model is None:
+        return
+    # View counting alone doesn't change what the catalog shows
+    if update_fields and set(update_fields) == {'views_count'}:
+        return
+    cache.bump_version(model)
+
+
+@receiver(post_save, sender=Car)
+def refresh_search_vector(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields and not set(update_fields) & set(SEARCH_WEIGHTS):
+        return
+    update_search_vectors(Car.objects.filter(pk=instance.pk))
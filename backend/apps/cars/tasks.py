@@ -0,0 +1,114 @@
+"""
+Background tasks for the Cars app (run by the jobs queue).
+"""
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from apps.jobs.registry import task
+from . import cache, inventory
+from .models import Car, CarImage
+from .uploads import cloudinary_destroy, upload_files
+
+UPLOAD_IMAGES = 'cars.upload_images'
+DELETE_IMAGE = 'cars.delete_image'
+
+
+def discard_stashed_files(job):
+    """Delete the stashed files of an upload job that gave up."""
+    for entry in job.payload.get('files', []):
+        default_storage.delete(entry['path'])
+
+
+@task(UPLOAD_IMAGES, on_dead=discard_stashed_files)
+def upload_images(job):
+    """
+    Upload images stashed in storage and create their CarImage rows.
+
+    payload: {'car_id': ..., 'files': [{'path', 'name', 'public_id'}]}
+    Uploaded files are removed from the payload, so a retry only handles the
+    files that failed. Each file keeps its public_id across attempts, so an
+    upload that timed out but finished anyway is overwritten by the retry
+    rather than left behind as a second asset. Stashed files are deleted
+    once uploaded, and the rest when the job gives up.
+
+    Order and primary are assigned here, with the car row locked, so uploads
+    queued for the same car at the same time get consecutive orders and at
+    most one primary image (bulk_create skips the rule in CarImage.save).
+    """
+    files = job.payload.get('files', [])
+    car = Car.objects.filter(pk=job.payload['car_id']).first()
+    if car is None:
+        discard_stashed_files(job)
+        return {'uploaded': [], 'error': 'Car not found'}
+
+    # upload_files closes each file when its upload is over, which can be
+    # after it returns if the upload timed out
+    results = upload_files(
+        [default_storage.open(entry['path']) for entry in files],
+        public_ids=[entry.get('public_id') for entry in files],
+        close_files=True,
+    )
+
+    done, remaining, errors = [], [], []
+    for entry, result in zip(files, results):
+        if result.ok:
+            done.append((entry, result))
+        else:
+            remaining.append(entry)
+            errors.append(f"{entry['name']}: {result.error}")
+
+    created = create_images(car.pk, [result for _, result in done])
+    if created:
+        inventory.refresh_cars([car.pk])
+        cache.bump_version('carimage')
+    for entry, _ in done:
+        default_storage.delete(entry['path'])
+
+    previous = job.result or {}
+    job.result = {'uploaded': previous.get('uploaded', []) + [image.id for image in created]}
+    job.payload['files'] = remaining
+    if remaining:
+        raise RuntimeError('Failed to upload ' + '; '.join(errors))
+    return job.result
+
+
+def create_images(car_id, results):
+    """
+    Insert uploaded images after the car's existing ones. The first becomes
+    primary if the car has none. Returns the created CarImages.
+    """
+    if not results:
+        return []
+    with transaction.atomic():
+        car = Car.objects.select_for_update().filter(pk=car_id).first()
+        if car is None:
+            return []
+        existing = car.images.aggregate(
+            max_order=Max('order'),
+            primaries=Count('id', filter=Q(is_primary=True))
+        )
+        next_order = (existing['max_order'] + 1) if existing['max_order'] is not None else 0
+        needs_primary = not existing['primaries']
+        return CarImage.objects.bulk_create([
+            CarImage(
+                car=car,
+                image_url=result.image_url,
+                cloudinary_public_id=result.public_id,
+                is_primary=needs_primary and index == 0,
+                order=next_order + index
+            )
+            for index, result in enumerate(results)
+        ])
+
+
+@task(DELETE_IMAGE)
+def delete_image(job):
+    """
+    Delete an image from Cloudinary after its CarImage row was removed.
+
+    payload: {'public_id': ...}
+    """
+    cloudinary_destroy(job.payload['public_id'])
+    return {'deleted': job.payload['public_id']}
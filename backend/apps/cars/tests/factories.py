@@ -0,0 +1,42 @@
+"""
+Test data for the Cars app.
+"""
+
+import itertools
+from decimal import Decimal
+
+from apps.cars.models import Brand, Car, CarImage, Category
+
+_vins = itertools.count(1)
+
+
+def create_car(images=0, **fields):
+    """A saved car with `images` images, the second one primary."""
+    number = next(_vins)
+    defaults = {
+        'make': 'Toyota',
+        'model': f'Model {number}',
+        'year': 2020,
+        'price': Decimal('20000.00'),
+        'mileage': 10000,
+        'vin': f'TESTVIN{number:010d}',
+        'color': 'Red',
+    }
+    defaults.update(fields)
+    car = Car.objects.create(**defaults)
+    for order in range(images):
+        CarImage.objects.create(
+            car=car,
+            image_url=f'https://images.example.com/{car.pk}/{order}.jpg',
+            cloudinary_public_id=f'cars/{car.pk}/{order}',
+            is_primary=(order == 1),
+            order=order,
+        )
+    return car
+
+
+def create_cars(count, images=0, **fields):
+    """`count` cars sharing one category and brand."""
+    fields.setdefault('category', Category.objects.get_or_create(name='Sedan')[0])
+    fields.setdefault('brand', Brand.objects.get_or_create(name='Toyota')[0])
+    return [create_car(images=images, **fields) for _ in range(count)]
@@ -0,0 +1,18 @@
+"""
+Stand-in image host for tests (see CAR_IMAGE_UPLOADER).
+"""
+
+import itertools
+
+_ids = itertools.count(1)
+
+
+def fake_upload(file, folder='', timeout=None, public_id=None):
+    """Pretend to upload `file` and return a Cloudinary-like response."""
+    file.read()
+    public_id = f'{folder}/{public_id or f"fake-{next(_ids)}"}'
+    return {'secure_url': f'https://images.example.com/{public_id}.jpg', 'public_id': public_id}
+
+
+def failing_upload(file, folder='', timeout=None, public_id=None):
+    raise ConnectionError('Image host unavailable')
@@ -0,0 +1,77 @@
+"""
+Tests for the bulk car import.
+"""
+
+from io import StringIO
+
+from django.test import TestCase
+
+from apps.cars.importexport import import_rows, read_rows
+from apps.cars.models import Car, Category
+
+
+def row(vin, **fields):
+    values = {
+        'vin': vin, 'make': 'Toyota', 'model': 'Corolla',
+        'year': '2020', 'price': '15000', 'mileage': '30000',
+    }
+    values.update(fields)
+    return values
+
+
+class ImportValidationTests(TestCase):
+
+    def test_invalid_values_fail_their_row_only(self):
+        rows = [
+            (2, row('VIN00000000000001')),
+            (3, row('VIN00000000000002', make='M' * 101)),
+            (4, row('VIN00000000000003', model='M' * 101)),
+            (5, row('VIN00000000000004', color='C' * 51)),
+            (6, row('VIN00000000000005', price='1000000000')),
+            (7, row('VIN00000000000006', category='C' * 101)),
+            (8, row('VIN00000000000007')),
+        ]
+
+        result = import_rows(rows)
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual([line for line, _ in result['errors']], [3, 4, 5, 6, 7])
+        self.assertEqual(
+            set(Car.objects.values_list('vin', flat=True)),
+            {'VIN00000000000001', 'VIN00000000000007'},
+        )
+
+    def test_categories_with_colliding_slugs_are_created(self):
+        rows = [
+            (2, row('VIN00000000000001', category='SUV')),
+            (3, row('VIN00000000000002', category='S.U.V.')),
+            (4, row('VIN00000000000003', category='S-U-V')),
+        ]
+
+        result = import_rows(rows)
+
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(result['categories_created'], 3)
+        self.assertEqual(
+            sorted(Category.objects.values_list('slug', flat=True)),
+            ['s-u-v', 'suv', 'suv-2'],
+        )
+
+    def test_jsonl_lines_that_are_not_objects_fail_their_row_only(self):
+        stream = StringIO(
+            '[1, 2]\n'
+            '"x"\n'
+            '5\n'
+            '{not json\n'
+            '{"vin": "VIN00000000000001", "make": "Toyota", "model": "Corolla", '
+            '"year": 2020, "price": "15000", "mileage": 30000}\n'
+        )
+
+        result = import_rows(read_rows(stream, 'jsonl'))
+
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(
+            result['errors'][:3],
+            [(1, 'Row must be a JSON object'), (2, 'Row must be a JSON object'), (3, 'Row must be a JSON object')],
+        )
+        self.assertEqual(result['errors'][3][0], 4)
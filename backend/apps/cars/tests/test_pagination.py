@@ -0,0 +1,55 @@
+"""
+Tests for keyset (cursor) pagination.
+"""
+
+import base64
+import json
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cars.pagination import KeysetPagination
+
+from .factories import create_cars
+
+
+def make_cursor(position, reverse=False):
+    payload = json.dumps({'p': position, 'r': reverse})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_cars(3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_next_cursor_continues_the_list(self):
+        everything = self.client.get('/api/cars/', {'ordering': '-created_at', 'cursor': ''}).json()
+        with mock.patch.object(KeysetPagination, 'page_size', 2):
+            first = self.client.get('/api/cars/', {'ordering': '-created_at', 'cursor': ''}).json()
+            second = self.client.get(first['next']).json()
+
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            [car['id'] for car in first['results'] + second['results']],
+            [car['id'] for car in everything['results']],
+        )
+
+    def test_tampered_cursor_is_not_found(self):
+        cursors = {
+            'not base64': 'zzz',
+            'not a position': make_cursor([1, 2]),
+            'wrong keys': make_cursor({'price': '1'}),
+            'unparseable values': make_cursor({'created_at': 'zzz', 'id': 'nope'}),
+            'wrong types': make_cursor({'created_at': [1], 'id': {'a': 1}}),
+            'null values': make_cursor({'created_at': None, 'id': None}),
+        }
+        for label, cursor in cursors.items():
+            with self.subTest(label):
+                response = self.client.get('/api/cars/', {'ordering': '-created_at', 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,31 @@
+"""
+The car lists must not run queries per car (see apps/core/pytest_plugin.py).
+Data fixtures are listed before query_check so their setup is not captured.
+"""
+
+import pytest
+
+from .factories import create_cars
+
+
+@pytest.fixture
+def cars_with_images(db):
+    return create_cars(12, images=3)
+
+
+def test_public_car_list_images(cars_with_images, api_client, query_check):
+    response = api_client.get('/api/cars/')
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == 12
+    assert all(car['primary_image']['is_primary'] for car in results)
+
+
+def test_admin_car_list_images(cars_with_images, admin_api_client, query_check):
+    response = admin_api_client.get('/api/cars/admin/cars/')
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == 12
+    assert all(car['primary_image']['is_primary'] for car in results)
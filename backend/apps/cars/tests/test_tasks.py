@@ -0,0 +1,102 @@
+"""
+Tests for the Cars background tasks.
+"""
+
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.cars import tasks
+from apps.cars.models import CarImage
+from apps.cars.uploads import DEFAULT_FOLDER
+from apps.jobs.models import Job
+from apps.jobs.queue import enqueue, run_pending
+
+from .factories import create_car
+
+
+class UploadImagesTaskTests(TestCase):
+    """Order and primary are assigned when the images are inserted."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            CAR_IMAGE_UPLOADER='apps.cars.tests.fakes.fake_upload',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def queue_upload(self, car, count):
+        files = [
+            {
+                'path': default_storage.save(f'pending_uploads/test/{n}.jpg', ContentFile(b'jpeg')),
+                'name': f'{n}.jpg',
+                'public_id': f'test-{n}',
+            }
+            for n in range(count)
+        ]
+        return enqueue(tasks.UPLOAD_IMAGES, {'car_id': str(car.pk), 'files': files})
+
+    def test_uploads_queued_together_get_one_primary_and_consecutive_orders(self):
+        car = create_car()
+        self.queue_upload(car, 2)
+        self.queue_upload(car, 3)
+
+        self.assertEqual(run_pending(), 2)
+
+        images = list(CarImage.objects.filter(car=car).order_by('order'))
+        self.assertEqual([image.order for image in images], [0, 1, 2, 3, 4])
+        self.assertEqual([image.is_primary for image in images], [True, False, False, False, False])
+
+    def test_images_go_after_existing_ones(self):
+        car = create_car(images=2)
+        self.queue_upload(car, 2)
+
+        run_pending()
+
+        images = list(CarImage.objects.filter(car=car).order_by('order'))
+        self.assertEqual([image.order for image in images], [0, 1, 2, 3])
+        self.assertEqual(sum(image.is_primary for image in images), 1)
+        self.assertTrue(images[1].is_primary)
+
+    def test_retry_uploads_with_the_same_public_id(self):
+        car = create_car()
+        job = self.queue_upload(car, 1)
+        with override_settings(CAR_IMAGE_UPLOADER='apps.cars.tests.fakes.failing_upload'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending()
+
+        [image] = CarImage.objects.filter(car=car)
+        self.assertEqual(image.cloudinary_public_id, f'{DEFAULT_FOLDER}/test-0')
+
+    def test_stashed_files_are_deleted_after_upload(self):
+        car = create_car()
+        job = self.queue_upload(car, 2)
+
+        run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(default_storage.listdir('pending_uploads/test')[1], [])
+
+    def test_stashed_files_are_deleted_when_the_job_gives_up(self):
+        car = create_car()
+        job = self.queue_upload(car, 2)
+        Job.objects.filter(pk=job.pk).update(max_attempts=1)
+
+        with override_settings(CAR_IMAGE_UPLOADER='apps.cars.tests.fakes.failing_upload'):
+            run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_DEAD)
+        self.assertEqual(default_storage.listdir('pending_uploads/test')[1], [])
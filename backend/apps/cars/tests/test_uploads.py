@@ -0,0 +1,85 @@
+"""
+Tests for the concurrent image upload pipeline.
+"""
+
+import io
+import threading
+import time
+
+from django.core.files.base import ContentFile, File
+from django.test import SimpleTestCase
+
+from apps.cars.uploads import upload_files
+
+
+def sleeping_uploader(delays):
+    """Uploader that takes delays[file name] seconds per file."""
+    def upload(file, folder='', timeout=None, public_id=None):
+        time.sleep(delays[file.name])
+        return {'secure_url': f'https://images.example.com/{file.name}', 'public_id': file.name}
+    return upload
+
+
+def make_files(*names):
+    return [ContentFile(b'jpeg', name=name) for name in names]
+
+
+class UploadTimeoutTests(SimpleTestCase):
+
+    def test_timeout_applies_to_each_file(self):
+        # One worker, two rounds: the slow file gets 0.3s from its own start,
+        # not 0.6s for the whole queue
+        uploader = sleeping_uploader({'fast.jpg': 0.0, 'slow.jpg': 0.5})
+
+        results = upload_files(make_files('fast.jpg', 'slow.jpg'), uploader=uploader, max_workers=1, timeout=0.3)
+
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[1].error, 'Upload timed out')
+
+    def test_queued_files_get_their_own_timeout(self):
+        uploader = sleeping_uploader({'a.jpg': 0.2, 'b.jpg': 0.2, 'c.jpg': 0.2})
+
+        results = upload_files(make_files('a.jpg', 'b.jpg', 'c.jpg'), uploader=uploader, max_workers=1, timeout=0.3)
+
+        self.assertEqual([result.ok for result in results], [True, True, True])
+        self.assertEqual([result.public_id for result in results], ['a.jpg', 'b.jpg', 'c.jpg'])
+
+    def test_file_stuck_in_the_queue_times_out(self):
+        uploader = sleeping_uploader({'hung.jpg': 1.0, 'queued.jpg': 0.0})
+
+        started = time.monotonic()
+        results = upload_files(make_files('hung.jpg', 'queued.jpg'), uploader=uploader, max_workers=1, timeout=0.2)
+
+        self.assertEqual([result.error for result in results], ['Upload timed out', 'Upload timed out'])
+        self.assertLess(time.monotonic() - started, 0.9)
+
+
+class UploadFileLifetimeTests(SimpleTestCase):
+
+    def test_timed_out_file_stays_open_until_its_upload_finishes(self):
+        release, reads = threading.Event(), []
+
+        def upload(file, folder='', timeout=None, public_id=None):
+            release.wait(5)
+            reads.append(file.read())
+            return {'secure_url': '', 'public_id': public_id}
+
+        files = [File(io.BytesIO(b'jpeg'), name='late.jpg')]
+        results = upload_files(files, uploader=upload, timeout=0.1, close_files=True)
+
+        self.assertEqual(results[0].error, 'Upload timed out')
+        self.assertFalse(files[0].closed)
+        release.set()
+        deadline = time.monotonic() + 5
+        while not files[0].closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(reads, [b'jpeg'])
+        self.assertTrue(files[0].closed)
+
+    def test_uploads_use_the_given_public_ids(self):
+        def upload(file, folder='', timeout=None, public_id=None):
+            return {'secure_url': f'https://images.example.com/{public_id}', 'public_id': f'{folder}/{public_id}'}
+
+        results = upload_files(make_files('a.jpg', 'b.jpg'), folder='cars', uploader=upload, public_ids=['batch-0', 'batch-1'])
+
+        self.assertEqual([result.public_id for result in results], ['cars/batch-0', 'cars/batch-1'])
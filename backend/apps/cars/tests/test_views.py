@@ -0,0 +1,179 @@
+"""
+Tests for the Cars API views.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cars.models import Brand, Car, CarImage, Category
+from apps.cars.pagination import KeysetPagination
+
+from .factories import create_car, create_cars
+
+
+class CarListQueryCountTests(TestCase):
+    """The car lists run the same number of queries whatever the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_cars(20, images=4)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_page(self, page_size, url='/api/cars/'):
+        with mock.patch.object(KeysetPagination, 'page_size', page_size):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # COUNT + one page of rows
+        for page_size in (5, 20):
+            with self.subTest(page_size=page_size), self.assertNumQueries(2):
+                results = self.get_page(page_size)
+            self.assertEqual(len(results), page_size)
+            self.assertTrue(all(car['primary_image']['is_primary'] for car in results))
+
+    def test_admin_query_count_does_not_depend_on_page_size(self):
+        self.client.force_authenticate(self.admin)
+        # COUNT + one page of cars + their images
+        for page_size in (5, 20):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                results = self.get_page(page_size, url='/api/cars/admin/cars/')
+            self.assertEqual(len(results), page_size)
+            self.assertTrue(all(car['primary_image']['is_primary'] for car in results))
+
+
+class CarBulkQueryCountTests(TestCase):
+    """The bulk API runs the same number of queries for 5 cars as for 500."""
+
+    url = '/api/cars/admin/cars/bulk/'
+    sizes = (5, 500)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.category = Category.objects.create(name='Sedan')
+        cls.brand = Brand.objects.create(name='Toyota')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        # Django caps SQLite statements at 999 parameters and splits bulk
+        # writes to fit; PostgreSQL (and the SQLite built here) take the
+        # whole batch in one statement.
+        patcher = mock.patch.object(connection.features, 'max_query_params', 32766)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def items(self, count, prefix='BULK'):
+        return [
+            {
+                'make': 'Toyota',
+                'model': f'Model {number}',
+                'year': 2020,
+                'price': '20000.00',
+                'mileage': 10000,
+                'vin': f'{prefix}{count:04d}{number:09d}',
+                'color': 'Red',
+                'category': self.category.pk,
+                'brand': self.brand.pk,
+            }
+            for number in range(count)
+        ]
+
+    def test_create(self):
+        # VINs + categories + brands, then in one transaction (2 savepoints):
+        # INSERT cars, and the inventory refresh (cars, images, existing
+        # rows, INSERT)
+        for size in self.sizes:
+            with self.subTest(size=size), self.assertNumQueries(12):
+                response = self.client.post(self.url, self.items(size), format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['count'], size)
+            self.assertEqual(Car.objects.filter(pk__in=response.json()['ids']).count(), size)
+
+    def test_patch(self):
+        for size in self.sizes:
+            ids = [car.pk for car in create_cars(size)]
+            items = [{'id': pk, 'price': '15000.00'} for pk in ids]
+            # Cars being updated + VINs + categories + brands, then in one
+            # transaction: UPDATE cars and the inventory refresh
+            with self.subTest(size=size), self.assertNumQueries(10):
+                response = self.client.patch(self.url, items, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                Car.objects.filter(pk__in=ids, price='15000.00').count(), size
+            )
+
+    def test_invalid_items(self):
+        for size in self.sizes:
+            items = self.items(size)
+            items[1]['year'] = 'not a year'
+            items[-1]['price'] = '-5'
+            # The batch checks run once even when some items are invalid
+            with self.subTest(size=size), self.assertNumQueries(3):
+                response = self.client.post(self.url, items, format='json')
+            self.assertEqual(response.status_code, 400)
+            errors = response.json()['errors']
+            self.assertEqual(len(errors), size)
+            self.assertIn('year', errors[1])
+            self.assertIn('price', errors[-1])
+            self.assertEqual(errors[0], {})
+        self.assertFalse(Car.objects.exists())
+
+    def test_duplicate_vins_in_batch(self):
+        for size in self.sizes:
+            items = self.items(size)
+            items[-1]['vin'] = items[0]['vin']
+            with self.subTest(size=size), self.assertNumQueries(3):
+                response = self.client.post(self.url, items, format='json')
+            self.assertEqual(response.status_code, 400)
+            errors = response.json()['errors']
+            self.assertEqual(errors[0]['vin'], ['This VIN appears more than once in the request.'])
+            self.assertEqual(errors[-1]['vin'], ['This VIN appears more than once in the request.'])
+            self.assertEqual(sum(1 for error in errors if error), 2)
+        self.assertFalse(Car.objects.exists())
+
+    def test_existing_vins(self):
+        for size in self.sizes:
+            items = self.items(size)
+            existing = create_car(vin=items[2]['vin'])
+            with self.subTest(size=size), self.assertNumQueries(3):
+                response = self.client.post(self.url, items, format='json')
+            self.assertEqual(response.status_code, 400)
+            errors = response.json()['errors']
+            self.assertEqual(errors[2]['vin'], ['A car with this VIN already exists.'])
+            self.assertEqual(sum(1 for error in errors if error), 1)
+            self.assertEqual(list(Car.objects.values_list('pk', flat=True)), [existing.pk])
+            existing.delete()
+
+    def test_failed_write_rolls_back(self):
+        for size in self.sizes:
+            with self.subTest(size=size):
+                with mock.patch('apps.cars.bulk.inventory.refresh_cars', side_effect=DatabaseError):
+                    with self.assertRaises(DatabaseError):
+                        self.client.post(self.url, self.items(size), format='json')
+                self.assertFalse(Car.objects.exists())
+
+
+class AdminCarImageDeleteTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def test_image_is_kept_if_its_delete_job_cannot_be_queued(self):
+        image = create_car(images=1).images.get()
+
+        with mock.patch('apps.cars.views.enqueue', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.delete(f'/api/cars/admin/cars/images/{image.pk}/')
+
+        self.assertTrue(CarImage.objects.filter(pk=image.pk).exists())
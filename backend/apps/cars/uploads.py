@@ -0,0 +1,147 @@
+"""
+Concurrent image upload pipeline for car photos.
+
+Files are pushed to the image host through a bounded thread pool, so a
+multi-photo upload takes roughly as long as the slowest single file instead
+of the sum of all of them. Only the upload runs in worker threads; database
+writes stay on the request thread.
+
+The uploader is pluggable through the CAR_IMAGE_UPLOADER setting (a dotted
+path to a callable taking `(file, folder=..., timeout=..., public_id=...)`
+and returning a dict with 'secure_url' and 'public_id'), so tests can use a
+local fake.
+
+A file that times out is reported as failed, but its upload can't be stopped
+and may still finish later. Callers that retry failed files pass a fixed
+public_id per file so the retry overwrites the late upload instead of
+creating a second asset, and let upload_files close the files (close_files)
+so a handle is not closed while a thread is still reading it.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+
+import cloudinary.uploader
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_FOLDER = 'renawicars/cars'
+
+
+def cloudinary_upload(file, folder=DEFAULT_FOLDER, timeout=None, public_id=None):
+    """Upload a file to Cloudinary, replacing any asset with the same public_id."""
+    options = {'folder': folder}
+    if timeout:
+        options['timeout'] = timeout
+    if public_id:
+        options['public_id'] = public_id
+        options['overwrite'] = True
+    return cloudinary.uploader.upload(file, **options)
+
+
+def cloudinary_destroy(public_id):
+    """Delete a file from Cloudinary."""
+    return cloudinary.uploader.destroy(public_id)
+
+
+def get_uploader():
+    return import_string(getattr(settings, 'CAR_IMAGE_UPLOADER', 'apps.cars.uploads.cloudinary_upload'))
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading one file."""
+    name: str
+    image_url: str = ''
+    public_id: str = ''
+    error: str = ''
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+def _result_within(future, started_at, timeout, start_by):
+    """
+    Result of an upload, allowing `timeout` seconds from the moment it starts
+    running. A file still queued at `start_by` gets `timeout` seconds from
+    then. Raises TimeoutError.
+    """
+    while True:
+        start = started_at()
+        deadline = (start if start is not None else start_by) + timeout
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            if started_at() == start:
+                raise
+            # Started while we were waiting: give it its own full timeout
+
+
+def upload_files(files, folder=DEFAULT_FOLDER, uploader=None, max_workers=None, timeout=None,
+                 public_ids=None, close_files=False):
+    """
+    Upload files concurrently and return one UploadResult per file,
+    in the same order as `files`.
+
+    max_workers bounds the thread pool (CAR_IMAGE_UPLOAD_WORKERS).
+    timeout is the per-file limit in seconds (CAR_IMAGE_UPLOAD_TIMEOUT),
+    counted from when the file's upload starts, not from when it was queued;
+    a file that has not finished within it is reported as failed.
+    public_ids optionally gives the public_id to upload each file as.
+    With close_files, each file is closed once its upload is over, which for
+    a timed-out file may be after this returns.
+    """
+    uploader = uploader or get_uploader()
+    if max_workers is None:
+        max_workers = getattr(settings, 'CAR_IMAGE_UPLOAD_WORKERS', 4)
+    if timeout is None:
+        timeout = getattr(settings, 'CAR_IMAGE_UPLOAD_TIMEOUT', 30)
+    if not files:
+        return []
+    if public_ids is None:
+        public_ids = [None] * len(files)
+
+    workers = max(1, min(max_workers, len(files)))
+    # Files queue up behind each other when there are more files than workers;
+    # even if every upload ahead of it times out, a file starts by this time
+    rounds = -(-len(files) // workers)
+    start_by = time.monotonic() + timeout * (rounds - 1)
+    started = [None] * len(files)
+
+    def upload(index, file):
+        started[index] = time.monotonic()
+        return uploader(file, folder=folder, timeout=timeout, public_id=public_ids[index])
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='car-image-upload')
+    try:
+        futures = []
+        for index, file in enumerate(files):
+            future = executor.submit(upload, index, file)
+            if close_files:
+                # Also runs when a queued upload is cancelled
+                future.add_done_callback(lambda _, file=file: file.close())
+            futures.append(future)
+        results = []
+        for index, (file, future) in enumerate(zip(files, futures)):
+            name = getattr(file, 'name', '') or ''
+            try:
+                response = _result_within(future, lambda: started[index], timeout, start_by)
+            except TimeoutError:
+                future.cancel()
+                results.append(UploadResult(name=name, error='Upload timed out'))
+                continue
+            except Exception as e:
+                results.append(UploadResult(name=name, error=str(e)))
+                continue
+
+            results.append(UploadResult(
+                name=name,
+                image_url=response.get('secure_url', ''),
+                public_id=response.get('public_id', ''),
+            ))
+        return results
+    finally:
+        # Don't block the request on uploads that already timed out
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -10,11 +10,13 @@ urlpatterns = [
     path('categories/', views.CategoryListView.as_view(), name='category-list'),
     path('brands/', views.BrandListView.as_view(), name='brand-list'),
     path('', views.CarListView.as_view(), name='car-list'),
+    path('facets/', views.CarFacetsView.as_view(), name='car-facets'),
     path('<uuid:pk>/', views.CarDetailView.as_view(), name='car-detail'),
     path('<uuid:pk>/view/', views.record_car_view, name='car-view'),
 
     # Admin endpoints
     path('admin/cars/', views.AdminCarListCreateView.as_view(), name='admin-car-list-create'),
+    path('admin/cars/bulk/', views.AdminCarBulkView.as_view(), name='admin-car-bulk'),
     path('admin/cars/<uuid:pk>/', views.AdminCarDetailView.as_view(), name='admin-car-detail'),
     path('admin/cars/<uuid:car_id>/images/', views.AdminCarImageUploadView.as_view(), name='admin-car-image-upload'),
     path('admin/cars/images/<int:pk>/', views.AdminCarImageDeleteView.as_view(), name='admin-car-image-delete'),
@@ -22,4 +24,5 @@ urlpatterns = [
     path('admin/categories/<int:pk>/', views.AdminCategoryDetailView.as_view(), name='admin-category-detail'),
     path('admin/brands/', views.AdminBrandListCreateView.as_view(), name='admin-brand-list-create'),
     path('admin/brands/<int:pk>/', views.AdminBrandDetailView.as_view(), name='admin-brand-detail'),
+    path('admin/cache-stats/', views.catalog_cache_stats, name='admin-catalog-cache-stats'),
 ]
@@ -5,50 +5,64 @@ API Views for the Cars app.
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import Category, Brand, Car, CarImage
+from rest_framework.filters import OrderingFilter
+from .models import Category, Brand, Car, CarImage, AvailableCar
+from .bulk import BulkValidationError, bulk_create_cars, bulk_update_cars
 from .serializers import (
     CategorySerializer,
     BrandSerializer,
-    CarListSerializer,
+    AvailableCarSerializer,
+    AdminCarListSerializer,
     CarDetailSerializer,
     CarCreateUpdateSerializer,
     CarImageSerializer
 )
-from .filters import CarFilter
-import cloudinary.uploader
+from .filters import AvailableCarFilter, AdminCarFilter
+from .search import CarSearchFilter
+from .facets import facet_counts
+from .cache import CatalogCacheMixin
+from . import cache, tasks
+from apps.jobs.queue import enqueue
+import uuid
 
 
 # ============= PUBLIC VIEWS =============
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CatalogCacheMixin, generics.ListAPIView):
     """
     Public endpoint to list all categories.
     GET /api/cars/categories/
     """
+    cache_models = ('category',)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True
 
 
-class BrandListView(generics.ListAPIView):
+class BrandListView(CatalogCacheMixin, generics.ListAPIView):
     """
     Public endpoint to list all brands.
     GET /api/cars/brands/
     """
+    cache_models = ('brand',)
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True
 
 
-class CarListView(generics.ListAPIView):
+class CarListView(CatalogCacheMixin, generics.ListAPIView):
     """
     Public endpoint to list all available cars with filtering.
     GET /api/cars/
 
     Query parameters:
-    - search: Search in make, model, VIN, description
+    - search: Full-text search in make, model, VIN, description
     - make: Filter by make
     - year_min, year_max: Filter by year range
     - price_min, price_max: Filter by price range
@@ -58,26 +72,48 @@ class CarListView(generics.ListAPIView):
     - category: Filter by category ID
     - brand: Filter by brand ID
     - status: Filter by status
-    - ordering: Order by field (e.g., 'price', '-year')
+    - ordering: Order by field (e.g., 'price', '-year', '-relevance')
+
+    Served from the AvailableCar projection (see inventory.py): one flat
+    table, no joins or image prefetch.
     """
-    queryset = Car.objects.filter(status='available').select_related('category', 'brand').prefetch_related('images')
-    serializer_class = CarListSerializer
+    cache_models = ('car', 'carimage', 'category', 'brand')
+    queryset = AvailableCar.objects.defer('search_vector')
+    serializer_class = AvailableCarSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_class = CarFilter
-    search_fields = ['make', 'model', 'vin', 'description']
-    ordering_fields = ['price', 'year', 'mileage', 'created_at']
+    read_replica = True
+    filter_backends = [DjangoFilterBackend, CarSearchFilter, OrderingFilter]
+    filterset_class = AvailableCarFilter
+    ordering_fields = ['price', 'year', 'mileage', 'created_at', 'relevance']
     ordering = ['-created_at']  # Default ordering
 
 
-class CarDetailView(generics.RetrieveAPIView):
+class CarDetailView(CatalogCacheMixin, generics.RetrieveAPIView):
     """
     Public endpoint to get a single car's details.
     GET /api/cars/{id}/
     """
+    cache_models = ('car', 'carimage', 'category', 'brand')
     queryset = Car.objects.all().select_related('category', 'brand').prefetch_related('images', 'maintenance_records')
     serializer_class = CarDetailSerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True
+
+
+class CarFacetsView(CatalogCacheMixin, generics.ListAPIView):
+    """
+    Public endpoint to get facet counts for the inventory filter panel.
+    GET /api/cars/facets/
+
+    Accepts the same query parameters as the car list (CarFilter + search).
+    Each facet is counted with every filter applied except its own.
+    """
+    permission_classes = [permissions.AllowAny]
+    read_replica = True
+    cache_models = ('car', 'category', 'brand')
+
+    def list(self, request, *args, **kwargs):
+        return Response(facet_counts(request))
 
 
 @api_view(['POST'])
@@ -86,22 +122,21 @@ def record_car_view(request, pk):
     """
     Record a car view for analytics.
     POST /api/cars/{id}/view/
+
+    The view is buffered and written in batches (see apps.analytics.view_buffer),
+    so this endpoint does not write to the database on every hit.
     """
-    try:
-        car = Car.objects.get(pk=pk)
-        car.increment_views()
+    if not Car.objects.filter(pk=pk).exists():
+        return Response({'error': 'Car not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Also create a CarView record for analytics
-        from apps.analytics.models import CarView
-        CarView.objects.create(
-            car=car,
-            visitor_ip=request.META.get('REMOTE_ADDR', ''),
-            session_id=request.session.session_key or ''
-        )
+    from apps.analytics.view_buffer import car_view_buffer
+    car_view_buffer.record(
+        pk,
+        visitor_ip=request.META.get('REMOTE_ADDR', ''),
+        session_id=request.session.session_key or ''
+    )
 
-        return Response({'message': 'View recorded'}, status=status.HTTP_200_OK)
-    except Car.DoesNotExist:
-        return Response({'error': 'Car not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'View recorded'}, status=status.HTTP_200_OK)
 
 
 # ============= ADMIN VIEWS =============
@@ -114,11 +149,16 @@ class AdminCarListCreateView(generics.ListCreateAPIView):
     """
     queryset = Car.objects.all().select_related('category', 'brand').prefetch_related('images')
     permission_classes = [permissions.IsAdminUser]
+    filterset_class = AdminCarFilter
+    ordering_fields = [
+        'created_at', 'price', 'year', 'mileage', 'views_count',
+        'maintenance_cost_total', 'maintenance_count'
+    ]
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CarCreateUpdateSerializer
-        return CarListSerializer
+        return AdminCarListSerializer
 
 
 class AdminCarDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -137,10 +177,55 @@ class AdminCarDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CarDetailSerializer
 
 
+class AdminCarBulkView(generics.GenericAPIView):
+    """
+    Admin endpoint to create or update many cars in one request.
+    POST /api/admin/cars/bulk/   [{car}, ...]
+    PATCH /api/admin/cars/bulk/  [{"id": ..., field: value, ...}, ...]
+
+    All items are written in one transaction, or none if any item is
+    invalid; errors are returned per item, in request order.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return None, Response({'error': 'Expected a non-empty list of cars'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.CAR_BULK_MAX_ITEMS:
+            return None, Response(
+                {'error': f'At most {settings.CAR_BULK_MAX_ITEMS} cars per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    def write(self, request, operation, success_status):
+        items, error = self.get_items(request)
+        if error:
+            return error
+        try:
+            cars = operation(items)
+        except BulkValidationError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'count': len(cars), 'ids': [car.pk for car in cars]},
+            status=success_status
+        )
+
+    def post(self, request, *args, **kwargs):
+        return self.write(request, bulk_create_cars, status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        return self.write(request, bulk_update_cars, status.HTTP_200_OK)
+
+
 class AdminCarImageUploadView(generics.CreateAPIView):
     """
     Admin endpoint to upload images for a car.
     POST /api/admin/cars/{car_id}/images/
+
+    Files are stashed locally and uploaded by a background job; the response
+    is 202 Accepted with the job id to poll at /api/jobs/admin/{id}/.
     """
     serializer_class = CarImageSerializer
     permission_classes = [permissions.IsAdminUser]
@@ -154,44 +239,26 @@ class AdminCarImageUploadView(generics.CreateAPIView):
 
         # Handle multiple image uploads
         images = request.FILES.getlist('images')
-        
+
         if not images:
             return Response({'error': 'No images provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_images = []
-        errors = []
-
-        for image_file in images:
-            try:
-                # Upload to Cloudinary
-                upload_result = cloudinary.uploader.upload(
-                    image_file,
-                    folder="renawicars/cars"
-                )
-                
-                # Create CarImage record
-                car_image = CarImage.objects.create(
-                    car=car,
-                    image_url=upload_result.get('secure_url'),
-                    cloudinary_public_id=upload_result.get('public_id'),
-                    is_primary=False
-                )
-                
-                # If this is the first image, make it primary
-                if car.images.count() == 1:
-                    car_image.is_primary = True
-                    car_image.save()
-                
-                serializer = self.get_serializer(car_image)
-                created_images.append(serializer.data)
-                
-            except Exception as e:
-                errors.append(f"Failed to upload {image_file.name}: {str(e)}")
-
-        if not created_images and errors:
-             return Response({'error': 'Failed to upload images', 'details': errors}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        return Response(created_images, status=status.HTTP_201_CREATED)
+        # Order and primary are assigned by the job when it inserts the images
+        batch = uuid.uuid4().hex
+        files = [
+            {
+                'path': default_storage.save(f'pending_uploads/{batch}/{image_file.name}', image_file),
+                'name': image_file.name,
+                'public_id': f'{batch}-{index}',
+            }
+            for index, image_file in enumerate(images)
+        ]
+        job = enqueue(tasks.UPLOAD_IMAGES, {'car_id': str(car.pk), 'files': files})
+
+        return Response(
+            {'job_id': job.id, 'status': job.status, 'files': len(files)},
+            status=status.HTTP_202_ACCEPTED
+        )
 
 
 class AdminCarImageDeleteView(generics.DestroyAPIView):
@@ -203,16 +270,14 @@ class AdminCarImageDeleteView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAdminUser]
 
     def perform_destroy(self, instance):
-        # Delete from Cloudinary
-        if instance.cloudinary_public_id:
-            try:
-                cloudinary.uploader.destroy(instance.cloudinary_public_id)
-            except Exception as e:
-                # Log error but continue with DB deletion
-                print(f"Failed to delete image from Cloudinary: {e}")
-        
-        # Delete from DB
-        instance.delete()
+        public_id = instance.cloudinary_public_id
+
+        # The row and the job that deletes its file are committed together
+        with transaction.atomic():
+            instance.delete()
+            # Delete from Cloudinary in the background
+            if public_id:
+                enqueue(tasks.DELETE_IMAGE, {'public_id': public_id})
 
 
 class AdminCategoryListCreateView(generics.ListCreateAPIView):
@@ -259,3 +324,13 @@ class AdminBrandDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [permissions.IsAdminUser]
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def catalog_cache_stats(request):
+    """
+    Admin endpoint to get catalog response cache hit/miss counters.
+    GET /api/cars/admin/cache-stats/
+    """
+    return Response(cache.stats())
@@ -0,0 +1,326 @@
+"""
+API benchmarks: query count, latency and response size per endpoint.
+
+Every route in the cars, analytics and maintenance URL modules is requested
+through the test client against a seeded dataset (see seed.py). Routes map
+to one or more benchmark cases in CASES; routes that cannot be benchmarked
+safely are listed in SKIPPED with the reason, and any route in neither is
+reported as uncovered so new endpoints do not go unnoticed.
+
+Image uploads and deletes only stash files and queue jobs in the request, and
+jobs are not run during a benchmark. CAR_IMAGE_UPLOADER is still pointed at a
+local fake and MEDIA_ROOT at a temporary directory, so a benchmark never
+talks to Cloudinary or leaves files behind.
+
+A report looks like:
+
+    {
+        "database": "postgresql",
+        "dataset": {"cars": 2000, ...},
+        "repeat": 20,
+        "endpoints": {
+            "GET car-list": {
+                "url": "/api/cars/", "status": 200, "queries": 3, "max_same_query": 1,
+                "p50_ms": 4.1, "p95_ms": 5.3, "cold_ms": 12.0, "bytes": 10240
+            },
+            ...
+        },
+        "skipped": {},
+        "uncovered": []
+    }
+
+`compare()` checks a report against a stored baseline: more queries than the
+baseline, or a p95 latency above the tolerance, is a regression.
+"""
+
+import itertools
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+from apps.analytics.models import Inquiry, Sale
+from apps.cars.models import Brand, Car, CarImage, Category
+from apps.maintenance.models import MaintenanceRecord
+
+from .perf import percentile
+from .querycheck import QueryCapture
+
+URL_MODULES = ['apps.cars.urls', 'apps.analytics.urls', 'apps.maintenance.urls']
+
+BULK_ITEMS = 100
+UPLOAD_IMAGES = 3
+
+FAKE_UPLOADER = 'apps.cars.tests.fakes.fake_upload'
+
+# kwargs: URL kwarg -> fixture name (see load_fixtures), or a
+#   callable(iteration, fixtures) returning the value (called before timing)
+# data: request body, or a callable(iteration, fixtures) returning one
+# format: request body encoding ('json' or 'multipart')
+Case = namedtuple('Case', ['label', 'method', 'query', 'kwargs', 'data', 'admin', 'format'])
+
+
+def case(label='', method='get', query='', kwargs=None, data=None, admin=False, format='json'):
+    return Case(label, method, query, kwargs or {}, data, admin, format)
+
+
+def _bulk_create_data(iteration, fixtures):
+    return [{
+        'make': 'Benchmark',
+        'model': f'Bulk {j}',
+        'year': 2020,
+        'price': '15000.00',
+        'mileage': 1000,
+        'vin': f'BULK{iteration:06d}{j:07d}',
+        'color': 'Black',
+        'category': fixtures['category'],
+        'brand': fixtures['brand'],
+    } for j in range(BULK_ITEMS)]
+
+
+def _bulk_update_data(iteration, fixtures):
+    return [{'id': str(car_id), 'mileage': 1000 + iteration} for car_id in fixtures['bulk_car_ids']]
+
+
+def _image_upload_data(iteration, fixtures):
+    return {'images': [
+        SimpleUploadedFile(f'benchmark-{iteration}-{j}.jpg', b'\xff\xd8\xff\xe0' + bytes(1024), 'image/jpeg')
+        for j in range(UPLOAD_IMAGES)
+    ]}
+
+
+def _new_image(iteration, fixtures):
+    """A fresh image to delete, so every DELETE finds one."""
+    return CarImage.objects.create(
+        car_id=fixtures['car'],
+        image_url=f'https://images.example.com/benchmark/{iteration}.jpg',
+        cloudinary_public_id=f'benchmark/{iteration}',
+        order=1000 + iteration,
+    ).pk
+
+
+def _maintenance_data(iteration, fixtures):
+    return {
+        'car': str(fixtures['car']),
+        'repair_date': str(timezone.localdate()),
+        'description': 'Benchmark service',
+        'total_cost': '265.00',
+        'parts': [
+            {'part_name': 'Oil filter', 'part_cost': '25.00', 'quantity': 1},
+            {'part_name': 'Brake pads', 'part_cost': '120.00', 'quantity': 2},
+        ],
+    }
+
+
+CASES = {
+    # Cars: public
+    'category-list': [case()],
+    'brand-list': [case()],
+    'car-list': [
+        case(),
+        case('filtered', query='make=toyota&price_min=10000&price_max=40000&ordering=-price'),
+        case('search', query='search=camry&ordering=-relevance'),
+        case('page 5', query='page=5'),
+        case('cursor', query='cursor=&ordering=-price'),
+    ],
+    'car-facets': [case(), case('filtered', query='fuel_type=petrol')],
+    'car-detail': [case(kwargs={'pk': 'car'})],
+    'car-view': [case(method='post', kwargs={'pk': 'car'})],
+    # Cars: admin
+    'admin-car-list-create': [
+        case(admin=True),
+        case('by maintenance cost', query='ordering=-maintenance_cost_total', admin=True),
+    ],
+    'admin-car-bulk': [
+        case('create', method='post', data=_bulk_create_data, admin=True),
+        case('update', method='patch', data=_bulk_update_data, admin=True),
+    ],
+    'admin-car-detail': [case(kwargs={'pk': 'car'}, admin=True)],
+    'admin-car-image-upload': [
+        case(method='post', kwargs={'car_id': 'car'}, data=_image_upload_data, admin=True, format='multipart'),
+    ],
+    'admin-car-image-delete': [case(method='delete', kwargs={'pk': _new_image}, admin=True)],
+    'admin-category-list-create': [case(admin=True)],
+    'admin-category-detail': [case(kwargs={'pk': 'category'}, admin=True)],
+    'admin-brand-list-create': [case(admin=True)],
+    'admin-brand-detail': [case(kwargs={'pk': 'brand'}, admin=True)],
+    'admin-catalog-cache-stats': [case(admin=True)],
+    # Analytics
+    'inquiry-create': [case(method='post', data=lambda iteration, fixtures: {
+        'car': str(fixtures['car']),
+        'name': 'Benchmark',
+        'email': 'benchmark@example.com',
+        'message': 'Is this car still available?',
+    })],
+    'analytics-events': [case(method='post', data=lambda iteration, fixtures: {
+        'session_id': f'benchmark-{iteration}',
+        'events': [{'type': 'page_view', 'url': '/cars'}, {'type': 'car_view', 'car_id': str(fixtures['car'])}],
+    })],
+    'admin-inquiry-list': [case(admin=True)],
+    'admin-inquiry-detail': [case(kwargs={'pk': 'inquiry'}, admin=True)],
+    'admin-sale-list-create': [case(admin=True), case('by net margin', query='ordering=-net_margin', admin=True)],
+    'admin-sale-detail': [case(kwargs={'pk': 'sale'}, admin=True)],
+    'analytics-overview': [case(admin=True)],
+    'analytics-page-views': [case(admin=True)],
+    'analytics-car-views': [case(admin=True)],
+    'analytics-inquiries-stats': [case(admin=True)],
+    'analytics-sales-stats': [case(admin=True)],
+    'analytics-profitability': [case(admin=True), case('by month', query='group_by=month', admin=True)],
+    # Maintenance
+    'admin-maintenance-list-all': [case(admin=True)],
+    'admin-maintenance-list-car': [case(kwargs={'car_id': 'maintained_car'}, admin=True)],
+    'admin-maintenance-create': [case(method='post', data=_maintenance_data, admin=True)],
+    'admin-maintenance-detail': [case(kwargs={'pk': 'maintenance_record'}, admin=True)],
+}
+
+SKIPPED = {}
+
+
+def route_names():
+    """Names of every route in URL_MODULES, in declaration order."""
+    names = []
+    for module in URL_MODULES:
+        for pattern in import_string(f'{module}.urlpatterns'):
+            if isinstance(pattern, URLPattern) and pattern.name:
+                names.append(pattern.name)
+    return names
+
+
+def load_fixtures():
+    """Ids of existing rows to use in URLs and request bodies."""
+    car = (
+        Car.objects.filter(status=Car.STATUS_AVAILABLE, maintenance_count__gt=0)
+        .order_by('-views_count').values_list('id', flat=True).first()
+    ) or Car.objects.values_list('id', flat=True).first()
+    record = MaintenanceRecord.objects.order_by('id').first()
+    return {
+        'car': car,
+        'maintained_car': record.car_id if record else car,
+        'category': Category.objects.values_list('id', flat=True).first(),
+        'brand': Brand.objects.values_list('id', flat=True).first(),
+        'image': CarImage.objects.values_list('id', flat=True).first(),
+        'inquiry': Inquiry.objects.values_list('id', flat=True).first(),
+        'sale': Sale.objects.values_list('id', flat=True).first(),
+        'maintenance_record': record.id if record else None,
+        'bulk_car_ids': list(Car.objects.order_by('-created_at').values_list('id', flat=True)[:BULK_ITEMS]),
+    }
+
+
+def case_url(name, bench_case, iteration, fixtures):
+    kwargs = {
+        kwarg: fixture(iteration, fixtures) if callable(fixture) else fixtures[fixture]
+        for kwarg, fixture in bench_case.kwargs.items()
+    }
+    url = reverse(name, kwargs=kwargs)
+    if bench_case.query:
+        url = f'{url}?{bench_case.query}'
+    return url
+
+
+def run_case(client, name, bench_case, fixtures, repeat, warmup, addresses):
+    """Request the case's URL warmup + repeat times; returns the measurements."""
+    timings, queries, repeats = [], [], []
+    cold_ms = response = url = None
+    for iteration in range(warmup + repeat):
+        url = case_url(name, bench_case, iteration, fixtures)
+        data = bench_case.data
+        if callable(data):
+            data = data(iteration, fixtures)
+        request = getattr(client, bench_case.method)
+        kwargs = {'format': bench_case.format} if data is not None else {}
+        with QueryCapture(max_repeats=None, slow_ms=None, explain=False) as captured:
+            started = time.perf_counter()
+            # A fresh client address per request keeps per-IP throttles out of the numbers
+            response = request(url, data, REMOTE_ADDR=next(addresses), **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        if iteration == 0:
+            cold_ms = elapsed
+        if iteration >= warmup:
+            timings.append(elapsed)
+            queries.append(len(captured))
+            repeats.append(max(captured.shape_counts().values(), default=0))
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': max(queries),
+        # Most executions of a single query shape; high values point to an N+1
+        'max_same_query': max(repeats),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'cold_ms': round(cold_ms, 2),
+        'bytes': len(response.content),
+    }
+
+
+def run_benchmarks(admin_user, repeat=20, warmup=3, only=None, log=None):
+    """Benchmark every covered route. Returns the report (without dataset sizes)."""
+    log = log or (lambda message: None)
+    fixtures = load_fixtures()
+    anonymous = APIClient()
+    admin = APIClient()
+    admin.force_authenticate(admin_user)
+    addresses = (f'198.18.{n >> 8 & 255}.{n & 255}' for n in itertools.count())
+
+    endpoints, uncovered = {}, []
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root, CAR_IMAGE_UPLOADER=FAKE_UPLOADER, JOBS_EAGER=False,
+    ):
+        for name in route_names():
+            if name in SKIPPED:
+                continue
+            if name not in CASES:
+                uncovered.append(name)
+                continue
+            if only and not any(term in name for term in only):
+                continue
+            for bench_case in CASES[name]:
+                key = ' '.join(part for part in (bench_case.method.upper(), name, bench_case.label) if part)
+                client = admin if bench_case.admin else anonymous
+                endpoints[key] = run_case(client, name, bench_case, fixtures, repeat, warmup, addresses)
+                log(format_result(key, endpoints[key]))
+
+    return {
+        'database': connection.vendor,
+        'repeat': repeat,
+        'warmup': warmup,
+        'endpoints': endpoints,
+        'skipped': SKIPPED,
+        'uncovered': uncovered,
+    }
+
+
+def format_result(key, result):
+    return (
+        f"{key:<50} {result['status']:>4} {result['queries']:>4}q "
+        f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  {result['bytes']:>9}B"
+    )
+
+
+def compare(report, baseline, latency_tolerance=0.25, min_latency_ms=2.0, query_tolerance=0):
+    """
+    Regressions of `report` against `baseline`, as a list of messages.
+    A p95 latency regresses when it exceeds the baseline by more than
+    `latency_tolerance` (a fraction) and by more than `min_latency_ms`,
+    so noise on very fast endpoints is ignored.
+    """
+    regressions = []
+    for key, result in report['endpoints'].items():
+        base = baseline.get('endpoints', {}).get(key)
+        if base is None:
+            continue
+        if result['status'] != base['status']:
+            regressions.append(f"{key}: status {base['status']} -> {result['status']}")
+        if result['queries'] > base['queries'] + query_tolerance:
+            regressions.append(f"{key}: queries {base['queries']} -> {result['queries']}")
+        limit = max(base['p95_ms'] * (1 + latency_tolerance), base['p95_ms'] + min_latency_ms)
+        if result['p95_ms'] > limit:
+            regressions.append(f"{key}: p95 {base['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+    return regressions
@@ -0,0 +1,22 @@
+"""
+System checks for the database connection settings (see database.py).
+
+Database checks only run when databases are requested:
+
+    python manage.py check --database default
+"""
+
+from django.core.checks import Tags, Warning, register
+
+from .database import BUDGET_HINT, budget_message, connection_budget
+
+
+@register(Tags.database)
+def check_connection_settings(app_configs, databases=None, **kwargs):
+    """The workers' connections must fit in max_connections."""
+    errors = []
+    for alias in databases or []:
+        needed, limit = connection_budget(alias)
+        if limit is not None and needed > limit:
+            errors.append(Warning(budget_message(alias, needed, limit), hint=BUDGET_HINT, id='core.W001'))
+    return errors
@@ -0,0 +1,101 @@
+"""
+Database connection reuse: budget checks and statistics.
+
+Connections are persistent by default (DB_CONN_MAX_AGE seconds, with
+CONN_HEALTH_CHECKS so a connection dropped by the server is replaced instead
+of failing a request). Put PgBouncer in front of the database when
+persistent connections are not enough.
+
+Every web worker process holds up to one connection per thread
+(DB_WORKER_THREADS). If WEB_CONCURRENCY workers times that exceeds the
+server's max_connections,
+requests start failing under load. The budget is checked by
+`manage.py check --database default` and before `migrate` (checks.py), and
+once per process when its first connection opens (signals.py).
+
+`connection_stats()` reports per-alias settings and the server's
+connection counts; admins can read it at GET /api/_perf/db/.
+"""
+
+from django.conf import settings
+from django.db import connections
+
+
+def connections_per_worker(alias='default'):
+    return max(settings.DB_WORKER_THREADS, 1)
+
+
+def server_connection_limit(connection):
+    """
+    Connections available to clients (max_connections minus the slots
+    reserved for superusers), or None on other databases.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT current_setting('max_connections')::int"
+            " - current_setting('superuser_reserved_connections')::int"
+        )
+        return cursor.fetchone()[0]
+
+
+def connection_budget(alias='default'):
+    """
+    (connections the web workers may open, server limit) for an alias.
+    The limit is None when it cannot be determined.
+    """
+    needed = settings.WEB_CONCURRENCY * connections_per_worker(alias)
+    return needed, server_connection_limit(connections[alias])
+
+
+def budget_message(alias, needed, limit):
+    return (
+        f"Database '{alias}': {settings.WEB_CONCURRENCY} workers x "
+        f"{connections_per_worker(alias)} connections = {needed}, "
+        f"but the server accepts {limit}."
+    )
+
+
+BUDGET_HINT = (
+    'Lower WEB_CONCURRENCY or DB_WORKER_THREADS, raise '
+    'max_connections, or put PgBouncer in front of the database '
+    '(with DB_DISABLE_SERVER_SIDE_CURSORS=True in transaction mode).'
+)
+
+
+# ============= STATISTICS =============
+
+def server_connection_counts(connection):
+    """Connections to the current database by state (PostgreSQL only)."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity
+            WHERE datname = current_database() GROUP BY 1
+            """
+        )
+        return dict(cursor.fetchall())
+
+
+def connection_stats():
+    """Connection settings and server counts per alias."""
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+            'connections_per_worker': connections_per_worker(alias),
+            'workers': settings.WEB_CONCURRENCY,
+        }
+        try:
+            entry['server_limit'] = server_connection_limit(connection)
+            entry['server_connections'] = server_connection_counts(connection)
+        except Exception as e:
+            entry['error'] = str(e)
+        stats[alias] = entry
+    return stats
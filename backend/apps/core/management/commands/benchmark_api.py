@@ -0,0 +1,162 @@
+"""
+Management command to benchmark every API endpoint.
+
+    python manage.py benchmark_api --output benchmark.json
+    python manage.py benchmark_api --cars 100000 --views 1000000 --sales 20000
+    python manage.py benchmark_api --baseline benchmarks/baseline.json
+
+Runs against a throwaway test database (like `manage.py test`), seeded with
+a synthetic dataset (see apps/core/seed.py), and records query count,
+p50/p95 latency and response size per endpoint (see apps/core/benchmark.py).
+Use --keepdb to reuse the seeded database between runs.
+
+The public catalog response cache is disabled so that query counts reflect
+the work each view does; pass --with-cache to measure cached responses.
+
+With --baseline, the run fails (non-zero exit) when an endpoint needs more
+queries than in the baseline or its p95 latency regressed beyond the
+tolerance. To update the baseline, copy a fresh --output report over it.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from apps.analytics.view_buffer import car_view_buffer
+from apps.analytics.visitors import page_visitor_buffer
+from apps.cars.models import Car
+from apps.core import seed
+from apps.core.benchmark import compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query counts, latency and response size of every API endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cars', type=int, default=seed.DEFAULT_SIZES['cars'], help='Cars to seed')
+        parser.add_argument('--views', type=int, default=seed.DEFAULT_SIZES['views'], help='Page and car views to seed')
+        parser.add_argument('--sales', type=int, default=seed.DEFAULT_SIZES['sales'], help='Sales to seed')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic dataset')
+        parser.add_argument('--repeat', type=int, default=20, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint')
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            help='Only benchmark routes whose name contains one of these strings',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Fail on regressions against this JSON report')
+        parser.add_argument(
+            '--latency-tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed p95 latency increase over the baseline, as a fraction',
+        )
+        parser.add_argument(
+            '--min-latency-ms',
+            type=float,
+            default=2.0,
+            help='Ignore p95 latency increases smaller than this',
+        )
+        parser.add_argument(
+            '--query-tolerance',
+            type=int,
+            default=0,
+            help='Allowed extra queries per request over the baseline',
+        )
+        parser.add_argument(
+            '--with-cache',
+            action='store_true',
+            help='Keep the catalog response cache enabled',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the seeded test database for the next run',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        verbosity = options['verbosity']
+        setup_test_environment()
+        old_config = setup_databases(verbosity=verbosity, interactive=False, keepdb=options['keepdb'])
+        try:
+            if Car.objects.exists():
+                self.stdout.write('Reusing the existing benchmark dataset.')
+            else:
+                seed.seed_dataset(
+                    cars=options['cars'],
+                    views=options['views'],
+                    sales=options['sales'],
+                    seed=options['seed'],
+                    log=self.stdout.write,
+                )
+            dataset = {
+                'cars': Car.objects.count(),
+                'views': options['views'],
+                'sales': options['sales'],
+                'seed': options['seed'],
+                'catalog_cache': options['with_cache'],
+            }
+            admin, _ = User.objects.get_or_create(
+                username='benchmark-admin',
+                defaults={'is_staff': True, 'is_superuser': True},
+            )
+            with override_settings(CATALOG_CACHE_ENABLED=options['with_cache']):
+                report = run_benchmarks(
+                    admin,
+                    repeat=options['repeat'],
+                    warmup=options['warmup'],
+                    only=options['only'],
+                    log=self.stdout.write,
+                )
+            # Write buffered analytics while the test database still exists
+            car_view_buffer.flush()
+            page_visitor_buffer.flush()
+        finally:
+            teardown_databases(old_config, verbosity=verbosity, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report['dataset'] = dataset
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        for name in report['uncovered']:
+            self.stdout.write(self.style.WARNING(f'No benchmark case for route {name}'))
+        failed = [key for key, result in report['endpoints'].items() if result['status'] >= 400]
+        for key in failed:
+            self.stdout.write(self.style.ERROR(f"{key} returned {report['endpoints'][key]['status']}"))
+
+        regressions = []
+        if baseline is not None:
+            if baseline.get('dataset') != dataset:
+                self.stdout.write(self.style.WARNING('Baseline was recorded with a different dataset'))
+            regressions = compare(
+                report,
+                baseline,
+                latency_tolerance=options['latency_tolerance'],
+                min_latency_ms=options['min_latency_ms'],
+                query_tolerance=options['query_tolerance'],
+            )
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f'Regression: {message}'))
+
+        if failed or regressions:
+            raise CommandError(f'{len(failed)} failed endpoints, {len(regressions)} regressions')
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(report['endpoints'])} endpoints."))
@@ -0,0 +1,126 @@
+"""
+Request performance instrumentation (see perf.py) and read-replica routing
+(see routers.py).
+"""
+
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .perf import (
+    QueryTimer,
+    RequestSample,
+    get_recorder,
+    install_serializer_timing,
+    set_current_sample,
+)
+from .querycheck import QueryCapture
+from .routers import is_pinned, is_replica_safe, pin_to_primary, replica_aliases, use_replicas
+
+logger = logging.getLogger('apps.core.perf')
+
+
+class PerformanceMiddleware:
+    """
+    Record query count, SQL time, serializer time, total time and response
+    size for a PERF_SAMPLE_RATE fraction of requests, and report them to
+    staff users in a Server-Timing header (PERF_SERVER_TIMING).
+
+    With PERF_REPEATED_QUERY_THRESHOLD or PERF_SLOW_QUERY_MS set, sampled
+    requests are also checked for repeated (N+1) and slow statements, which
+    are logged (see querycheck.py). Meant for staging.
+
+    With sampling off (the default) each request costs one settings lookup.
+    Put this first in MIDDLEWARE so the total includes the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PERF_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        install_serializer_timing()
+        sample = RequestSample()
+        timer = QueryTimer(sample)
+        check = None
+        if settings.PERF_REPEATED_QUERY_THRESHOLD or settings.PERF_SLOW_QUERY_MS:
+            check = QueryCapture(
+                max_repeats=settings.PERF_REPEATED_QUERY_THRESHOLD or None,
+                slow_ms=settings.PERF_SLOW_QUERY_MS or None,
+                explain=False,
+            )
+        set_current_sample(sample)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                if check is not None:
+                    stack.enter_context(check)
+                response = self.get_response(request)
+        finally:
+            set_current_sample(None)
+        sample.total_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        sample.view = match.view_name if match else 'unresolved'
+        sample.method = request.method
+        sample.status = response.status_code
+        sample.bytes = 0 if response.streaming else len(response.content)
+        get_recorder().record(sample)
+        if check is not None and check.has_issues():
+            logger.warning('Query issues in %s %s: %s', sample.method, sample.view, check.report())
+
+        # DRF sets request.user from the JWT while handling the view
+        user = getattr(request, 'user', None)
+        if settings.PERF_SERVER_TIMING and user is not None and user.is_staff:
+            response['Server-Timing'] = sample.server_timing()
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe requests to replica-safe views from DATABASE_REPLICAS, and pin
+    the client's reads to the primary for REPLICA_PIN_SECONDS (a cookie) after
+    a successful write by an authenticated user. Does nothing when no
+    replicas are configured.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        request._replica_routing = None
+        try:
+            response = self.get_response(request)
+        finally:
+            routing = request._replica_routing
+            if routing is not None:
+                routing.__exit__(None, None, None)
+
+        if request.method not in self.SAFE_METHODS and response.status_code < 400:
+            # DRF sets request.user from the JWT while handling the view
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not hasattr(request, '_replica_routing'):
+            return None
+        if request.method in self.SAFE_METHODS and is_replica_safe(view_func) and not is_pinned(request):
+            request._replica_routing = use_replicas()
+            request._replica_routing.__enter__()
+        return None
@@ -0,0 +1,245 @@
+"""
+In-process request performance recording.
+
+PerformanceMiddleware (see middleware.py) samples a fraction of requests
+(PERF_SAMPLE_RATE) and records for each one: the view name, query count,
+total SQL time, time spent in serializers, total time and response size.
+Samples are kept in a fixed-size ring buffer (PERF_BUFFER_SIZE) and
+aggregated per view into percentiles and histograms by the admin endpoint
+GET /api/_perf/.
+
+Requests slower than PERF_SLOW_REQUEST_MS, or running more than
+PERF_SLOW_REQUEST_QUERIES queries, are also logged to the 'apps.core.perf'
+logger and kept in a separate buffer of recent slow requests.
+
+Each worker process has its own buffers, so /api/_perf/ reports on the
+worker that served it.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SLOW_BUFFER_SIZE = 100
+
+_local = threading.local()
+
+
+class RequestSample:
+    """Measurements for one sampled request."""
+    __slots__ = (
+        'view', 'method', 'status', 'queries', 'sql_ms', 'serializer_ms',
+        'total_ms', 'bytes', 'timestamp', 'serializer_depth'
+    )
+
+    def __init__(self):
+        self.view = ''
+        self.method = ''
+        self.status = 0
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.serializer_ms = 0.0
+        self.total_ms = 0.0
+        self.bytes = 0
+        self.timestamp = timezone.now()
+        self.serializer_depth = 0
+
+    def is_slow(self):
+        return (
+            self.total_ms >= settings.PERF_SLOW_REQUEST_MS
+            or self.queries > settings.PERF_SLOW_REQUEST_QUERIES
+        )
+
+    def server_timing(self):
+        """Value for the Server-Timing response header."""
+        return (
+            f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries", '
+            f'ser;dur={self.serializer_ms:.1f};desc="serializers", '
+            f'total;dur={self.total_ms:.1f}'
+        )
+
+    def to_dict(self):
+        return {
+            'view': self.view,
+            'method': self.method,
+            'status': self.status,
+            'queries': self.queries,
+            'sql_ms': round(self.sql_ms, 2),
+            'serializer_ms': round(self.serializer_ms, 2),
+            'total_ms': round(self.total_ms, 2),
+            'bytes': self.bytes,
+            'timestamp': self.timestamp.isoformat(),
+        }
+
+
+def current_sample():
+    """The sample being recorded on this thread, or None."""
+    return getattr(_local, 'sample', None)
+
+
+def set_current_sample(sample):
+    _local.sample = sample
+
+
+class QueryTimer:
+    """Database execute wrapper that adds each query to a sample."""
+
+    def __init__(self, sample):
+        self.sample = sample
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sample.queries += 1
+            self.sample.sql_ms += (time.perf_counter() - started) * 1000
+
+
+_serializer_timing_lock = threading.Lock()
+_serializer_timing_installed = False
+
+
+def install_serializer_timing():
+    """
+    Time BaseSerializer.data for sampled requests. Only the outermost
+    serializer is timed, so nested serializers are not counted twice.
+    Installed on the first sampled request; unsampled requests only pay
+    for one thread-local lookup per serializer.
+    """
+    global _serializer_timing_installed
+    from rest_framework.serializers import BaseSerializer
+
+    with _serializer_timing_lock:
+        if _serializer_timing_installed:
+            return
+        original = BaseSerializer.data.fget
+
+        def data(self):
+            sample = current_sample()
+            if sample is None or sample.serializer_depth:
+                return original(self)
+            sample.serializer_depth += 1
+            started = time.perf_counter()
+            try:
+                return original(self)
+            finally:
+                sample.serializer_depth -= 1
+                sample.serializer_ms += (time.perf_counter() - started) * 1000
+
+        BaseSerializer.data = property(data)
+        _serializer_timing_installed = True
+
+
+# ============= AGGREGATION =============
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(int(round(fraction * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def histogram(values, bounds):
+    """Counts per bucket as [{'le': bound, 'count': n}, ..., {'le': None, 'count': n}]."""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        for i, bound in enumerate(bounds):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return [{'le': bound, 'count': count} for bound, count in zip(list(bounds) + [None], counts)]
+
+
+def distribution(values):
+    return {
+        'p50': round(percentile(values, 0.5), 2),
+        'p95': round(percentile(values, 0.95), 2),
+        'max': round(max(values), 2),
+    }
+
+
+class PerfRecorder:
+    """Thread-safe ring buffers of request samples."""
+
+    def __init__(self, size, slow_size=SLOW_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=size)
+        self._slow = deque(maxlen=slow_size)
+
+    def record(self, sample):
+        slow = sample.is_slow()
+        with self._lock:
+            self._samples.append(sample)
+            if slow:
+                self._slow.append(sample)
+        if slow:
+            logger.warning(
+                'Slow request: %s %s took %.1fms with %d queries (%.1fms SQL)',
+                sample.method, sample.view, sample.total_ms, sample.queries, sample.sql_ms
+            )
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._slow.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._samples), list(self._slow)
+
+    def summary(self):
+        """Samples aggregated per view, most total time first."""
+        samples, slow = self.snapshot()
+        by_view = defaultdict(list)
+        for sample in samples:
+            by_view[(sample.method, sample.view)].append(sample)
+
+        views = []
+        for (method, view), rows in by_view.items():
+            total_ms = [row.total_ms for row in rows]
+            queries = [row.queries for row in rows]
+            views.append((sum(total_ms), {
+                'view': view,
+                'method': method,
+                'requests': len(rows),
+                'total_ms': distribution(total_ms),
+                'sql_ms': distribution([row.sql_ms for row in rows]),
+                'serializer_ms': distribution([row.serializer_ms for row in rows]),
+                'queries': distribution(queries),
+                'bytes': distribution([row.bytes for row in rows]),
+                'latency_histogram': histogram(total_ms, LATENCY_BUCKETS_MS),
+                'query_histogram': histogram(queries, QUERY_BUCKETS),
+            }))
+        views.sort(key=lambda item: item[0], reverse=True)
+
+        return {
+            'samples': len(samples),
+            'sample_rate': settings.PERF_SAMPLE_RATE,
+            'views': [view for _, view in views],
+            'slow_requests': [sample.to_dict() for sample in reversed(slow)],
+        }
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = PerfRecorder(settings.PERF_BUFFER_SIZE)
+    return _recorder
@@ -0,0 +1,60 @@
+"""
+pytest plugin that fails tests running repeated (N+1) or slow SQL.
+
+It is enabled in the backend's conftest.py; request the `query_check`
+fixture in view tests, after the fixtures that create test data (fixtures
+set up before it are not captured):
+
+    def test_car_list(cars, api_client, query_check):
+        api_client.get('/api/cars/')
+
+Every statement run during the test is captured (see querycheck.py); the
+test fails with a report of the offenders, including EXPLAIN plans on
+PostgreSQL. Limits come from --query-max-repeats / --query-slow-ms, or per
+test from the marker:
+
+    @pytest.mark.query_check(max_repeats=10, slow_ms=500)
+"""
+
+import pytest
+
+from .querycheck import DEFAULT_MAX_REPEATS, DEFAULT_SLOW_MS, QueryCapture
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('query_check')
+    group.addoption(
+        '--query-max-repeats',
+        type=int,
+        default=DEFAULT_MAX_REPEATS,
+        help='Fail query_check tests that run one query shape more often than this',
+    )
+    group.addoption(
+        '--query-slow-ms',
+        type=float,
+        default=DEFAULT_SLOW_MS,
+        help='Fail query_check tests with a statement slower than this',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_check(max_repeats=None, slow_ms=None, explain=True): limits for the query_check fixture',
+    )
+
+
+@pytest.fixture
+def query_check(request, db):
+    """Capture the test's SQL and fail on repeated or slow statements."""
+    options = {
+        'max_repeats': request.config.getoption('--query-max-repeats'),
+        'slow_ms': request.config.getoption('--query-slow-ms'),
+    }
+    marker = request.node.get_closest_marker('query_check')
+    if marker:
+        options.update(marker.kwargs)
+
+    with QueryCapture(**options) as captured:
+        yield captured
+    captured.assert_ok()
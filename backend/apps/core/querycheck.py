@@ -0,0 +1,158 @@
+"""
+Capture SQL statements and flag repeated (N+1) and slow ones.
+
+    from apps.core.querycheck import capture_queries
+
+    with capture_queries(max_repeats=3, slow_ms=100) as captured:
+        client.get('/api/cars/')
+    captured.assert_ok()      # AssertionError describing every offender
+    print(captured.report())
+
+Statements are grouped by shape: the SQL with literals and parameter lists
+replaced by placeholders, so `... WHERE car_id = %s` run for car 1 and car 2
+is one shape, and `IN (%s, %s)` matches `IN (%s, %s, %s)`. A shape executed
+more than `max_repeats` times inside one block is almost always a query in a
+loop, e.g. `obj.images.filter(...)` in a list serializer or a related
+object accessed per row without select_related.
+
+On PostgreSQL the report includes the EXPLAIN plan of each offending SELECT.
+
+Used by the pytest plugin (pytest_plugin.py), the benchmark command and,
+on sampled requests, PerformanceMiddleware (PERF_REPEATED_QUERY_THRESHOLD).
+"""
+
+import re
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+
+from django.db import connections
+
+DEFAULT_MAX_REPEATS = 3
+DEFAULT_SLOW_MS = 100
+
+CapturedQuery = namedtuple('CapturedQuery', ['alias', 'sql', 'params', 'many', 'duration_ms'])
+
+_SHAPE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),                      # string literals
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),                    # numbers
+    (re.compile(r'%s'), '?'),                                   # parameters
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),       # IN (?, ?, ...) and VALUES rows
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),  # multi-row VALUES
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def query_shape(sql):
+    """SQL with literals, parameters and value lists replaced by placeholders."""
+    for pattern, replacement in _SHAPE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryCapture:
+    """
+    Context manager recording every statement run on any database
+    connection (or only `using`) inside the block.
+    """
+
+    def __init__(self, max_repeats=DEFAULT_MAX_REPEATS, slow_ms=DEFAULT_SLOW_MS, explain=True, using=None):
+        self.max_repeats = max_repeats
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.using = using
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self.queries = []
+        self._stack = ExitStack()
+        aliases = [self.using] if self.using else list(connections)
+        for alias in aliases:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(CapturedQuery(
+                context['connection'].alias, sql, params, many, (time.perf_counter() - started) * 1000
+            ))
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(query.duration_ms for query in self.queries)
+
+    # ============= FINDINGS =============
+
+    def shape_counts(self):
+        """Counter of query shapes."""
+        return Counter(query_shape(query.sql) for query in self.queries)
+
+    def repeated(self):
+        """[(shape, count, first query)] for shapes run more than max_repeats times."""
+        counts = self.shape_counts()
+        first = {}
+        for query in self.queries:
+            first.setdefault(query_shape(query.sql), query)
+        return [
+            (shape, count, first[shape])
+            for shape, count in counts.most_common()
+            if self.max_repeats is not None and count > self.max_repeats
+        ]
+
+    def slow(self):
+        """Queries that took longer than slow_ms."""
+        if self.slow_ms is None:
+            return []
+        return [query for query in self.queries if query.duration_ms > self.slow_ms]
+
+    def has_issues(self):
+        return bool(self.repeated() or self.slow())
+
+    def explain_query(self, query):
+        """EXPLAIN plan of a captured SELECT on PostgreSQL, else None."""
+        connection = connections[query.alias]
+        if connection.vendor != 'postgresql' or query.many:
+            return None
+        if not query.sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {query.sql}', query.params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def report(self):
+        """Human-readable description of repeated and slow statements."""
+        lines = [f'{len(self.queries)} queries in {self.total_ms:.1f}ms']
+        offenders = []
+        for shape, count, query in self.repeated():
+            lines.append(f'\nExecuted {count} times (max {self.max_repeats}): {shape}')
+            offenders.append(query)
+        for query in self.slow():
+            lines.append(f'\nTook {query.duration_ms:.1f}ms (max {self.slow_ms}ms): {query.sql}')
+            offenders.append(query)
+        if self.explain:
+            # Run outside the block, so EXPLAIN itself is not captured
+            for query in offenders:
+                plan = self.explain_query(query)
+                if plan:
+                    lines.append(f'\nEXPLAIN {query_shape(query.sql)}\n{plan}')
+        return '\n'.join(lines)
+
+    def assert_ok(self):
+        if self.has_issues():
+            raise AssertionError(self.report())
+
+
+def capture_queries(max_repeats=DEFAULT_MAX_REPEATS, slow_ms=DEFAULT_SLOW_MS, explain=True, using=None):
+    """Shortcut for QueryCapture(...)."""
+    return QueryCapture(max_repeats=max_repeats, slow_ms=slow_ms, explain=explain, using=using)
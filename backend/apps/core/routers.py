@@ -0,0 +1,109 @@
+"""
+Read-replica database routing.
+
+DATABASE_REPLICAS lists the aliases of databases that replicate 'default'
+(built from DB_REPLICA_HOSTS in settings). Reads go to a random replica only
+inside a `use_replicas()` block; all other reads, and every write, use
+'default'.
+
+ReplicaRoutingMiddleware (see middleware.py) opens that block for safe
+requests (GET, HEAD, OPTIONS) to views marked as replica-safe: class views
+with `read_replica = True`, function views with the @read_replica decorator.
+That covers the public catalog and the analytics reports.
+
+Read-your-writes: only the client that wrote needs to see its write right
+away. After a successful write by an authenticated user (admin changes), the
+response sets the short-lived PIN_COOKIE (REPLICA_PIN_SECONDS), and requests
+carrying it read from 'default'; everyone else keeps reading from replicas.
+The cookie is SameSite=None; Secure by default so the browser also sends it
+on the frontend's cross-site API calls (REPLICA_PIN_COOKIE_SAMESITE/_SECURE).
+
+The catalog response cache does not store pages read from a replica within
+REPLICA_PIN_SECONDS of a catalog version bump (apps/cars/cache.py), so a
+lagging replica cannot refill it with data from before the write.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'replica_pin'
+
+_reading_from_replicas = ContextVar('reading_from_replicas', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    """Send reads inside the block to a read replica (if any are configured)."""
+    token = _reading_from_replicas.set(enabled)
+    try:
+        yield
+    finally:
+        _reading_from_replicas.reset(token)
+
+
+def read_replica(view):
+    """Mark a function view as safe to serve from a read replica."""
+    view.read_replica = True
+    return view
+
+
+def is_replica_safe(view_func):
+    """Whether a resolved view is marked as safe to serve from a replica."""
+    view_class = getattr(view_func, 'view_class', None)
+    return bool(getattr(view_func, 'read_replica', False) or getattr(view_class, 'read_replica', False))
+
+
+def reading_from_replicas():
+    """Whether reads in the current context go to a replica."""
+    return _reading_from_replicas.get() and bool(replica_aliases())
+
+
+def pin_to_primary(response, seconds=None):
+    """Have the client read from 'default' for `seconds` (REPLICA_PIN_SECONDS)."""
+    seconds = seconds or settings.REPLICA_PIN_SECONDS
+    response.set_cookie(
+        PIN_COOKIE, '1',
+        max_age=seconds,
+        httponly=True,
+        samesite=settings.REPLICA_PIN_COOKIE_SAMESITE,
+        secure=settings.REPLICA_PIN_COOKIE_SECURE,
+    )
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """Route reads to replicas inside use_replicas(); everything else to 'default'."""
+
+    def db_for_read(self, model, **hints):
+        if _reading_from_replicas.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Always the primary, even for objects that were read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        if db in replica_aliases():
+            return False
+        return None
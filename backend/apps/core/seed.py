@@ -0,0 +1,270 @@
+"""
+Synthetic dataset for benchmarks.
+
+`seed_dataset()` fills an empty database with a reproducible, realistically
+shaped dataset: categories and brands, cars with images and maintenance
+history, page and car views spread over the last few months (with their
+unique-visitor sketches and daily rollups), sales and inquiries.
+
+Rows are written with bulk_create in batches, so signal handlers do not run;
+everything they would maintain (search vectors, maintenance totals, rollups,
+catalog cache versions) is brought up to date at the end.
+"""
+
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics.models import CarView, Inquiry, PageView, Sale
+from apps.analytics.rollups import advance_rollups
+from apps.analytics.visitors import record_car_visitors, record_page_visitors, visitor_id
+from apps.cars import cache, inventory
+from apps.cars.models import Brand, Car, CarImage, Category
+from apps.cars.search import update_search_vectors
+from apps.maintenance.models import MaintenancePart, MaintenanceRecord
+from apps.maintenance.totals import rebuild_car_totals
+
+DEFAULT_SIZES = {
+    'cars': 2000,
+    'views': 20000,
+    'sales': 400,
+}
+
+CATEGORIES = ['Sedan', 'SUV', 'Hatchback', 'Coupe', 'Convertible', 'Pickup', 'Van', 'Wagon']
+MODELS = {
+    'Toyota': ['Camry', 'Corolla', 'RAV4', 'Hilux'],
+    'Honda': ['Civic', 'Accord', 'CR-V', 'Jazz'],
+    'BMW': ['3 Series', '5 Series', 'X3', 'X5'],
+    'Mercedes-Benz': ['C-Class', 'E-Class', 'GLC', 'A-Class'],
+    'Ford': ['Focus', 'Fiesta', 'Ranger', 'Mustang'],
+    'Volkswagen': ['Golf', 'Polo', 'Passat', 'Tiguan'],
+    'Audi': ['A3', 'A4', 'Q5', 'Q7'],
+    'Nissan': ['Leaf', 'Qashqai', 'Navara', 'Micra'],
+    'Hyundai': ['i30', 'Tucson', 'Kona', 'Ioniq'],
+    'Kia': ['Rio', 'Sportage', 'Niro', 'Sorento'],
+}
+COLORS = ['Black', 'White', 'Silver', 'Grey', 'Blue', 'Red', 'Green']
+FEATURES = ['Bluetooth', 'Navigation', 'Leather seats', 'Sunroof', 'Parking sensors', 'Cruise control']
+PARTS = [('Oil filter', 25), ('Brake pads', 120), ('Tyre', 150), ('Battery', 180), ('Wiper blades', 30)]
+PAGES = ['/', '/cars', '/about', '/contact']
+
+VIEW_DAYS = 90
+IMAGES_PER_CAR = 2
+
+
+@contextmanager
+def _backdated(model, field_name='timestamp'):
+    """Let bulk_create store explicit values in an auto_now_add field."""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _batches(count, batch_size):
+    for start in range(0, count, batch_size):
+        yield range(start, min(start + batch_size, count))
+
+
+def _random_time(rng, day):
+    return timezone.make_aware(datetime.combine(day, time.min)) + timedelta(seconds=rng.randrange(86400))
+
+
+def _ip(rng, visitors):
+    n = rng.randrange(visitors)
+    return f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}'
+
+
+def seed_cars(rng, count, sold, batch_size):
+    """Create categories, brands, cars and their images. Returns the car ids."""
+    categories = [Category.objects.create(name=name) for name in CATEGORIES]
+    brands = {make: Brand.objects.create(name=make) for make in MODELS}
+    makes = list(MODELS)
+    sold_ids = set(rng.sample(range(count), min(sold, count)))
+
+    car_ids = []
+    for batch in _batches(count, batch_size):
+        cars = []
+        for i in batch:
+            make = rng.choice(makes)
+            if i in sold_ids:
+                status = Car.STATUS_SOLD
+            else:
+                status = Car.STATUS_RESERVED if rng.random() < 0.05 else Car.STATUS_AVAILABLE
+            cars.append(Car(
+                make=make,
+                model=rng.choice(MODELS[make]),
+                year=rng.randint(2005, 2025),
+                price=Decimal(rng.randrange(3000, 90000, 50)),
+                mileage=rng.randrange(0, 250000, 100),
+                vin=f'BENCH{i:012d}',
+                color=rng.choice(COLORS),
+                transmission=rng.choice([Car.TRANSMISSION_AUTOMATIC, Car.TRANSMISSION_MANUAL]),
+                fuel_type=rng.choice([choice for choice, _ in Car.FUEL_CHOICES]),
+                description=f'{make} in good condition, full service history.',
+                features=rng.sample(FEATURES, rng.randint(0, 4)),
+                category=rng.choice(categories) if rng.random() < 0.95 else None,
+                brand=brands[make],
+                status=status,
+                is_featured=rng.random() < 0.02,
+            ))
+        Car.objects.bulk_create(cars)
+        CarImage.objects.bulk_create([
+            CarImage(
+                car=car,
+                image_url=f'https://res.cloudinary.com/demo/image/upload/bench/{car.vin}_{order}.jpg',
+                cloudinary_public_id=f'bench/{car.vin}_{order}',
+                is_primary=order == 0,
+                order=order,
+            )
+            for car in cars for order in range(IMAGES_PER_CAR)
+        ])
+        car_ids.extend(car.id for car in cars)
+
+    update_search_vectors(Car.objects.all())
+    return car_ids
+
+
+def seed_maintenance(rng, car_ids, batch_size):
+    """Give about a third of the cars one to three maintenance records."""
+    today = timezone.localdate()
+    records, parts = [], []
+    for car_id in car_ids:
+        if rng.random() >= 0.33:
+            continue
+        for _ in range(rng.randint(1, 3)):
+            record = MaintenanceRecord(
+                car_id=car_id,
+                repair_date=today - timedelta(days=rng.randrange(365)),
+                description='Scheduled service',
+                total_cost=Decimal('0'),
+            )
+            for part_name, cost in rng.sample(PARTS, rng.randint(1, 4)):
+                quantity = rng.randint(1, 4)
+                record.total_cost += cost * quantity
+                parts.append((record, MaintenancePart(part_name=part_name, part_cost=Decimal(cost), quantity=quantity)))
+            records.append(record)
+
+    MaintenanceRecord.objects.bulk_create(records, batch_size=batch_size)
+    for record, part in parts:
+        part.maintenance_record = record
+    MaintenancePart.objects.bulk_create([part for _, part in parts], batch_size=batch_size)
+    rebuild_car_totals()
+    return len(records)
+
+
+def seed_views(rng, car_ids, count, batch_size):
+    """
+    Create page views and car views (half each) over the last VIEW_DAYS days,
+    with matching unique-visitor sketches.
+    """
+    today = timezone.localdate()
+    visitors = max(count // 5, 1)
+    views_per_car = defaultdict(int)
+
+    with _backdated(PageView), _backdated(CarView):
+        for batch in _batches(count, batch_size):
+            page_views, car_views = [], []
+            page_visits, car_visits = defaultdict(list), defaultdict(list)
+            for i in batch:
+                day = today - timedelta(days=rng.randrange(VIEW_DAYS))
+                ip = _ip(rng, visitors)
+                if i % 2:
+                    car_id = rng.choice(car_ids)
+                    car_views.append(CarView(car_id=car_id, visitor_ip=ip, timestamp=_random_time(rng, day)))
+                    car_visits[day].append((car_id, visitor_id(ip)))
+                    views_per_car[car_id] += 1
+                else:
+                    url = rng.choice(PAGES) if rng.random() < 0.5 else f'/cars/{rng.choice(car_ids)}'
+                    page_views.append(PageView(
+                        page_url=url, visitor_ip=ip, user_agent='benchmark', timestamp=_random_time(rng, day)
+                    ))
+                    page_visits[day].append((url, visitor_id(ip)))
+            PageView.objects.bulk_create(page_views)
+            CarView.objects.bulk_create(car_views)
+            for day, visits in page_visits.items():
+                record_page_visitors(visits, day=day)
+            for day, visits in car_visits.items():
+                record_car_visitors(visits, day=day)
+
+    cars = [Car(id=car_id, views_count=views) for car_id, views in views_per_car.items()]
+    Car.objects.bulk_update(cars, ['views_count'], batch_size=batch_size)
+
+
+def seed_sales(rng, count, batch_size):
+    """Create sales for the sold cars (cycling through them if there are fewer)."""
+    sold = list(Car.objects.filter(status=Car.STATUS_SOLD).values_list('id', 'price'))
+    if not sold or not count:
+        return 0
+    today = timezone.localdate()
+    sales = [
+        Sale(
+            car_id=car_id,
+            sale_price=(price * Decimal(rng.uniform(0.85, 1.1))).quantize(Decimal('0.01')),
+            sale_date=today - timedelta(days=rng.randrange(365)),
+            customer_name=f'Customer {i}',
+            customer_email=f'customer{i}@example.com',
+        )
+        for i, (car_id, price) in enumerate(sold[i % len(sold)] for i in range(count))
+    ]
+    Sale.objects.bulk_create(sales, batch_size=batch_size)
+    return len(sales)
+
+
+def seed_inquiries(rng, car_ids, count, batch_size):
+    statuses = [choice for choice, _ in Inquiry.STATUS_CHOICES]
+    Inquiry.objects.bulk_create([
+        Inquiry(
+            car_id=rng.choice(car_ids) if rng.random() < 0.8 else None,
+            name=f'Visitor {i}',
+            email=f'visitor{i}@example.com',
+            message='Is this car still available?',
+            status=rng.choice(statuses),
+        )
+        for i in range(count)
+    ], batch_size=batch_size)
+    return count
+
+
+def seed_dataset(cars=DEFAULT_SIZES['cars'], views=DEFAULT_SIZES['views'], sales=DEFAULT_SIZES['sales'],
+                 seed=0, batch_size=5000, log=None):
+    """
+    Seed an empty database. The same arguments always produce the same data.
+    Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+
+    with transaction.atomic():
+        log(f'Creating {cars} cars...')
+        car_ids = seed_cars(rng, cars, sold=sales, batch_size=batch_size)
+        log('Creating maintenance records...')
+        records = seed_maintenance(rng, car_ids, batch_size)
+        log(f'Creating {views} views...')
+        seed_views(rng, car_ids, views, batch_size)
+        log(f'Creating {sales} sales...')
+        sales = seed_sales(rng, sales, batch_size)
+        inquiries = seed_inquiries(rng, car_ids, max(views // 100, 1), batch_size)
+        log('Rolling up analytics...')
+        advance_rollups()
+        log('Building the available inventory...')
+        inventory.rebuild()
+
+    for model in ('car', 'carimage', 'category', 'brand'):
+        cache.bump_version(model)
+
+    return {
+        'cars': cars,
+        'car_images': cars * IMAGES_PER_CAR,
+        'maintenance_records': records,
+        'views': views,
+        'sales': sales,
+        'inquiries': inquiries,
+    }
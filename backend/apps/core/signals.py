@@ -0,0 +1,35 @@
+"""
+Signal handlers for the Core app.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .database import BUDGET_HINT, budget_message, connections_per_worker, server_connection_limit
+
+logger = logging.getLogger('apps.core.database')
+
+_budget_checked = False
+
+
+@receiver(connection_created, dispatch_uid='core_connection_budget')
+def check_connection_budget(sender, connection, **kwargs):
+    """
+    Startup self-check: when a process opens its first database connection,
+    warn if all web workers together could exceed the server's max_connections.
+    """
+    global _budget_checked
+    if _budget_checked or not settings.DB_STARTUP_CHECK:
+        return
+    _budget_checked = True
+    try:
+        needed = settings.WEB_CONCURRENCY * connections_per_worker(connection.alias)
+        limit = server_connection_limit(connection)
+    except Exception:
+        logger.exception('Could not check the database connection budget')
+        return
+    if limit is not None and needed > limit:
+        logger.warning('%s %s', budget_message(connection.alias, needed, limit), BUDGET_HINT)
@@ -0,0 +1,42 @@
+"""
+Benchmark smoke tests: every API route runs through the benchmark harness
+(see apps/core/benchmark.py) against a small seeded dataset.
+
+These check coverage, status codes and query counts, not latency; use
+`python manage.py benchmark_api` for timings.
+"""
+
+import pytest
+
+from apps.cars.models import CarImage
+from apps.core import seed
+from apps.core.benchmark import CASES, SKIPPED, route_names, run_benchmarks
+
+# Most executions of one query shape in any benchmarked request
+MAX_SAME_QUERY = 10
+
+
+def test_every_route_is_benchmarked():
+    assert SKIPPED == {}
+    assert set(route_names()) <= set(CASES)
+
+
+@pytest.mark.django_db
+def test_benchmark_run(admin_user):
+    # Enough cars for the "page 5" case
+    seed.seed_dataset(cars=120, views=300, sales=5)
+
+    report = run_benchmarks(admin_user, repeat=2, warmup=1)
+    endpoints = report['endpoints']
+
+    assert report['uncovered'] == []
+    assert {key: result['status'] for key, result in endpoints.items() if result['status'] >= 400} == {}
+    assert {
+        key: result['max_same_query'] for key, result in endpoints.items()
+        if result['max_same_query'] > MAX_SAME_QUERY
+    } == {}
+
+    # Image routes run against the fake uploader
+    assert endpoints['POST admin-car-image-upload']['status'] == 202
+    assert endpoints['DELETE admin-car-image-delete']['status'] == 204
+    assert not CarImage.objects.filter(cloudinary_public_id__startswith='benchmark/').exists()
@@ -0,0 +1,189 @@
+"""
+Tests for request performance recording and the /api/_perf/ endpoint.
+"""
+
+import itertools
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from apps.cars.tests.factories import create_cars
+from apps.core import perf
+from apps.core.perf import (
+    LATENCY_BUCKETS_MS,
+    PerfRecorder,
+    RequestSample,
+    get_recorder,
+    histogram,
+    install_serializer_timing,
+    percentile,
+    set_current_sample,
+)
+
+
+def make_sample(view='car-list', total_ms=10.0, queries=2):
+    sample = RequestSample()
+    sample.view = view
+    sample.method = 'GET'
+    sample.status = 200
+    sample.total_ms = total_ms
+    sample.queries = queries
+    return sample
+
+
+@override_settings(PERF_SLOW_REQUEST_MS=500, PERF_SLOW_REQUEST_QUERIES=50)
+class AggregationTests(SimpleTestCase):
+
+    def test_percentile(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 1), 100)
+        self.assertEqual(percentile([7], 0.5), 7)
+
+    def test_histogram(self):
+        counts = histogram([0, 1, 3, 5, 6, 100], (1, 5))
+        self.assertEqual(counts, [
+            {'le': 1, 'count': 2},
+            {'le': 5, 'count': 2},
+            {'le': None, 'count': 2},
+        ])
+
+    def test_ring_buffer_keeps_the_latest_samples(self):
+        recorder = PerfRecorder(size=3, slow_size=2)
+        samples = [make_sample(total_ms=ms) for ms in (1, 600, 2, 700, 3, 800)]
+        with self.assertLogs('apps.core.perf', 'WARNING'):
+            for sample in samples:
+                recorder.record(sample)
+
+        recent, slow = recorder.snapshot()
+        self.assertEqual(recent, samples[-3:])
+        self.assertEqual(slow, [samples[3], samples[5]])
+
+    def test_summary(self):
+        recorder = PerfRecorder(size=10)
+        for ms in (10, 20, 30):
+            recorder.record(make_sample('car-list', total_ms=ms, queries=2))
+        recorder.record(make_sample('car-detail', total_ms=5, queries=1))
+
+        summary = recorder.summary()
+        self.assertEqual(summary['samples'], 4)
+        self.assertEqual([view['view'] for view in summary['views']], ['car-list', 'car-detail'])
+        cars = summary['views'][0]
+        self.assertEqual(cars['requests'], 3)
+        self.assertEqual(cars['total_ms'], {'p50': 20, 'p95': 30, 'max': 30})
+        self.assertEqual(cars['queries'], {'p50': 2, 'p95': 2, 'max': 2})
+        self.assertEqual(len(cars['latency_histogram']), len(LATENCY_BUCKETS_MS) + 1)
+        self.assertEqual(sum(bucket['count'] for bucket in cars['latency_histogram']), 3)
+        self.assertEqual(summary['slow_requests'], [])
+
+
+class NestedSerializerTimingTests(SimpleTestCase):
+
+    def test_nested_serializers_are_timed_once(self):
+        class Inner(serializers.Serializer):
+            value = serializers.IntegerField()
+
+        class Outer(serializers.Serializer):
+            inner = serializers.SerializerMethodField()
+
+            def get_inner(self, obj):
+                return Inner(obj).data
+
+        install_serializer_timing()
+        sample = RequestSample()
+        set_current_sample(sample)
+        self.addCleanup(set_current_sample, None)
+        # Each clock reading is one second after the previous one
+        with mock.patch.object(perf.time, 'perf_counter', side_effect=itertools.count()):
+            Outer({'value': 1}).data
+
+        self.assertEqual(sample.serializer_ms, 1000)
+        self.assertEqual(sample.serializer_depth, 0)
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_cars(3)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.user = User.objects.create_user('user', 'user@example.com', 'password')
+
+    def setUp(self):
+        self.client = APIClient()
+        get_recorder().clear()
+        self.addCleanup(get_recorder().clear)
+
+    def recorded(self):
+        return get_recorder().snapshot()[0]
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_sampling_off_records_nothing(self):
+        self.client.get('/api/cars/')
+        self.assertEqual(self.recorded(), [])
+
+    @override_settings(PERF_SAMPLE_RATE=0.5)
+    def test_samples_a_fraction_of_requests(self):
+        with mock.patch('apps.core.middleware.random.random', side_effect=[0.7, 0.2]):
+            self.client.get('/api/cars/')
+            self.client.get('/api/cars/')
+        self.assertEqual(len(self.recorded()), 1)
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_records_sample(self):
+        response = self.client.get('/api/cars/')
+
+        [sample] = self.recorded()
+        self.assertEqual(sample.view, 'car-list')
+        self.assertEqual(sample.method, 'GET')
+        self.assertEqual(sample.status, 200)
+        self.assertGreater(sample.queries, 0)
+        self.assertGreater(sample.serializer_ms, 0)
+        self.assertEqual(sample.bytes, len(response.content))
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_summary_endpoint(self):
+        self.client.get('/api/cars/')
+        self.client.get('/api/cars/')
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get('/api/_perf/')
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual(summary['samples'], 2)
+        self.assertEqual(summary['sample_rate'], 1)
+        [view] = summary['views']
+        self.assertEqual((view['method'], view['view'], view['requests']), ('GET', 'car-list', 2))
+        for field in ('total_ms', 'sql_ms', 'serializer_ms', 'queries', 'bytes'):
+            self.assertEqual(set(view[field]), {'p50', 'p95', 'max'})
+        self.assertIn('latency_histogram', view)
+        self.assertIn('query_histogram', view)
+
+        self.assertEqual(self.client.delete('/api/_perf/').status_code, 204)
+        # Only the DELETE itself, recorded after the clear
+        self.assertEqual([sample.method for sample in self.recorded()], ['DELETE'])
+
+    @override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING=True)
+    def test_server_timing_header_is_for_staff_only(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/cars/'))
+        self.client.force_authenticate(self.user)
+        self.assertNotIn('Server-Timing', self.client.get('/api/cars/'))
+
+        self.client.force_authenticate(self.admin)
+        header = self.client.get('/api/cars/')['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", ser;dur=[\d.]+;desc="serializers", total;dur=[\d.]+$')
+
+    @override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_disabled(self):
+        self.client.force_authenticate(self.admin)
+        self.assertNotIn('Server-Timing', self.client.get('/api/cars/'))
+
+    def test_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get('/api/_perf/').status_code, 401)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/_perf/').status_code, 403)
+        self.assertEqual(self.client.delete('/api/_perf/').status_code, 403)
@@ -0,0 +1,88 @@
+"""
+Tests for read-replica routing and the read-your-writes pin.
+"""
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.cars import cache
+from apps.core.middleware import ReplicaRoutingMiddleware
+from apps.core.routers import PIN_COOKIE, read_replica, reading_from_replicas, use_replicas
+
+
+@read_replica
+def replica_view(request):
+    return HttpResponse()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def call(self, request, user=None):
+        """Run `request` through the middleware; returns (response, read from replicas)."""
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, replica_view, (), {})
+            request.user = user or AnonymousUser()
+            seen['replicas'] = reading_from_replicas()
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return response, seen['replicas']
+
+    def test_safe_request_reads_from_replicas(self):
+        _, replicas = self.call(self.factory.get('/'))
+        self.assertTrue(replicas)
+        self.assertFalse(reading_from_replicas())
+
+    def test_pinned_client_reads_from_the_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        _, replicas = self.call(request)
+        self.assertFalse(replicas)
+
+    def test_write_by_authenticated_user_pins_only_that_client(self):
+        response, _ = self.call(self.factory.post('/'), user=User(username='admin'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+        # Other clients are not pinned
+        _, replicas = self.call(self.factory.get('/'))
+        self.assertTrue(replicas)
+
+    def test_pin_cookie_round_trips_on_cross_site_requests(self):
+        response, _ = self.call(self.factory.post('/'), user=User(username='admin'))
+        cookie = response.cookies[PIN_COOKIE]
+        # What a browser needs to send it back on a credentialed cross-site request
+        self.assertEqual(cookie['samesite'], 'None')
+        self.assertTrue(cookie['secure'])
+        self.assertTrue(cookie['httponly'])
+
+        request = self.factory.get('/', HTTP_COOKIE=cookie.output(attrs=[], header=''))
+        _, replicas = self.call(request)
+        self.assertFalse(replicas)
+
+    @override_settings(REPLICA_PIN_COOKIE_SAMESITE='Lax', REPLICA_PIN_COOKIE_SECURE=False)
+    def test_pin_cookie_attributes_are_configurable(self):
+        response, _ = self.call(self.factory.post('/'), user=User(username='admin'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['samesite'], 'Lax')
+        self.assertFalse(response.cookies[PIN_COOKIE]['secure'])
+
+    def test_anonymous_write_does_not_pin(self):
+        response, _ = self.call(self.factory.post('/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=5)
+class CatalogCacheReplicaLagTests(SimpleTestCase):
+
+    def test_replica_reads_right_after_a_bump_are_not_cached(self):
+        cache.bump_version('car')
+        with use_replicas():
+            self.assertTrue(cache.replica_may_lag())
+        self.assertFalse(cache.replica_may_lag())
@@ -0,0 +1,12 @@
+"""
+URL routes for the Core app.
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Admin endpoints
+    path('_perf/', views.perf_stats, name='perf-stats'),
+    path('_perf/db/', views.db_stats, name='perf-db-stats'),
+]
@@ -0,0 +1,35 @@
+"""
+API Views for the Core app.
+"""
+
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .database import connection_stats
+from .perf import get_recorder
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def perf_stats(request):
+    """
+    Admin endpoint to get sampled request performance, aggregated per view.
+    GET /api/_perf/
+    DELETE /api/_perf/ (clear the recorded samples)
+    """
+    recorder = get_recorder()
+    if request.method == 'DELETE':
+        recorder.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(recorder.summary())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_stats(request):
+    """
+    Admin endpoint to get database connection statistics.
+    GET /api/_perf/db/
+    """
+    return Response(connection_stats())
@@ -0,0 +1,29 @@
+"""
+Django Admin configuration for Jobs app.
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin configuration for Job model"""
+    list_display = ['task', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at']
+    list_filter = ['status', 'task']
+    readonly_fields = [
+        'task', 'payload', 'result', 'last_error', 'attempts',
+        'created_at', 'started_at', 'finished_at'
+    ]
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected jobs')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=Job.STATUS_RUNNING).update(
+            status=Job.STATUS_QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+            finished_at=None
+        )
+        self.message_user(request, f'{updated} jobs requeued.')
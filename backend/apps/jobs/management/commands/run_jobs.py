@@ -0,0 +1,47 @@
+"""
+Management command that runs background jobs.
+
+    python manage.py run_jobs            # work forever, polling when idle
+    python manage.py run_jobs --once     # run everything that is due, then exit
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.jobs.queue import claim_next, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no job is due instead of polling',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            close_old_connections()
+            job = claim_next()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            self.stdout.write(f'{job} after {job.attempts} attempt(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs.'))
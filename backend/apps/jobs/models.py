@@ -0,0 +1,56 @@
+"""
+Background job model.
+
+Jobs are stored in the database and executed by the `run_jobs` management
+command, so no external broker is needed.
+"""
+
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    A unit of background work: a registered task name plus a JSON payload.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_DEAD = 'dead'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_DEAD, 'Dead (gave up after retries)'),
+    ]
+
+    task = models.CharField(max_length=100, help_text='Registered task name')
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED
+    )
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Retries
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(help_text='Do not run before this time (retry backoff)')
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,183 @@
+"""
+Database-backed job queue.
+
+- enqueue() stores a Job; with JOBS_EAGER=True it runs right after the
+  current transaction commits instead (handy on a single box without a worker),
+  and failed attempts are retried there and then, without the backoff.
+- claim_next() atomically moves the next due job to 'running'. Jobs stuck in
+  'running' longer than JOBS_LOCK_TIMEOUT (a crashed worker) are claimable again,
+  unless they have used up max_attempts: those are marked 'dead', so a job
+  that keeps killing its worker is not picked up forever.
+- run_job() executes a claimed job. Failures are retried with exponential
+  backoff (JOBS_RETRY_BASE_DELAY * 2 ** (attempt - 1), capped at
+  JOBS_RETRY_MAX_DELAY); after max_attempts the job is marked 'dead'.
+- Either way, a job that goes dead is passed to its task's on_dead handler
+  (see registry.py).
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_dead_handler, get_task
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(task, payload=None, max_attempts=None, delay=0):
+    """Queue a task for background execution and return the Job."""
+    job = Job.objects.create(
+        task=task,
+        payload=payload or {},
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if _setting('JOBS_EAGER', False):
+        transaction.on_commit(lambda: _run_eager(job.pk))
+    return job
+
+
+def _run_eager(job_id):
+    # No worker will pick up a retry, so run the attempts back to back
+    while True:
+        job = claim(Job.objects.filter(pk=job_id, status=Job.STATUS_QUEUED))
+        if job is None:
+            return
+        run_job(job)
+        if job.status != Job.STATUS_QUEUED:
+            return
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    base = _setting('JOBS_RETRY_BASE_DELAY', 5)
+    cap = _setting('JOBS_RETRY_MAX_DELAY', 3600)
+    return min(cap, base * 2 ** max(0, attempts - 1))
+
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=_setting('JOBS_LOCK_TIMEOUT', 600))
+
+
+def claimable():
+    """Jobs that are due, including ones abandoned by a crashed worker."""
+    return Job.objects.filter(
+        Q(status=Job.STATUS_QUEUED, run_after__lte=timezone.now())
+        | Q(status=Job.STATUS_RUNNING, started_at__lt=_stale_before(), attempts__lt=F('max_attempts'))
+    )
+
+
+def _on_dead(job):
+    """Run the task's on_dead handler; its errors are logged, not raised."""
+    handler = get_dead_handler(job.task)
+    if handler is None:
+        return
+    try:
+        handler(job)
+    except Exception:
+        logger.exception('on_dead handler of job %s (%s) failed', job.pk, job.task)
+
+
+def bury_abandoned():
+    """
+    Mark jobs abandoned in 'running' after their last attempt as dead.
+    Returns the count.
+    """
+    abandoned = Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        started_at__lt=_stale_before(),
+        attempts__gte=F('max_attempts'),
+    )
+    count = 0
+    for job in abandoned:
+        # Conditional, so only one worker buries (and cleans up after) a job
+        buried = Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING, started_at=job.started_at).update(
+            status=Job.STATUS_DEAD,
+            finished_at=timezone.now(),
+            last_error='Abandoned by its worker after the last attempt',
+        )
+        if buried:
+            count += 1
+            _on_dead(job)
+    if count:
+        logger.error('Marked %d abandoned job(s) as dead', count)
+    return count
+
+
+def claim(queryset):
+    """
+    Claim the first job in `queryset`, or return None.
+    The conditional UPDATE makes the claim safe with several workers, also
+    on databases without SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    with transaction.atomic():
+        job = (
+            queryset.select_for_update(skip_locked=True)
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status=job.status, started_at=job.started_at).update(
+            status=Job.STATUS_RUNNING,
+            started_at=now,
+            attempts=job.attempts + 1,
+        )
+        if not claimed:
+            return None
+    job.status, job.started_at, job.attempts = Job.STATUS_RUNNING, now, job.attempts + 1
+    return job
+
+
+def claim_next():
+    bury_abandoned()
+    return claim(claimable())
+
+
+def run_job(job):
+    """Run a claimed job and record success, a scheduled retry, or death."""
+    try:
+        result = get_task(job.task)(job)
+    except Exception as e:
+        job.last_error = ''.join(traceback.format_exception(e))[-5000:]
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_DEAD
+            job.finished_at = timezone.now()
+            logger.error('Job %s (%s) is dead after %d attempts', job.pk, job.task, job.attempts)
+        else:
+            job.status = Job.STATUS_QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+            logger.warning('Job %s (%s) failed, retrying at %s', job.pk, job.task, job.run_after)
+        job.save(update_fields=['status', 'last_error', 'finished_at', 'run_after', 'payload', 'result'])
+        if job.status == Job.STATUS_DEAD:
+            _on_dead(job)
+        return job
+
+    job.status = Job.STATUS_SUCCEEDED
+    job.result = result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'finished_at', 'payload'])
+    return job
+
+
+def run_pending(limit=None):
+    """Run due jobs until none are left (or `limit` ran). Returns the count."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
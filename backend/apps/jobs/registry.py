@@ -0,0 +1,43 @@
+"""
+Task registry for background jobs.
+
+Register a task in an app's tasks.py:
+
+    from apps.jobs.registry import task
+
+    @task('cars.delete_image')
+    def delete_image(job):
+        ...
+
+A task receives the Job and may update job.payload to record progress
+before raising, so a retry only redoes the unfinished part. Its return
+value is stored as job.result.
+
+Pass on_dead to clean up after a job that gave up (failed its last attempt
+or was abandoned by its worker): it is called with the dead Job.
+
+    @task('cars.upload_images', on_dead=discard_stashed_files)
+"""
+
+TASKS = {}
+DEAD_HANDLERS = {}
+
+
+def task(name, on_dead=None):
+    def register(func):
+        TASKS[name] = func
+        if on_dead is not None:
+            DEAD_HANDLERS[name] = on_dead
+        return func
+    return register
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f'Unknown task: {name}')
+
+
+def get_dead_handler(name):
+    return DEAD_HANDLERS.get(name)
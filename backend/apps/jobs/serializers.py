@@ -0,0 +1,18 @@
+"""
+Serializers for the Jobs app.
+"""
+
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for Job status polling"""
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'status', 'result', 'last_error', 'attempts',
+            'max_attempts', 'run_after', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
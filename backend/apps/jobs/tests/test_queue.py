@@ -0,0 +1,125 @@
+"""
+Tests for the database job queue.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from apps.jobs.queue import claim_next, enqueue, run_pending
+from apps.jobs.registry import task
+
+FLAKY = 'tests.flaky'
+calls = []
+buried = []
+
+
+def record_dead(job):
+    buried.append(job.pk)
+
+
+@task(FLAKY, on_dead=record_dead)
+def flaky(job):
+    """Fails until the attempt number reaches payload['succeed_on']."""
+    calls.append(job.attempts)
+    if job.attempts < job.payload['succeed_on']:
+        raise RuntimeError(f'attempt {job.attempts} failed')
+    return {'attempts': job.attempts}
+
+
+class AbandonedJobTests(TestCase):
+    """A job whose worker dies is reclaimed until it runs out of attempts."""
+
+    def setUp(self):
+        buried.clear()
+
+    def abandon(self, job, attempts):
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_RUNNING,
+            attempts=attempts,
+            started_at=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_stale_job_with_attempts_left_is_reclaimed(self):
+        job = enqueue(FLAKY, {'succeed_on': 1}, max_attempts=3)
+        self.abandon(job, attempts=2)
+
+        claimed = claim_next()
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.attempts, 3)
+
+    def test_stale_job_out_of_attempts_is_dead(self):
+        job = enqueue(FLAKY, {'succeed_on': 1}, max_attempts=3)
+        self.abandon(job, attempts=3)
+
+        self.assertIsNone(claim_next())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_DEAD)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(buried, [job.pk])
+
+    def test_reclaimed_job_is_not_buried(self):
+        job = enqueue(FLAKY, {'succeed_on': 1}, max_attempts=3)
+        self.abandon(job, attempts=2)
+
+        claim_next()
+
+        self.assertEqual(buried, [])
+
+
+class DeadJobTests(TestCase):
+    """The task's on_dead handler runs once the last attempt failed."""
+
+    def setUp(self):
+        buried.clear()
+
+    def test_handler_runs_after_the_last_attempt(self):
+        job = enqueue(FLAKY, {'succeed_on': 10}, max_attempts=2)
+
+        run_pending()
+        self.assertEqual(buried, [])
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending()
+
+        self.assertEqual(buried, [job.pk])
+
+    def test_handler_errors_are_logged(self):
+        job = enqueue(FLAKY, {'succeed_on': 10}, max_attempts=1)
+
+        with mock.patch.dict('apps.jobs.registry.DEAD_HANDLERS', {FLAKY: mock.Mock(side_effect=OSError)}):
+            with self.assertLogs('apps.jobs.queue', 'ERROR') as logs:
+                run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_DEAD)
+        self.assertIn('on_dead handler', logs.output[-1])
+
+
+@override_settings(JOBS_EAGER=True)
+class EagerJobTests(TestCase):
+    """JOBS_EAGER runs the job on commit and retries failures right away."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_failed_attempts_are_retried(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue(FLAKY, {'succeed_on': 3}, max_attempts=5)
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'attempts': 3})
+
+    def test_gives_up_after_max_attempts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue(FLAKY, {'succeed_on': 10}, max_attempts=2)
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(job.status, Job.STATUS_DEAD)
@@ -0,0 +1,11 @@
+"""
+URL routes for the Jobs app.
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Admin endpoints
+    path('admin/<int:pk>/', views.AdminJobDetailView.as_view(), name='admin-job-detail'),
+]
@@ -0,0 +1,17 @@
+"""
+API Views for the Jobs app.
+"""
+
+from rest_framework import generics, permissions
+from .models import Job
+from .serializers import JobSerializer
+
+
+class AdminJobDetailView(generics.RetrieveAPIView):
+    """
+    Admin endpoint to poll the status of a background job.
+    GET /api/jobs/admin/{id}/
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAdminUser]
@@ -0,0 +1,20 @@
+"""
+Management command to recompute every car's denormalized maintenance totals.
+
+The totals are normally kept up to date incrementally by signals; run this
+after bulk changes that bypass them (raw SQL, queryset.update() on records).
+
+    python manage.py rebuild_maintenance_totals
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.maintenance.totals import rebuild_car_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute Car.maintenance_cost_total and maintenance_count from the maintenance records"
+
+    def handle(self, *args, **options):
+        updated = rebuild_car_totals()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt maintenance totals for {updated} cars.'))
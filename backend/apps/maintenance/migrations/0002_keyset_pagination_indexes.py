@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_keyset_pagination_indexes'),
+        ('maintenance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerecord',
+            index=models.Index(fields=['repair_date', 'id'], name='maintenance_repair__1b8a82_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def sync_totals(apps, schema_editor):
+    """
+    Set total_cost from the parts for records that have parts, then fill
+    in the denormalized totals on every car.
+    """
+    Car = apps.get_model('cars', 'Car')
+    MaintenanceRecord = apps.get_model('maintenance', 'MaintenanceRecord')
+    MaintenancePart = apps.get_model('maintenance', 'MaintenancePart')
+
+    parts = (
+        MaintenancePart.objects.filter(maintenance_record=OuterRef('pk'))
+        .order_by()
+        .values('maintenance_record')
+        .annotate(total=Sum(F('part_cost') * F('quantity')))
+        .values('total')
+    )
+    has_parts = Exists(MaintenancePart.objects.filter(maintenance_record=OuterRef('pk')))
+    MaintenanceRecord.objects.filter(has_parts).update(
+        total_cost=Subquery(parts, output_field=DecimalField(max_digits=10, decimal_places=2))
+    )
+
+    records = MaintenanceRecord.objects.filter(car=OuterRef('pk')).order_by().values('car')
+    Car.objects.update(
+        maintenance_cost_total=Coalesce(
+            Subquery(records.annotate(total=Sum('total_cost')).values('total')),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        maintenance_count=Coalesce(
+            Subquery(records.annotate(count=Count('id')).values('count')),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_car_maintenance_totals'),
+        ('maintenance', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_totals, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,10 @@ This file defines:
 - MaintenancePart: Individual parts replaced/repaired with costs
 """
 
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F, Sum
 from django.core.validators import MinValueValidator
 from apps.cars.models import Car
 
@@ -46,6 +49,7 @@ class MaintenanceRecord(models.Model):
         ordering = ['-repair_date']
         indexes = [
             models.Index(fields=['car', '-repair_date']),
+            models.Index(fields=['repair_date', 'id']),  # Keyset pagination
         ]
 
     def __str__(self):
@@ -54,19 +58,11 @@ class MaintenanceRecord(models.Model):
     def calculate_total_cost(self):
         """
         Calculate total cost from all parts.
-        Returns the sum of (part_cost * quantity) for all parts.
-        """
-        total = sum(
-            part.part_cost * part.quantity
-            for part in self.parts.all()
-        )
-        return total
-
-    def save(self, *args, **kwargs):
-        """
-        Override save to auto-calculate total cost if not provided.
+        Returns the sum of (part_cost * quantity) for all parts, computed by
+        the database. total_cost is kept equal to this (see totals.py).
         """
-        super().save(*args, **kwargs)
+        total = self.parts.aggregate(total=Sum(F('part_cost') * F('quantity')))['total']
+        return total or Decimal('0')
 
 
 class MaintenancePart(models.Model):
@@ -2,8 +2,13 @@
 Serializers for the Maintenance app.
 """
 
+from django.db import transaction
 from rest_framework import serializers
 from .models import MaintenanceRecord, MaintenancePart
+from .totals import batch_part_changes, parts_changed
+
+# Writable part fields, updated together by the nested parts diff
+PART_FIELDS = ['part_name', 'part_cost', 'quantity', 'notes']
 
 
 class MaintenancePartSerializer(serializers.ModelSerializer):
@@ -26,12 +31,26 @@ class MaintenanceRecordSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class MaintenancePartWriteSerializer(MaintenancePartSerializer):
+    """
+    Serializer for parts nested in a maintenance record write.
+    Accepts an optional `id`: parts with an id update that existing part,
+    parts without one are created.
+    """
+    id = serializers.IntegerField(required=False)
+
+
 class MaintenanceRecordCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating maintenance records with nested parts.
     Allows creating parts inline when creating a maintenance record.
+
+    On update, incoming parts are diffed against the existing ones by id:
+    new parts are inserted with one bulk_create, changed parts written with
+    one bulk_update, and parts left out deleted with one query, so editing
+    a large repair order takes a fixed number of statements.
     """
-    parts = MaintenancePartSerializer(many=True, required=False)
+    parts = MaintenancePartWriteSerializer(many=True, required=False)
 
     class Meta:
         model = MaintenanceRecord
@@ -41,35 +60,71 @@ class MaintenanceRecordCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create maintenance record with nested parts"""
         parts_data = validated_data.pop('parts', [])
-        maintenance_record = MaintenanceRecord.objects.create(**validated_data)
 
-        # Create parts
-        for part_data in parts_data:
-            MaintenancePart.objects.create(
-                maintenance_record=maintenance_record,
-                **part_data
-            )
+        with transaction.atomic(), batch_part_changes():
+            maintenance_record = MaintenanceRecord.objects.create(**validated_data)
 
+            # Create parts in one query; total_cost is recomputed once at the end
+            if parts_data:
+                MaintenancePart.objects.bulk_create([
+                    MaintenancePart(maintenance_record=maintenance_record, **self._part_fields(part_data))
+                    for part_data in parts_data
+                ])
+                parts_changed(maintenance_record.pk)
+
+        maintenance_record.refresh_from_db(fields=['total_cost'])
         return maintenance_record
 
     def update(self, instance, validated_data):
         """Update maintenance record and nested parts"""
         parts_data = validated_data.pop('parts', None)
 
-        # Update maintenance record fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        # Update parts if provided
-        if parts_data is not None:
-            # Delete existing parts
-            instance.parts.all().delete()
-            # Create new parts
-            for part_data in parts_data:
-                MaintenancePart.objects.create(
-                    maintenance_record=instance,
-                    **part_data
-                )
+        with transaction.atomic(), batch_part_changes():
+            # Update maintenance record fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # Update parts if provided
+            if parts_data is not None:
+                self._sync_parts(instance, parts_data)
 
+        instance.refresh_from_db(fields=['total_cost'])
         return instance
+
+    @staticmethod
+    def _part_fields(part_data):
+        return {field: value for field, value in part_data.items() if field != 'id'}
+
+    def _sync_parts(self, instance, parts_data):
+        """Apply the difference between the existing and incoming parts."""
+        existing = {part.pk: part for part in MaintenancePart.objects.filter(maintenance_record=instance)}
+
+        unknown = [part_data['id'] for part_data in parts_data if 'id' in part_data and part_data['id'] not in existing]
+        if unknown:
+            raise serializers.ValidationError({
+                'parts': [f'Part {part_id} does not belong to this maintenance record.' for part_id in unknown]
+            })
+
+        to_create, to_update, keep = [], [], set()
+        for part_data in parts_data:
+            fields = self._part_fields(part_data)
+            if 'id' not in part_data:
+                to_create.append(MaintenancePart(maintenance_record=instance, **fields))
+                continue
+            part = existing[part_data['id']]
+            keep.add(part.pk)
+            if any(getattr(part, field) != value for field, value in fields.items()):
+                for field, value in fields.items():
+                    setattr(part, field, value)
+                to_update.append(part)
+
+        to_delete = [pk for pk in existing if pk not in keep]
+        if to_delete:
+            MaintenancePart.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            MaintenancePart.objects.bulk_update(to_update, PART_FIELDS)
+        if to_create:
+            MaintenancePart.objects.bulk_create(to_create)
+        if to_delete or to_update or to_create:
+            parts_changed(instance.pk)
@@ -0,0 +1,69 @@
+"""
+Signal handlers for the Maintenance app.
+
+Keep MaintenanceRecord.total_cost equal to the sum of its parts, and the
+car's denormalized maintenance totals in step with its records
+(see totals.py).
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.cars.models import Car
+from .models import MaintenanceRecord, MaintenancePart
+from .totals import adjust_car, parts_changed
+
+
+@receiver(pre_save, sender=MaintenanceRecord)
+def remember_previous_totals(sender, instance, **kwargs):
+    """Store the car and total before an edit so the car totals can be adjusted."""
+    instance._previous_totals = None
+    if instance.pk:
+        instance._previous_totals = (
+            MaintenanceRecord.objects.filter(pk=instance.pk).values('car_id', 'total_cost').first()
+        )
+
+
+@receiver(post_save, sender=MaintenanceRecord)
+def update_car_totals_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_totals', None)
+    if created or previous is None:
+        adjust_car(instance.car_id, instance.total_cost, 1)
+    elif previous['car_id'] != instance.car_id:
+        adjust_car(previous['car_id'], -previous['total_cost'], -1)
+        adjust_car(instance.car_id, instance.total_cost, 1)
+    else:
+        adjust_car(instance.car_id, instance.total_cost - previous['total_cost'])
+
+    # A total entered by hand is replaced by the parts total once there are parts
+    if not created and instance.parts.exists():
+        parts_changed(instance.pk)
+
+
+@receiver(post_delete, sender=MaintenanceRecord)
+def update_car_totals_on_delete(sender, instance, **kwargs):
+    adjust_car(instance.car_id, -instance.total_cost, -1)
+
+
+def _deleting_record_or_car(origin):
+    """True if a part is being deleted as part of deleting its record or car."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in (MaintenanceRecord, Car)
+
+
+@receiver(post_save, sender=MaintenancePart)
+def update_record_total_on_part_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    parts_changed(instance.maintenance_record_id)
+
+
+@receiver(post_delete, sender=MaintenancePart)
+def update_record_total_on_part_delete(sender, instance, origin=None, **kwargs):
+    # The record's own delete handler takes its total off the car
+    if _deleting_record_or_car(origin):
+        return
+    parts_changed(instance.maintenance_record_id)
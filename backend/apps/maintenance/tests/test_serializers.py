@@ -0,0 +1,75 @@
+"""
+Tests for the Maintenance serializers.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cars.tests.factories import create_car
+from apps.maintenance.models import MaintenancePart, MaintenanceRecord
+
+
+class MaintenancePartsDiffTests(TestCase):
+    """Editing the nested parts of a record takes a fixed number of statements."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_record(self, car, part_count):
+        response = self.client.post('/api/maintenance/admin/', {
+            'car': str(car.pk),
+            'repair_date': '2026-03-01',
+            'total_cost': '0.00',
+            'description': 'Service',
+            'parts': [
+                {'part_name': f'Part {i}', 'part_cost': '10.00', 'quantity': 1}
+                for i in range(part_count)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return MaintenanceRecord.objects.get(pk=response.json()['id'])
+
+    def edit_parts(self, record):
+        """
+        Keep half of the parts, double the cost of a quarter, drop the
+        last quarter and add as many new parts as were dropped.
+        """
+        parts = list(record.parts.order_by('pk'))
+        quarter = len(parts) // 4
+        payload = []
+        for index, part in enumerate(parts[:-quarter]):
+            cost = '20.00' if index < quarter else '10.00'
+            payload.append({'id': part.pk, 'part_name': part.part_name, 'part_cost': cost, 'quantity': 1})
+        payload += [
+            {'part_name': f'New part {i}', 'part_cost': '5.00', 'quantity': 2}
+            for i in range(quarter)
+        ]
+        return self.client.patch(f'/api/maintenance/admin/{record.pk}/', {'parts': payload}, format='json')
+
+    def test_statement_count_does_not_depend_on_part_count(self):
+        for part_count in (20, 200):
+            car = create_car()
+            record = self.create_record(car, part_count)
+            quarter = part_count // 4
+
+            with self.subTest(part_count=part_count), self.assertNumQueries(19):
+                response = self.edit_parts(record)
+            self.assertEqual(response.status_code, 200, response.content)
+
+            # quarter at 20, half at 10, quarter new at 5 x 2
+            expected = Decimal(quarter * 20 + (part_count // 2) * 10 + quarter * 10)
+            record.refresh_from_db()
+            car.refresh_from_db()
+            self.assertEqual(record.parts.count(), part_count)
+            self.assertEqual(record.total_cost, expected)
+            self.assertEqual(car.maintenance_cost_total, expected)
+            self.assertEqual(car.maintenance_count, 1)
+            self.assertEqual(MaintenancePart.objects.filter(maintenance_record=record, part_cost=20).count(), quarter)
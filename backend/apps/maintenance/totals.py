@@ -0,0 +1,123 @@
+"""
+Keeps maintenance cost totals consistent.
+
+- MaintenanceRecord.total_cost is the sum of its parts (part_cost * quantity),
+  computed by the database with one aggregate whenever parts change. A record
+  saved without parts keeps the total that was entered.
+- Car.maintenance_cost_total and Car.maintenance_count are denormalized sums
+  over the car's records, adjusted incrementally (UPDATE ... SET x = x + delta)
+  by the signal handlers in signals.py, so they never need a full recount.
+
+Code that changes many parts of one record at once (e.g. the nested parts
+serializer) can wrap the changes in `batch_part_changes()` so the record
+total is recomputed once at the end instead of once per part.
+"""
+
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.cars.models import Car
+
+_batch = threading.local()
+
+
+def parts_total_expression():
+    """Sum of part_cost * quantity over a record's parts (0 without parts)."""
+    from .models import MaintenancePart
+
+    totals = (
+        MaintenancePart.objects.filter(maintenance_record=OuterRef('pk'))
+        .order_by()
+        .values('maintenance_record')
+        .annotate(total=Sum(F('part_cost') * F('quantity')))
+        .values('total')
+    )
+    return Coalesce(
+        Subquery(totals, output_field=DecimalField(max_digits=10, decimal_places=2)),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def adjust_car(car_id, cost_delta=0, count_delta=0):
+    """Apply a change to a car's denormalized maintenance totals."""
+    if not cost_delta and not count_delta:
+        return
+    Car.objects.filter(pk=car_id).update(
+        maintenance_cost_total=F('maintenance_cost_total') + cost_delta,
+        maintenance_count=F('maintenance_count') + count_delta,
+    )
+
+
+def sync_record_total(record_id):
+    """
+    Set a record's total_cost to the sum of its parts and pass the
+    difference on to its car. Returns the new total, or None if the record
+    no longer exists.
+    """
+    from .models import MaintenanceRecord
+
+    with transaction.atomic():
+        row = (
+            MaintenanceRecord.objects.select_for_update()
+            .filter(pk=record_id)
+            .annotate(parts_total=parts_total_expression())
+            .values('car_id', 'total_cost', 'parts_total')
+            .first()
+        )
+        if row is None:
+            return None
+        if row['parts_total'] != row['total_cost']:
+            MaintenanceRecord.objects.filter(pk=record_id).update(total_cost=row['parts_total'])
+            adjust_car(row['car_id'], row['parts_total'] - row['total_cost'])
+    return row['parts_total']
+
+
+def parts_changed(record_id):
+    """Recompute a record total now, or at the end of the current batch."""
+    pending = getattr(_batch, 'record_ids', None)
+    if pending is not None:
+        pending.add(record_id)
+    else:
+        sync_record_total(record_id)
+
+
+@contextmanager
+def batch_part_changes():
+    """Defer record total recomputation until the block exits."""
+    if getattr(_batch, 'record_ids', None) is not None:
+        # Nested: the outermost block syncs
+        yield
+        return
+    _batch.record_ids = set()
+    try:
+        yield
+        record_ids = _batch.record_ids
+    finally:
+        _batch.record_ids = None
+    for record_id in record_ids:
+        sync_record_total(record_id)
+
+
+def rebuild_car_totals(car_ids=None):
+    """Recompute the denormalized totals from scratch (repairs drift)."""
+    from .models import MaintenanceRecord
+
+    records = MaintenanceRecord.objects.filter(car=OuterRef('pk')).order_by().values('car')
+    cars = Car.objects.all() if car_ids is None else Car.objects.filter(pk__in=car_ids)
+    return cars.update(
+        maintenance_cost_total=Coalesce(
+            Subquery(records.annotate(total=Sum('total_cost')).values('total')),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        maintenance_count=Coalesce(
+            Subquery(records.annotate(count=Count('id')).values('count')),
+            Value(0),
+        ),
+    )
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party apps
     'rest_framework',
@@ -37,9 +38,12 @@ INSTALLED_APPS = [
     'apps.cars',
     'apps.maintenance',
     'apps.analytics',
+    'apps.jobs',
+    'apps.core',
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.PerformanceMiddleware',  # sampled timing, see PERF_* below
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
@@ -48,6 +52,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',  # see DATABASE_REPLICAS below
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -72,6 +77,7 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# Connections are reused across requests (see apps/core/database.py)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -80,9 +86,47 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),  # seconds, 0 closes after each request
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        # Required behind PgBouncer in transaction pooling mode
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+        'OPTIONS': {
+            'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),  # seconds
+        },
     }
 }
 
+# Read replicas (see apps/core/routers.py): comma-separated host[:port] list of
+# streaming replicas of DB_NAME; public catalog and analytics reads go to them
+DATABASE_REPLICAS = []
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='').split(','), start=1):
+    if not replica.strip():
+        continue
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},  # tests read the primary
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+# After a write by a logged-in user, that client reads from the primary for this long
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+# The SPA calls the API cross-site (withCredentials), and browsers only send
+# cookies on those requests with SameSite=None, which in turn requires Secure.
+# Use Lax when the frontend is served from the same site as the API.
+REPLICA_PIN_COOKIE_SAMESITE = config('REPLICA_PIN_COOKIE_SAMESITE', default='None')
+REPLICA_PIN_COOKIE_SECURE = config('REPLICA_PIN_COOKIE_SECURE', default=True, cast=bool)
+
+# Connection budget self-check: WEB_CONCURRENCY workers x DB_WORKER_THREADS
+# must fit in the server's max_connections
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+DB_WORKER_THREADS = config('DB_WORKER_THREADS', default=1, cast=int)
+DB_STARTUP_CHECK = config('DB_STARTUP_CHECK', default=True, cast=bool)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -135,13 +179,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.cars.pagination.KeysetPagination',  # ?page=N, or ?cursor= for keyset
     'PAGE_SIZE': 12,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Per IP, counted in ANALYTICS_EVENTS_THROTTLE_CACHE: with the default
+        # locmem cache that is per worker process, so point it at a shared cache
+        # (e.g. redis) to enforce one limit across workers
+        'analytics_events': config('ANALYTICS_EVENTS_RATE', default='120/min'),
+    },
 }
 
 # JWT Settings
@@ -165,6 +215,66 @@ cloudinary.config(
     secure=True
 )
 
+# Caches
+# The 'catalog' cache holds rendered public catalog responses (apps/cars/cache.py).
+# Use a shared backend in production, e.g.
+#   django.core.cache.backends.filebased.FileBasedCache with LOCATION=/var/tmp/catalog_cache
+#   django.core.cache.backends.redis.RedisCache with LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': config('CATALOG_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CATALOG_CACHE_LOCATION', default='catalog'),
+        'TIMEOUT': config('CATALOG_CACHE_TIMEOUT', default=300, cast=int),  # seconds
+    },
+}
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=True, cast=bool)
+
+# Car view buffering (see apps/analytics/view_buffer.py)
+CAR_VIEW_FLUSH_SIZE = config('CAR_VIEW_FLUSH_SIZE', default=100, cast=int)
+CAR_VIEW_FLUSH_INTERVAL = config('CAR_VIEW_FLUSH_INTERVAL', default=10, cast=int)  # seconds
+CAR_VIEW_MAX_BUFFERED = config('CAR_VIEW_MAX_BUFFERED', default=10000, cast=int)  # dropped beyond this while the DB is down
+
+# Unique page visitor buffering (see apps/analytics/visitors.py)
+PAGE_VISITOR_FLUSH_SIZE = config('PAGE_VISITOR_FLUSH_SIZE', default=1000, cast=int)
+PAGE_VISITOR_FLUSH_INTERVAL = config('PAGE_VISITOR_FLUSH_INTERVAL', default=10, cast=int)  # seconds
+PAGE_VISITOR_MAX_BUFFERED = config('PAGE_VISITOR_MAX_BUFFERED', default=100000, cast=int)
+
+# Raw analytics retention (see apps/analytics/partitions.py; run `python manage.py rotate_analytics_partitions`)
+ANALYTICS_RETENTION_MONTHS = config('ANALYTICS_RETENTION_MONTHS', default=13, cast=int)  # 0 keeps everything
+ANALYTICS_PARTITION_PREMAKE_MONTHS = config('ANALYTICS_PARTITION_PREMAKE_MONTHS', default=3, cast=int)
+
+# Batched analytics events (see apps/analytics/events.py)
+ANALYTICS_EVENTS_MAX_BATCH = config('ANALYTICS_EVENTS_MAX_BATCH', default=50, cast=int)
+ANALYTICS_EVENTS_MAX_BYTES = config('ANALYTICS_EVENTS_MAX_BYTES', default=65536, cast=int)
+ANALYTICS_EVENTS_THROTTLE_CACHE = config('ANALYTICS_EVENTS_THROTTLE_CACHE', default='default')  # alias in CACHES
+
+# Car image uploads (see apps/cars/uploads.py)
+CAR_IMAGE_UPLOADER = 'apps.cars.uploads.cloudinary_upload'
+CAR_IMAGE_UPLOAD_WORKERS = config('CAR_IMAGE_UPLOAD_WORKERS', default=4, cast=int)
+CAR_IMAGE_UPLOAD_TIMEOUT = config('CAR_IMAGE_UPLOAD_TIMEOUT', default=30, cast=int)  # seconds per file
+
+# Admin bulk car API (see apps/cars/bulk.py)
+CAR_BULK_MAX_ITEMS = config('CAR_BULK_MAX_ITEMS', default=1000, cast=int)
+
+# Background jobs (see apps/jobs/queue.py; run `python manage.py run_jobs`)
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)  # run jobs in-process on commit
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_RETRY_BASE_DELAY = config('JOBS_RETRY_BASE_DELAY', default=5, cast=int)  # seconds
+JOBS_RETRY_MAX_DELAY = config('JOBS_RETRY_MAX_DELAY', default=3600, cast=int)  # seconds
+JOBS_LOCK_TIMEOUT = config('JOBS_LOCK_TIMEOUT', default=600, cast=int)  # seconds
+
+# Request performance instrumentation (see apps/core/perf.py; stats at /api/_perf/)
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=0.0, cast=float)  # fraction of requests, 0 disables
+PERF_BUFFER_SIZE = config('PERF_BUFFER_SIZE', default=1000, cast=int)  # samples kept per worker
+PERF_SLOW_REQUEST_MS = config('PERF_SLOW_REQUEST_MS', default=500, cast=int)
+PERF_SLOW_REQUEST_QUERIES = config('PERF_SLOW_REQUEST_QUERIES', default=50, cast=int)
+PERF_REPEATED_QUERY_THRESHOLD = config('PERF_REPEATED_QUERY_THRESHOLD', default=0, cast=int)  # log N+1s, 0 disables
+PERF_SLOW_QUERY_MS = config('PERF_SLOW_QUERY_MS', default=0, cast=int)  # log slow statements, 0 disables
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=False, cast=bool)  # Server-Timing header on sampled staff requests
+
 # File Upload Settings
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
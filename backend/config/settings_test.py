@@ -0,0 +1,34 @@
+"""
+Django settings for the test suite (see conftest.py).
+
+Tests run on SQLite by default. Set TEST_DB_ENGINE=postgresql to run them
+against the PostgreSQL server configured by the DB_* settings instead;
+tests that need PostgreSQL features are skipped on SQLite.
+"""
+
+from decouple import config
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+if config('TEST_DB_ENGINE', default='sqlite') != 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'test.sqlite3',
+        }
+    }
+    DATABASE_REPLICAS = []
+
+# Faster password hashing for test users
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Tests count queries; cached responses would hide them
+CATALOG_CACHE_ENABLED = False
+DB_STARTUP_CHECK = False
+PERF_SAMPLE_RATE = 0.0
+
+# Buffered analytics writes are flushed explicitly in tests, not by the
+# background flush thread
+CAR_VIEW_FLUSH_INTERVAL = 3600
+PAGE_VISITOR_FLUSH_INTERVAL = 3600
@@ -19,6 +19,8 @@ urlpatterns = [
     path('api/cars/', include('apps.cars.urls')),
     path('api/maintenance/', include('apps.maintenance.urls')),
     path('api/analytics/', include('apps.analytics.urls')),
+    path('api/jobs/', include('apps.jobs.urls')),
+    path('api/', include('apps.core.urls')),
 ]
 
 # Serve media files in development
@@ -0,0 +1,27 @@
+"""
+pytest fixtures and plugins for the backend (settings: pytest.ini).
+
+    pip install -r requirements-dev.txt
+    pytest                                  # SQLite
+    TEST_DB_ENGINE=postgresql pytest        # PostgreSQL from the DB_* settings
+"""
+
+import pytest
+
+pytest_plugins = ['apps.core.pytest_plugin']
+
+
+@pytest.fixture
+def api_client():
+    from rest_framework.test import APIClient
+
+    return APIClient()
+
+
+@pytest.fixture
+def admin_api_client(admin_user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(admin_user)
+    return client
@@ -0,0 +1,111 @@
+/**
+ * Client-side analytics event batching.
+ * Page views and car views are queued and sent to POST /analytics/events/
+ * in batches with navigator.sendBeacon, instead of one request per event.
+ */
+
+'use client';
+
+import { useEffect } from 'react';
+import { usePathname } from 'next/navigation';
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
+const EVENTS_URL = `${API_URL}/analytics/events/`;
+
+// Same as the ANALYTICS_EVENTS_MAX_BATCH default on the backend
+const MAX_BATCH_SIZE = 50;
+const FLUSH_INTERVAL_MS = 5000;
+const SESSION_KEY = 'analytics_session_id';
+
+type AnalyticsEvent =
+  | { type: 'page_view'; url: string }
+  | { type: 'car_view'; car_id: string };
+
+let queue: AnalyticsEvent[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let listening = false;
+
+/**
+ * Random per-tab session id, used to count unique visitors
+ */
+const getSessionId = (): string => {
+  let sessionId = sessionStorage.getItem(SESSION_KEY);
+  if (!sessionId) {
+    sessionId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    sessionStorage.setItem(SESSION_KEY, sessionId);
+  }
+  return sessionId;
+};
+
+/**
+ * Send all queued events now
+ */
+export const flushEvents = () => {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (typeof window === 'undefined' || queue.length === 0) return;
+
+  while (queue.length > 0) {
+    const events = queue.slice(0, MAX_BATCH_SIZE);
+    queue = queue.slice(MAX_BATCH_SIZE);
+    // text/plain keeps the beacon a simple CORS request (no preflight)
+    const body = JSON.stringify({ session_id: getSessionId(), events });
+    const sent = navigator.sendBeacon?.(EVENTS_URL, new Blob([body], { type: 'text/plain' }));
+    if (!sent) {
+      fetch(EVENTS_URL, {
+        method: 'POST',
+        body,
+        headers: { 'Content-Type': 'text/plain' },
+        keepalive: true,
+      }).catch(() => {
+        // Analytics must never break the page
+      });
+    }
+  }
+};
+
+const listenForPageHide = () => {
+  if (listening) return;
+  listening = true;
+  // Flush before the tab is hidden or closed so queued events aren't lost
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushEvents();
+  });
+  window.addEventListener('pagehide', flushEvents);
+};
+
+const track = (event: AnalyticsEvent) => {
+  if (typeof window === 'undefined') return;
+  listenForPageHide();
+  queue.push(event);
+  if (queue.length >= MAX_BATCH_SIZE) {
+    flushEvents();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushEvents, FLUSH_INTERVAL_MS);
+  }
+};
+
+/**
+ * Queue a page view
+ */
+export const trackPageView = (url: string) => track({ type: 'page_view', url });
+
+/**
+ * Queue a car detail view
+ */
+export const trackCarView = (carId: string) => track({ type: 'car_view', car_id: carId });
+
+/**
+ * Hook that tracks a page view on every public route change
+ */
+export function usePageViewTracking() {
+  const pathname = usePathname();
+
+  useEffect(() => {
+    if (pathname && !pathname.startsWith('/admin')) {
+      trackPageView(pathname);
+    }
+  }, [pathname]);
+}
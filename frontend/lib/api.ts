@@ -4,6 +4,7 @@
  */
 
 import axios from 'axios';
+import { trackCarView } from '@/lib/analytics';
 import type {
   Car,
   Category,
@@ -23,6 +24,9 @@ const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 // Create axios instance with default config
 const apiClient = axios.create({
   baseURL: API_URL,
+  // Send cookies too: the API pins an admin's reads to the primary database
+  // with a short-lived cookie after each change (read-your-writes)
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -99,10 +103,11 @@ export const getCar = async (id: string): Promise<Car> => {
 };
 
 /**
- * Record a car view (for analytics)
+ * Record a car view (for analytics).
+ * Queued and sent in a batch with other events (see lib/analytics.ts).
  */
 export const recordCarView = async (id: string): Promise<void> => {
-  await apiClient.post(`/cars/${id}/view/`);
+  trackCarView(id);
 };
 
 /**
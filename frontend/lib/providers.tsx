@@ -4,12 +4,16 @@ import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
 import { ReactQueryDevtools } from '@tanstack/react-query-devtools';
 import { useState, ReactNode } from 'react';
 import { LanguageProvider } from '@/context/LanguageContext';
+import { usePageViewTracking } from '@/lib/analytics';
 
 interface ProvidersProps {
   children: ReactNode;
 }
 
 export function Providers({ children }: ProvidersProps) {
+  // Batched page view analytics for public pages
+  usePageViewTracking();
+
   // Create a new QueryClient instance for each user session
   // This prevents sharing state between different users
   const [queryClient] = useState(